@@ -1 +1 @@
-# Initialize app module
+# Initialize app module
@@ -1 +1 @@
-# Initialize API module
+# Initialize API module
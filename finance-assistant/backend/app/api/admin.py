@@ -0,0 +1,73 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+
+from app.core.profiling import request_profiler
+from app.core.security import require_admin
+
+
+router = APIRouter()
+
+
+class ProfileRequest(BaseModel):
+    """
+    Profile capture request schema.
+    """
+    requests: int = 10
+    mode: str = "cprofile"  # 'cprofile' or 'sampling'
+    path_prefix: Optional[str] = None
+
+
+class ProfileStatus(BaseModel):
+    """
+    Profile capture status schema.
+    """
+    armed: bool
+    mode: Optional[str] = None
+    path_prefix: str
+    remaining: int
+    captured: int
+    outputs: List[str]
+
+
+@router.post("/profile", response_model=ProfileStatus)
+def start_profile(
+    profile_request: ProfileRequest,
+    admin=Depends(require_admin)
+):
+    """
+    Capture a profile of the next N requests (optionally only paths starting with
+    ``path_prefix``) to a file under PROFILE_OUTPUT_DIR.
+
+    ``cprofile`` writes a pstats file of the event loop thread, one request at a
+    time; ``sampling`` writes collapsed stacks of all threads for flame graphs.
+    """
+    try:
+        return request_profiler.arm(profile_request.requests, profile_request.mode, profile_request.path_prefix)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT if request_profiler.armed else status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/profile", response_model=ProfileStatus)
+def get_profile_status(
+    admin=Depends(require_admin)
+):
+    """
+    Get the state of the current capture and the files written by recent ones.
+    """
+    return request_profiler.status()
+
+
+@router.delete("/profile", response_model=ProfileStatus)
+def stop_profile(
+    admin=Depends(require_admin)
+):
+    """
+    Stop the current capture, writing what was captured so far.
+    """
+    return request_profiler.cancel()
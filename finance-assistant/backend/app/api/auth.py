@@ -1,50 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-
-from app.core.config import settings
-from app.core.database import get_db
-from app.core.security import get_password_hash, verify_password, verify_api_key
-from app.models.user import User
-from app.schemas.user import UserCreate, User as UserSchema
-
-
-router = APIRouter()
-
-
-@router.post("/register", response_model=UserSchema)
-def register(
-    user_in: UserCreate,
-    db: Session = Depends(get_db),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Register a new user (requires API key).
-    """
-    # Check if user already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
-   
-    # Create new user
-    db_user = User(
-        email=user_in.email,
-        first_name=user_in.first_name,
-        last_name=user_in.last_name,
-        hashed_password=get_password_hash(user_in.password),
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
-
-
-@router.post("/validate-api-key")
-def validate_api_key(api_key: str = Depends(verify_api_key)):
-    """
-    Validate API key endpoint.
-    """
-    return {"message": "API key is valid", "status": "authenticated"}
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+from app.core.config import settings
+from app.core.database import get_db, get_async_db
+from app.core.security import (
+    get_password_hash_async, verify_api_key, get_api_principal, ApiPrincipal,
+    generate_api_key, hash_api_key, principal_cache
+)
+from app.models.api_key import ApiKey
+from app.models.user import User
+from app.schemas.api_key import ApiKeyCreate, ApiKey as ApiKeySchema, ApiKeyCreated
+from app.schemas.user import UserCreate, User as UserSchema
+
+
+router = APIRouter()
+
+
+@router.post("/register", response_model=UserSchema)
+async def register(
+    user_in: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Register a new user (requires API key).
+    """
+    # Check if user already exists
+    user = (await db.execute(select(User).where(User.email == user_in.email))).scalars().first()
+    if user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+   
+    # Create new user
+    db_user = User(
+        email=user_in.email,
+        first_name=user_in.first_name,
+        last_name=user_in.last_name,
+        # bcrypt runs on its own thread pool so it does not block the event loop
+        hashed_password=await get_password_hash_async(user_in.password),
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+@router.post("/validate-api-key")
+def validate_api_key(api_key: str = Depends(verify_api_key)):
+    """
+    Validate API key endpoint.
+    """
+    return {"message": "API key is valid", "status": "authenticated"}
+
+
+@router.post("/api-keys", response_model=ApiKeyCreated, status_code=status.HTTP_201_CREATED)
+def create_api_key(
+    key_in: ApiKeyCreate,
+    db: Session = Depends(get_db),
+    principal: ApiPrincipal = Depends(get_api_principal)
+):
+    """
+    Issue a new API key for the current user. The key is only returned once.
+    """
+    key = generate_api_key()
+    db_key = ApiKey(
+        user_id=principal.user.id,
+        key_hash=hash_api_key(key),
+        prefix=key[:12],
+        name=key_in.name
+    )
+    db.add(db_key)
+    db.commit()
+    db.refresh(db_key)
+    # A lookup of this key may have been cached as unknown before it existed
+    principal_cache.invalidate_key(db_key.key_hash)
+    return ApiKeyCreated(
+        id=db_key.id,
+        user_id=db_key.user_id,
+        prefix=db_key.prefix,
+        name=db_key.name,
+        is_active=db_key.is_active,
+        created_at=db_key.created_at,
+        revoked_at=db_key.revoked_at,
+        key=key
+    )
+
+
+@router.get("/api-keys", response_model=List[ApiKeySchema])
+def list_api_keys(
+    db: Session = Depends(get_db),
+    principal: ApiPrincipal = Depends(get_api_principal)
+):
+    """
+    List the current user's API keys.
+    """
+    return db.query(ApiKey).filter(ApiKey.user_id == principal.user.id).order_by(ApiKey.id).all()
+
+
+@router.delete("/api-keys/{key_id}", response_model=ApiKeySchema)
+def revoke_api_key(
+    key_id: int,
+    db: Session = Depends(get_db),
+    principal: ApiPrincipal = Depends(get_api_principal)
+):
+    """
+    Revoke one of the current user's API keys. It stops working immediately in this process.
+    """
+    db_key = db.query(ApiKey).filter(ApiKey.id == key_id, ApiKey.user_id == principal.user.id).first()
+    if db_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+
+    db_key.is_active = False
+    db_key.revoked_at = datetime.utcnow()
+    db.commit()
+    db.refresh(db_key)
+    principal_cache.invalidate_key(db_key.key_hash)
+    return db_key
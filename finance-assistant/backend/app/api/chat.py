@@ -1,55 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-
-
-from app.core.database import get_db
-from app.core.security import verify_api_key, get_current_user_simple
-from app.models.user import User
-from app.services.chat import generate_chat_response
-
-
-router = APIRouter()
-
-
-class ChatRequest(BaseModel):
-    """
-    Chat request schema.
-    """
-    message: str
-
-
-class ChatResponse(BaseModel):
-    """
-    Chat response schema.
-    """
-    response: str
-
-
-@router.post("/message", response_model=ChatResponse)
-async def chat_message(
-    chat_request: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Send a message to the AI chat assistant.
-    """
-    try:
-        # Get user's transaction data to provide context to the AI
-        transactions = current_user.transactions
-       
-        # Generate response using LangChain
-        response = await generate_chat_response(
-            user_id=current_user.id,
-            message=chat_request.message,
-            transactions=transactions
-        )
-       
-        return ChatResponse(response=response)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating chat response: {str(e)}"
-        )
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+
+
+from app.core.database import get_async_db
+from app.core.security import verify_api_key, get_current_user_simple
+from app.models.user import User
+from app.services.chat import generate_chat_response, stream_chat_response
+from app.services.context import financial_context
+from app.utils.streaming import iterate_in_task
+
+
+router = APIRouter()
+
+
+class ChatRequest(BaseModel):
+    """
+    Chat request schema.
+    """
+    message: str
+
+
+class ChatResponse(BaseModel):
+    """
+    Chat response schema.
+    """
+    response: str
+
+
+@router.post("/message", response_model=ChatResponse)
+async def chat_message(
+    chat_request: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Send a message to the AI chat assistant.
+    """
+    try:
+        # Aggregated financial context, cached until the user's transactions change
+        context = await db.run_sync(financial_context.get, current_user.id)
+       
+        # Generate response using LangChain
+        response = await generate_chat_response(
+            user_id=current_user.id,
+            message=chat_request.message,
+            context=context
+        )
+       
+        return ChatResponse(response=response)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating chat response: {str(e)}"
+        )
+
+
+def _sse_event(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(
+    chat_request: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Send a message to the AI chat assistant and stream the reply as server-sent events.
+   
+    Each token is sent as ``data: {"token": "..."}``, followed by an ``event: done``
+    message, or ``event: error`` if generation fails. When the client disconnects
+    the stream is cancelled, which cancels the upstream LLM request.
+    """
+    # Resolve the context before streaming starts so the request session is not held open
+    context = await db.run_sync(financial_context.get, current_user.id)
+    user_id = current_user.id
+
+    async def event_stream():
+        # The LLM stream runs in its own task so a disconnect cancels it cleanly
+        tokens = iterate_in_task(
+            stream_chat_response(user_id=user_id, message=chat_request.message, context=context)
+        )
+        try:
+            streamed = False
+            async for token in tokens:
+                streamed = True
+                yield _sse_event({"token": token})
+            if streamed:
+                yield _sse_event({}, event="done")
+            else:
+                yield _sse_event({"detail": "Error generating chat response: empty response"}, event="error")
+        except Exception as e:
+            yield _sse_event({"detail": f"Error generating chat response: {str(e)}"}, event="error")
+        finally:
+            await tokens.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
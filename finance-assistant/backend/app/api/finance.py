@@ -1,140 +1,163 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-
-
-from app.core.database import get_db
-from app.core.security import verify_api_key, get_current_user_simple
-from app.models.user import User
-from app.models.transaction import Transaction
-from app.schemas.transaction import TransactionCreate, Transaction as TransactionSchema
-
-
-router = APIRouter()
-
-
-@router.post("/transactions", response_model=TransactionSchema)
-def create_transaction(
-    transaction_in: TransactionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Create a new transaction for the current user.
-    """
-    db_transaction = Transaction(
-        **transaction_in.dict(),
-        user_id=current_user.id
-    )
-    db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
-
-
-@router.get("/transactions", response_model=List[TransactionSchema])
-def get_transactions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Get transactions for the current user.
-    """
-    try:
-        transactions = db.query(Transaction).filter(
-            Transaction.user_id == current_user.id
-        ).order_by(Transaction.date.desc(), Transaction.id.desc()).offset(skip).limit(limit).all()
-        return transactions
-    except Exception as e:
-        print(f"❌ Error fetching transactions: {e}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
-
-
-@router.get("/monthly-summary")
-def get_monthly_summary(
-    year: int,
-    month: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Get monthly summary of transactions for the current user.
-    """
-    # Get transactions for the specified month
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id,
-        extract('year', Transaction.date) == year,
-        extract('month', Transaction.date) == month
-    ).all()
-   
-    # Calculate totals
-    total_income = sum(t.amount for t in transactions if t.transaction_type == 'income')
-    total_expense = sum(t.amount for t in transactions if t.transaction_type == 'expense')
-    total_investment = sum(t.amount for t in transactions if t.transaction_type == 'investment')
-   
-    # Group expenses by category
-    expense_by_category = {}
-    for t in transactions:
-        if t.transaction_type == 'expense':
-            category = t.category or 'Uncategorized'
-            if category in expense_by_category:
-                expense_by_category[category] += t.amount
-            else:
-                expense_by_category[category] = t.amount
-   
-    return {
-        "total_income": total_income,
-        "total_expense": total_expense,
-        "total_investment": total_investment,
-        "net_savings": total_income - total_expense - total_investment,
-        "expense_by_category": expense_by_category
-    }
-
-
-@router.get("/yearly-summary")
-def get_yearly_summary(
-    year: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Get yearly summary of transactions for the current user.
-    """
-    # Get transactions for the specified year
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id,
-        extract('year', Transaction.date) == year
-    ).all()
-   
-    # Group by month
-    monthly_data = {i: {"income": 0, "expense": 0, "investment": 0} for i in range(1, 13)}
-   
-    for t in transactions:
-        month = t.date.month
-        if t.transaction_type == 'income':
-            monthly_data[month]["income"] += t.amount
-        elif t.transaction_type == 'expense':
-            monthly_data[month]["expense"] += t.amount
-        elif t.transaction_type == 'investment':
-            monthly_data[month]["investment"] += t.amount
-   
-    # Calculate yearly totals
-    yearly_totals = {
-        "total_income": sum(data["income"] for data in monthly_data.values()),
-        "total_expense": sum(data["expense"] for data in monthly_data.values()),
-        "total_investment": sum(data["investment"] for data in monthly_data.values())
-    }
-   
-    yearly_totals["net_savings"] = yearly_totals["total_income"] - yearly_totals["total_expense"] - yearly_totals["total_investment"]
-   
-    return {
-        "monthly_data": monthly_data,
-        "yearly_totals": yearly_totals
-    }
\ No newline at end of file
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, or_, select
+
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.security import verify_api_key, get_current_user_simple
+from app.models.user import User
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionCreate, Transaction as TransactionSchema
+from app.services.categorizer import merchant_categorizer
+from app.services.context import financial_context
+from app.services.rollups import monthly_rollups
+from app.services.summaries import monthly_summary_from_transactions, yearly_summary_from_transactions
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor, NEXT_CURSOR_HEADER
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Largest page GET /transactions returns
+MAX_PAGE_SIZE = 1000
+
+# Years the summaries accept; the range for a year ends on January 1st of the next
+MIN_SUMMARY_YEAR = 1
+MAX_SUMMARY_YEAR = 9998
+
+
+def transactions_page_query(
+    user_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    skip: int = 0
+) -> Select:
+    """
+    Query for one page of a user's transactions in (date DESC, id DESC) order.
+
+    Args:
+        user_id: User ID
+        limit: Rows to return
+        after: (date, id) of the last row of the previous page, from the cursor
+        skip: Rows to skip when there is no cursor
+    """
+    query = select(Transaction).where(Transaction.user_id == user_id)
+    if after is not None:
+        cursor_date, cursor_id = after
+        # Rows after the cursor in (date DESC, id DESC) order. The redundant
+        # date bound lets the (user_id, date, id) index seek to the cursor.
+        query = query.where(
+            Transaction.date <= cursor_date,
+            or_(Transaction.date < cursor_date, Transaction.id < cursor_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit)
+
+
+@router.post("/transactions", response_model=TransactionSchema)
+async def create_transaction(
+    transaction_in: TransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Create a new transaction for the current user.
+    """
+    db_transaction = Transaction(
+        **transaction_in.dict(),
+        user_id=current_user.id
+    )
+    db.add(db_transaction)
+   
+    user_id = current_user.id
+    data = transaction_in.dict()
+   
+    def record(session: Session):
+        merchant_categorizer.record(session, user_id, [data])
+        monthly_rollups.apply(session, user_id, [data])
+        financial_context.invalidate_on_commit(session, user_id)
+   
+    # The categorizer and rollups run on the same connection, in the same transaction
+    await db.run_sync(record)
+    await db.commit()
+    await db.refresh(db_transaction)
+    return db_transaction
+
+
+@router.get("/transactions", response_model=List[TransactionSchema])
+async def get_transactions(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get transactions for the current user, newest first.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to get the next
+    page; the header is omitted on the last page. Cursor pages seek directly to
+    their position, so page N costs the same as page 1. ``skip`` is still
+    accepted and is ignored when a cursor is given.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether there is a next page without another query
+        query = transactions_page_query(current_user.id, limit + 1, after=after, skip=skip)
+        transactions = (await db.execute(query)).scalars().all()
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    except Exception:
+        logger.exception("Error fetching transactions")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.date, last.id)
+    return transactions
+
+
+@router.get("/monthly-summary")
+async def get_monthly_summary(
+    year: int = Query(..., ge=MIN_SUMMARY_YEAR, le=MAX_SUMMARY_YEAR),
+    month: int = Query(..., ge=1, le=12),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get monthly summary of transactions for the current user.
+    Totals come from the monthly rollups, or from one grouped aggregate query
+    when SUMMARY_USE_ROLLUPS is off.
+    """
+    if settings.SUMMARY_USE_ROLLUPS:
+        return await db.run_sync(monthly_rollups.monthly_summary, current_user.id, year, month)
+    return await db.run_sync(monthly_summary_from_transactions, current_user.id, year, month)
+
+
+@router.get("/yearly-summary")
+async def get_yearly_summary(
+    year: int = Query(..., ge=MIN_SUMMARY_YEAR, le=MAX_SUMMARY_YEAR),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get yearly summary of transactions for the current user.
+    Totals come from the monthly rollups, or from one grouped aggregate query
+    when SUMMARY_USE_ROLLUPS is off.
+    """
+    if settings.SUMMARY_USE_ROLLUPS:
+        return await db.run_sync(monthly_rollups.yearly_summary, current_user.id, year)
+    return await db.run_sync(yearly_summary_from_transactions, current_user.id, year)
\ No newline at end of file
@@ -1,52 +1,328 @@
-import os
-import tempfile
-from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status
-from sqlalchemy.orm import Session
-
-
-from app.core.database import get_db
-from app.core.security import verify_api_key, get_current_user_simple
-from app.models.user import User
-from app.services.pdf import extract_transactions_from_pdf
-from app.schemas.transaction import Transaction as TransactionSchema
-
-
-router = APIRouter()
-
-
-@router.post("/bank-statement", response_model=List[TransactionSchema])
-async def upload_bank_statement(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_simple),
-    api_key: str = Depends(verify_api_key)
-):
-    """
-    Upload and process a bank statement PDF.
-    """
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only PDF files are allowed"
-        )
-   
-    # Save the uploaded file to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp:
-        temp_path = temp.name
-        content = await file.read()
-        temp.write(content)
-   
-    try:
-        # Extract transactions from the PDF
-        transactions = extract_transactions_from_pdf(temp_path, current_user.id, db)
-        return transactions
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing PDF: {str(e)}"
-        )
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+import os
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException, Query, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.security import verify_api_key, get_current_user_simple
+from app.models.user import User
+from app.services.cache import ingestion_cache
+from app.services.file_import import CsvColumnMapping
+from app.services.ingestion import ingestion_jobs
+from app.schemas.ingestion_job import BatchUpload as BatchUploadSchema, IngestionJob as IngestionJobSchema
+from app.utils.uploads import (
+    spool_upload_to_disk, spool_pdfs_from_zip, is_zip_upload, detect_export_format,
+    UploadTooLarge, InvalidUploadType, ZIP_MAGIC, MULTIPART_OVERHEAD_BYTES
+)
+
+
+router = APIRouter()
+
+
+def request_body_limits(prefix: str) -> Dict[str, int]:
+    """
+    Largest request body each upload route accepts, keyed by its path under ``prefix``.
+    
+    Used by RequestBodyLimitMiddleware to turn away oversized uploads before
+    the multipart form is read; each file is still held to its own limit while
+    it is spooled.
+    """
+    batch_file_bytes = max(settings.MAX_UPLOAD_BYTES, settings.UPLOAD_BATCH_MAX_ZIP_BYTES)
+    limits = {
+        '/bank-statement': settings.MAX_UPLOAD_BYTES,
+        '/bank-statements': settings.UPLOAD_BATCH_MAX_FILES * batch_file_bytes,
+        '/transactions-file': settings.IMPORT_MAX_BYTES
+    }
+    return {prefix + path: limit + MULTIPART_OVERHEAD_BYTES for path, limit in limits.items()}
+
+
+class CsvMappingRequest(BaseModel):
+    """
+    CSV column mapping schema: header names of the columns, each detected when unset.
+    """
+    date: Optional[str] = None
+    description: Optional[str] = None
+    amount: Optional[str] = None
+    debit: Optional[str] = None
+    credit: Optional[str] = None
+    category: Optional[str] = None
+    date_format: Optional[str] = None  # strptime format, e.g. "%d/%m/%Y"
+    expenses_positive: bool = False
+
+
+@router.post("/bank-statement", response_model=IngestionJobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def upload_bank_statement(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Upload a bank statement PDF and queue it for processing.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    # Stream the upload to the spool directory; the job worker removes it when done
+    try:
+        spooled = await spool_upload_to_disk(file, settings.UPLOAD_SPOOL_DIR)
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except InvalidUploadType:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are allowed"
+        )
+
+    try:
+        job = await db.run_sync(
+            ingestion_jobs.create_job, current_user.id, file.filename, spooled.path,
+            file_size=spooled.size, file_sha256=spooled.sha256
+        )
+    except Exception as e:
+        if os.path.exists(spooled.path):
+            os.unlink(spooled.path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error queueing PDF: {str(e)}"
+        )
+
+    ingestion_jobs.submit(job.id)
+    return job
+
+
+@router.post("/bank-statements", response_model=BatchUploadSchema, status_code=status.HTTP_202_ACCEPTED)
+async def upload_bank_statements(
+    files: List[UploadFile] = File(...),
+    max_parallel: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Upload several bank statement PDFs, or ZIP archives of them, and queue each
+    statement as its own ingestion job.
+    
+    Statements are checked, processed and committed independently, so one bad
+    file does not affect the rest; the response lists the job or the error for
+    every statement. Up to ``max_parallel`` (at most UPLOAD_BATCH_MAX_PARALLEL)
+    statements of the batch are processed at once.
+    """
+    max_files = settings.UPLOAD_BATCH_MAX_FILES
+    if len(files) > max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {max_files} files can be uploaded at once"
+        )
+    
+    # One entry per statement, in upload order; accepted ones carry their spooled file
+    entries: List[Dict[str, Any]] = []
+    accepted = 0
+    
+    try:
+        for file in files:
+            filename = file.filename or "statement.pdf"
+            if is_zip_upload(file):
+                try:
+                    archive = await spool_upload_to_disk(
+                        file, settings.UPLOAD_SPOOL_DIR, suffix='.zip',
+                        max_bytes=settings.UPLOAD_BATCH_MAX_ZIP_BYTES, magic=ZIP_MAGIC
+                    )
+                except (UploadTooLarge, InvalidUploadType) as e:
+                    entries.append({'filename': filename, 'error': str(e)})
+                    continue
+                try:
+                    members = await run_in_threadpool(
+                        spool_pdfs_from_zip, archive.path, settings.UPLOAD_SPOOL_DIR, max_files - accepted
+                    )
+                except InvalidUploadType as e:
+                    entries.append({'filename': filename, 'error': str(e)})
+                    continue
+                finally:
+                    os.unlink(archive.path)
+                for member in members:
+                    # Job filenames hold 255 characters; keep the member name at the end
+                    entry = {'filename': f"{filename}/{member.name}"[-255:], 'error': member.error}
+                    if member.upload is not None:
+                        entry['upload'] = member.upload
+                        accepted += 1
+                    entries.append(entry)
+                continue
+        
+            if accepted >= max_files:
+                entries.append({'filename': filename, 'error': "Batch file limit reached"})
+                continue
+            try:
+                entries.append({'filename': filename, 'upload': await spool_upload_to_disk(file, settings.UPLOAD_SPOOL_DIR)})
+                accepted += 1
+            except UploadTooLarge as e:
+                entries.append({'filename': filename, 'error': str(e)})
+            except InvalidUploadType:
+                entries.append({'filename': filename, 'error': "Only PDF or ZIP files are allowed"})
+    except Exception:
+        # Statements spooled before the failure never become jobs
+        for entry in entries:
+            if 'upload' in entry and os.path.exists(entry['upload'].path):
+                os.unlink(entry['upload'].path)
+        raise
+    
+    job_ids = []
+    for entry in entries:
+        spooled = entry.pop('upload', None)
+        if spooled is None:
+            continue
+        try:
+            entry['job'] = await db.run_sync(
+                ingestion_jobs.create_job, current_user.id, entry['filename'], spooled.path,
+                file_size=spooled.size, file_sha256=spooled.sha256
+            )
+            job_ids.append(entry['job'].id)
+        except Exception as e:
+            await db.rollback()
+            if os.path.exists(spooled.path):
+                os.unlink(spooled.path)
+            entry['error'] = f"Error queueing PDF: {str(e)}"
+    
+    if job_ids:
+        ingestion_jobs.submit_batch(job_ids, min(max_parallel or settings.UPLOAD_BATCH_MAX_PARALLEL,
+                                                 settings.UPLOAD_BATCH_MAX_PARALLEL))
+    return {
+        'queued': len(job_ids),
+        'rejected': len(entries) - len(job_ids),
+        'files': entries
+    }
+
+
+@router.post("/transactions-file", response_model=IngestionJobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def upload_transactions_file(
+    file: UploadFile = File(...),
+    mapping: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Upload a CSV or OFX/QFX transaction export and queue it for import.
+    
+    Rows are read straight from the file, without the LLM. CSV columns are
+    detected from the header unless ``mapping`` names them, as a JSON object
+    such as {"date": "Posted", "amount": "Amount", "date_format": "%d/%m/%Y"}.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    import_options = None
+    if mapping:
+        try:
+            import_options = CsvColumnMapping(**CsvMappingRequest.parse_raw(mapping).dict()).to_json()
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid column mapping: {str(e)}"
+            )
+    
+    try:
+        spooled = await spool_upload_to_disk(
+            file, settings.UPLOAD_SPOOL_DIR, suffix='.import', max_bytes=settings.IMPORT_MAX_BYTES, magic=None
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except InvalidUploadType as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    file_format = detect_export_format(spooled.path)
+    if file_format is None:
+        os.unlink(spooled.path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only CSV or OFX/QFX files are allowed; upload statement PDFs to /bank-statement"
+        )
+    
+    try:
+        job = await db.run_sync(
+            ingestion_jobs.create_job, current_user.id, file.filename or f"transactions.{file_format}",
+            spooled.path, file_size=spooled.size, file_sha256=spooled.sha256,
+            file_format=file_format, import_options=import_options
+        )
+    except Exception as e:
+        if os.path.exists(spooled.path):
+            os.unlink(spooled.path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error queueing import: {str(e)}"
+        )
+    
+    ingestion_jobs.submit(job.id)
+    return job
+
+
+@router.get("/jobs", response_model=List[IngestionJobSchema])
+async def list_ingestion_jobs(
+    job_status: Optional[str] = Query(None, alias="status"),
+    skip: int = 0,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    List ingestion jobs for the current user, newest first.
+    """
+    return await db.run_sync(ingestion_jobs.list_jobs, current_user.id, status=job_status, skip=skip, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobSchema)
+async def get_ingestion_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get the status and progress of an ingestion job.
+    """
+    job = await db.run_sync(ingestion_jobs.get_job, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found"
+        )
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=IngestionJobSchema)
+async def cancel_ingestion_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_simple),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Cancel a queued or running ingestion job.
+    """
+    job = await db.run_sync(ingestion_jobs.get_job, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found"
+        )
+    return await db.run_sync(ingestion_jobs.cancel, job)
+
+
+@router.get("/cache-stats")
+def get_ingestion_cache_stats(
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get hit and miss counters for the ingestion cache.
+    """
+    return ingestion_cache.stats()
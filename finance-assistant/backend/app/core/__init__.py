@@ -1 +1 @@
-# Initialize core module
+# Initialize core module
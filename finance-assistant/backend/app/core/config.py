@@ -1,49 +1,142 @@
-import os
-from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
-# from pydantic_settings import BaseSettings
-
-
-class Settings():
-    """
-    Application settings.
-    """
-   
-    # API Settings
-    API_V1_STR: str = "/api"
-    PROJECT_NAME: str = "Finance Assistant"
-   
-    # CORS Settings
-    CORS_ORIGINS: List[str] = ["http://localhost:4200"]  # Angular default port
-   
-    # Security Settings
-    SECRET_KEY: str = os.environ.get("SECRET_KEY", "your-secret-key-for-development")
-    API_KEY: str = os.environ.get("API_KEY", "finance-assistant-api-key-123")
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-   
-    # Database Settings
-    DATABASE_SERVER: str = os.environ.get("DATABASE_SERVER")
-    DATABASE_PORT: str = os.environ.get("DATABASE_PORT")
-    DATABASE_NAME: str = os.environ.get("DATABASE_NAME")
-    # For Windows Authentication with pyodbc
-    DATABASE_URI: str = f"mssql+pyodbc://@{DATABASE_SERVER}/{DATABASE_NAME}?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes"
-   
-    # Azure Settings (for production)
-    AZURE_STORAGE_CONNECTION_STRING: Optional[str] = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
-    AZURE_STORAGE_CONTAINER_NAME: str = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", "bank-statements")
-
-
-    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME")
-    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-    api_key = os.environ.get("AZURE_OPENAI_KEY")
-    api_version = os.environ.get("AZURE_OPENAI_API_VERSION")
-
-
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
-
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from dotenv import load_dotenv
+# from pydantic_settings import BaseSettings
+
+
+class Settings():
+    """
+    Application settings.
+    """
+   
+    # API Settings
+    API_V1_STR: str = "/api"
+    PROJECT_NAME: str = "Finance Assistant"
+   
+    # CORS Settings
+    CORS_ORIGINS: List[str] = ["http://localhost:4200"]  # Angular default port
+   
+    # Security Settings
+    SECRET_KEY: str = os.environ.get("SECRET_KEY", "your-secret-key-for-development")
+    API_KEY: str = os.environ.get("API_KEY", "finance-assistant-api-key-123")
+    # Operator secret for /api/admin (sent as X-Admin-Key); admin endpoints are off while unset.
+    # Unlike API_KEY it must never be shipped to the browser
+    ADMIN_API_KEY: Optional[str] = os.environ.get("ADMIN_API_KEY")
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Seconds a resolved API key stays cached in process; revoking a key through the API invalidates it at once
+    API_KEY_CACHE_TTL: float = float(os.environ.get("API_KEY_CACHE_TTL", "300"))
+    API_KEY_CACHE_MAX_ENTRIES: int = int(os.environ.get("API_KEY_CACHE_MAX_ENTRIES", "10000"))
+    # Unknown keys remembered (in their own LRU) so retries of a bad key skip the database
+    API_KEY_CACHE_MAX_MISSES: int = int(os.environ.get("API_KEY_CACHE_MAX_MISSES", "1000"))
+    # Threads reserved for bcrypt hashing and verification
+    PASSWORD_HASH_WORKERS: int = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+   
+    # Database Settings
+    DATABASE_SERVER: str = os.environ.get("DATABASE_SERVER")
+    DATABASE_PORT: str = os.environ.get("DATABASE_PORT")
+    DATABASE_NAME: str = os.environ.get("DATABASE_NAME")
+    # For Windows Authentication with pyodbc; DATABASE_URL overrides it with a full
+    # SQLAlchemy URL (e.g. sqlite:///./finance.db for local runs and benchmarks)
+    DATABASE_URI: str = os.environ.get("DATABASE_URL") or f"mssql+pyodbc://@{DATABASE_SERVER}/{DATABASE_NAME}?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes"
+    # Async driver URL for AsyncSession routes; derived from DATABASE_URI when unset
+    # (mssql+pyodbc -> mssql+aioodbc, sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URI: Optional[str] = os.environ.get("ASYNC_DATABASE_URL")
+    # Connection pool settings, applied to both engines
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Schema management on startup: "check" creates tables only when the stored schema
+    # version differs from SCHEMA_VERSION, "create" runs create_all every time, "off" skips it
+    DB_SCHEMA_MODE: str = os.environ.get("DB_SCHEMA_MODE", "check").lower()
+   
+    # Bulk Insert Settings
+    BULK_INSERT_BATCH_SIZE: int = int(os.environ.get("BULK_INSERT_BATCH_SIZE", "500"))
+   
+    # Summary Settings: read summaries from monthly_rollups, or aggregate transactions directly
+    SUMMARY_USE_ROLLUPS: bool = os.environ.get("SUMMARY_USE_ROLLUPS", "true").lower() == "true"
+    # Seconds a user's chat context stays cached; changes through this process invalidate it sooner
+    CHAT_CONTEXT_CACHE_TTL: float = float(os.environ.get("CHAT_CONTEXT_CACHE_TTL", "300"))
+   
+    # Logging, Metrics and Profiling Settings
+    LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO").upper()
+    METRICS_ENABLED: bool = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    # When set, GET /metrics requires "Authorization: Bearer <token>" (Prometheus bearer_token)
+    METRICS_TOKEN: Optional[str] = os.environ.get("METRICS_TOKEN")
+    PROFILE_OUTPUT_DIR: str = os.environ.get("PROFILE_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "finance-assistant-profiles"))
+    PROFILE_SAMPLE_INTERVAL: float = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+    PROFILE_MAX_REQUESTS: int = int(os.environ.get("PROFILE_MAX_REQUESTS", "1000"))
+   
+    # Azure Settings (for production)
+    AZURE_STORAGE_CONNECTION_STRING: Optional[str] = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
+    AZURE_STORAGE_CONTAINER_NAME: str = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", "bank-statements")
+
+    # Ingestion Settings
+    # Jobs mostly wait on the LLM, so the pool is sized for a batch upload running in parallel
+    INGESTION_MAX_WORKERS: int = int(os.environ.get("INGESTION_MAX_WORKERS", "16"))
+    UPLOAD_SPOOL_DIR: str = os.environ.get("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "finance-assistant-uploads"))
+    MAX_UPLOAD_BYTES: int = int(os.environ.get("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+    UPLOAD_CHUNK_SIZE: int = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+    # Batch uploads: statements per request (files or ZIP members), size limit of a
+    # ZIP archive, and jobs from one batch processed at a time
+    UPLOAD_BATCH_MAX_FILES: int = int(os.environ.get("UPLOAD_BATCH_MAX_FILES", "24"))
+    UPLOAD_BATCH_MAX_ZIP_BYTES: int = int(os.environ.get("UPLOAD_BATCH_MAX_ZIP_BYTES", str(200 * 1024 * 1024)))
+    UPLOAD_BATCH_MAX_PARALLEL: int = int(os.environ.get("UPLOAD_BATCH_MAX_PARALLEL", "12"))
+    # CSV and OFX/QFX exports: size limit, and rows parsed and committed per batch
+    IMPORT_MAX_BYTES: int = int(os.environ.get("IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+    IMPORT_BATCH_ROWS: int = int(os.environ.get("IMPORT_BATCH_ROWS", "5000"))
+    INGESTION_CACHE_ENABLED: bool = os.environ.get("INGESTION_CACHE_ENABLED", "true").lower() == "true"
+    INGESTION_CACHE_DIR: str = os.environ.get("INGESTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "finance-assistant-cache"))
+    INGESTION_CACHE_MAX_BYTES: int = int(os.environ.get("INGESTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    # PDF text extraction: "pypdf" (fast, falls back to pdfminer on unreadable files) or "pdfminer"
+    PDF_EXTRACTOR: str = os.environ.get("PDF_EXTRACTOR", "pypdf").lower()
+    # Worker processes shared by all ingestions; statements shorter than
+    # PDF_PARALLEL_MIN_PAGES are extracted in the calling thread
+    PDF_EXTRACT_WORKERS: int = int(os.environ.get("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "16"))
+    PDF_PAGES_PER_TASK: int = int(os.environ.get("PDF_PAGES_PER_TASK", "8"))
+
+
+    # LLM provider: "azure", or "fake" for offline load tests (canned replies, see app/services/fake_llm.py)
+    LLM_PROVIDER: str = os.environ.get("LLM_PROVIDER", "azure").lower()
+    # Fake provider: seconds per call, +/- uniform jitter, share of calls that fail, seconds between streamed words
+    FAKE_LLM_LATENCY: float = float(os.environ.get("FAKE_LLM_LATENCY", "0.5"))
+    FAKE_LLM_JITTER: float = float(os.environ.get("FAKE_LLM_JITTER", "0.1"))
+    FAKE_LLM_ERROR_RATE: float = float(os.environ.get("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_TOKEN_DELAY: float = float(os.environ.get("FAKE_LLM_TOKEN_DELAY", "0.02"))
+
+
+    deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME")
+    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    api_key = os.environ.get("AZURE_OPENAI_KEY")
+    api_version = os.environ.get("AZURE_OPENAI_API_VERSION")
+
+
+    # LLM Extraction Settings
+    LLM_CHUNK_MAX_TOKENS: int = int(os.environ.get("LLM_CHUNK_MAX_TOKENS", "1000"))
+    LLM_CHUNK_OVERLAP_LINES: int = int(os.environ.get("LLM_CHUNK_OVERLAP_LINES", "2"))
+    LLM_MAX_CONCURRENCY: int = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+
+
+    # Categorization Settings
+    CATEGORIZER_MIN_CONFIDENCE: float = float(os.environ.get("CATEGORIZER_MIN_CONFIDENCE", "0.75"))
+    CATEGORIZER_MIN_COUNT: int = int(os.environ.get("CATEGORIZER_MIN_COUNT", "2"))
+
+
+    # LLM HTTP Client Settings
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "20"))
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+    LLM_HTTP_TIMEOUT: float = float(os.environ.get("LLM_HTTP_TIMEOUT", "120"))
+
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+
+
 settings = Settings()
\ No newline at end of file
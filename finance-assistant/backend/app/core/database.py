@@ -1,48 +1,246 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-
-from app.core.config import settings
-
-
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URI)
-
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-# Create Base class for database models
-Base = declarative_base()
-
-
-def create_tables():
-    """
-    Create all database tables.
-    """
-    # Import all models to ensure they're registered with SQLAlchemy
-    from app.models import user, transaction
-   
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-
-
-def init_db():
-    """
-    Initialize the database by creating all tables.
-    """
-    create_tables()
-
-
-# Dependency to get database session
-def get_db():
-    """
-    Dependency for getting database session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, insert, inspect, select, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_EVENTS, DB_POOL_CONNECTIONS
+
+
+logger = logging.getLogger(__name__)
+
+# Async drivers used when ASYNC_DATABASE_URI is not set
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _engine_options(url: URL) -> Dict[str, Any]:
+    """
+    Pool options for an engine; in-memory SQLite uses a single-connection pool without sizing.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    return options
+
+
+def get_async_database_url() -> URL:
+    """
+    URL for the async engine: ASYNC_DATABASE_URI, or DATABASE_URI with its async driver.
+    """
+    if settings.ASYNC_DATABASE_URI:
+        return make_url(settings.ASYNC_DATABASE_URI)
+    url = make_url(settings.DATABASE_URI)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def instrument_pool(engine, name: str):
+    """
+    Count pool events and expose pool occupancy for an engine's connection pool.
+    """
+    for pool_event in ("connect", "checkout", "checkin", "invalidate"):
+        event.listen(engine, pool_event, lambda *args, pool_event=pool_event: DB_POOL_EVENTS.inc(name, pool_event))
+
+    pool = engine.pool
+    for state, method in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin")):
+        if hasattr(pool, method):
+            DB_POOL_CONNECTIONS.set_function(getattr(pool, method), name, state)
+    if hasattr(pool, "overflow"):
+        # QueuePool.overflow() counts down from -pool_size until the pool is full
+        DB_POOL_CONNECTIONS.set_function(lambda: max(pool.overflow(), 0), name, "overflow")
+
+
+# Create SQLAlchemy engine
+engine = create_engine(settings.DATABASE_URI, **_engine_options(make_url(settings.DATABASE_URI)))
+instrument_pool(engine, "sync")
+
+
+# Create SessionLocal class
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# Create Base class for database models
+Base = declarative_base()
+
+
+# Bump whenever a model adds a table, index or column so the next startup runs init_db
+SCHEMA_VERSION = "11"
+
+
+# Nullable columns added to tables after they were first deployed. create_all
+# only creates missing tables, so init_db adds these columns
+ADDED_COLUMNS = {
+    "transactions": ("fingerprint",),
+    "ingestion_jobs": ("duplicate_count", "file_format", "import_options", "unreadable_count"),
+}
+
+
+def create_tables():
+    """
+    Create all database tables.
+    """
+    # Import all models to ensure they're registered with SQLAlchemy
+    from app.models import user, transaction, ingestion_job, merchant_category, monthly_rollup, api_key, schema_version
+   
+    # Create all tables
+    Base.metadata.create_all(bind=engine)
+
+
+def get_schema_version() -> Optional[str]:
+    """
+    The schema version last recorded in the database, or None if it was never recorded.
+    """
+    from app.models.schema_version import SchemaVersion
+   
+    try:
+        with engine.connect() as connection:
+            return connection.execute(
+                select(SchemaVersion.version).order_by(SchemaVersion.id.desc()).limit(1)
+            ).scalar()
+    except DBAPIError:
+        # schema_versions does not exist yet
+        return None
+
+
+def add_missing_columns():
+    """
+    Add the columns listed in ADDED_COLUMNS to existing tables.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    for table_name, column_names in ADDED_COLUMNS.items():
+        table = Base.metadata.tables[table_name]
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        missing = [table.c[name] for name in column_names if name not in existing]
+        if not missing:
+            continue
+        
+        with engine.begin() as connection:
+            for column in missing:
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                ))
+                logger.info("Added column %s.%s", table_name, column.name)
+
+
+def create_missing_indexes():
+    """
+    Create the model indexes missing from existing tables.
+
+    create_all only creates the indexes of tables it creates, so an index
+    added to a model later would otherwise never reach an existing database.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def init_db():
+    """
+    Initialize the database by creating all tables, columns and indexes and
+    recording the schema version.
+    """
+    create_tables()
+    add_missing_columns()
+    create_missing_indexes()
+   
+    from app.models.schema_version import SchemaVersion
+    if get_schema_version() != SCHEMA_VERSION:
+        with engine.begin() as connection:
+            connection.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+
+
+def ensure_schema() -> bool:
+    """
+    Initialize the database only if its recorded schema version is out of date.
+   
+    One small query on a current database, instead of create_all inspecting
+    every table on each startup.
+   
+    Returns:
+        True if the schema was created or updated
+    """
+    if get_schema_version() == SCHEMA_VERSION:
+        return False
+    init_db()
+    return True
+
+
+# Dependency to get database session
+def get_db():
+    """
+    Dependency for getting database session.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async engine and session factory, created on first use so the async driver
+# is only imported by processes that serve async routes
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    """
+    Get the process-wide AsyncEngine.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        url = get_async_database_url()
+        _async_engine = create_async_engine(url, **_engine_options(url))
+        instrument_pool(_async_engine.sync_engine, "async")
+        # Routes return ORM objects after commit, so they must not expire (no async lazy loads)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """
+    Get the AsyncSession factory.
+    """
+    get_async_engine()
+    return _AsyncSessionLocal
+
+
+async def get_async_db():
+    """
+    Dependency for getting an async database session.
+
+    Sync service code can run on it with ``await db.run_sync(func, *args)``,
+    which passes a Session bound to the same connection without blocking the loop.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def close_async_engine():
+    """
+    Dispose of the async engine's connection pool.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
\ No newline at end of file
@@ -0,0 +1,277 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency buckets in seconds, from fast SQL queries to long LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base class for metrics with a fixed set of label names.
+
+    Series are created on first use. Updates take one short lock, so metrics
+    can be updated from request handlers and ingestion worker threads alike.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _check_labels(self, labels: Tuple[str, ...]):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {labels}")
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """
+        Yield (suffix, formatted labels, value) for every series.
+        """
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._check_labels(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield "", _format_labels(self.label_names, labels), value
+
+
+class Gauge(Metric):
+    """
+    Value read from a callback at scrape time, such as connection pool occupancy.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set_function(self, callback: Callable[[], float], *labels: str):
+        self._check_labels(labels)
+        with self._lock:
+            self._callbacks[labels] = callback
+
+    def samples(self):
+        with self._lock:
+            callbacks = list(self._callbacks.items())
+        for labels, callback in callbacks:
+            try:
+                value = callback()
+            except Exception:
+                # A gauge whose source is gone (e.g. a disposed engine) is left out of the scrape
+                continue
+            yield "", _format_labels(self.label_names, labels), value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values (usually durations in seconds) in cumulative buckets.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: per-bucket counts (last slot is +Inf), sum, count
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labels: str):
+        self._check_labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """
+        Observe the duration of the ``with`` block, including when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series is not None else 0
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield "_bucket", _format_labels(self.label_names, labels, f'le="{_format_value(bound)}"'), cumulative
+            yield "_sum", _format_labels(self.label_names, labels), total
+            yield "_count", _format_labels(self.label_names, labels), count
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Register a metric. Returns it so registration can be chained.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry served at /metrics
+registry = MetricsRegistry()
+
+# Ingestion and chat pipeline stages: pdf_extract, sanitize, llm_extract,
+# llm_categorize, llm_chat, json_parse, db_commit
+STAGE_DURATION = registry.register(Histogram(
+    "finance_assistant_stage_duration_seconds", "Duration of ingestion and chat pipeline stages", ["stage"]
+))
+
+REQUEST_DURATION = registry.register(Histogram(
+    "finance_assistant_http_request_duration_seconds",
+    "HTTP request duration by route template, until the response body is sent",
+    ["method", "route", "status"]
+))
+
+DB_POOL_EVENTS = registry.register(Counter(
+    "finance_assistant_db_pool_events_total",
+    "Connection pool events (connect, checkout, checkin, invalidate)", ["engine", "event"]
+))
+
+DB_POOL_CONNECTIONS = registry.register(Gauge(
+    "finance_assistant_db_pool_connections",
+    "Connection pool occupancy at scrape time (size, checked_out, overflow, checked_in)", ["engine", "state"]
+))
+
+
+def stage_timer(stage: str):
+    """
+    Time a pipeline stage: ``with stage_timer("sanitize"): ...``
+    """
+    return STAGE_DURATION.time(stage)
+
+
+def _route_template(scope) -> str:
+    # FastAPI keeps the router prefix out of an included route's own path and
+    # records the full template on the effective route context instead
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request durations.
+
+    Requests are labelled with the matched route template (``/api/upload/jobs/{job_id}``,
+    not the raw path) so the number of series stays bounded; unmatched paths
+    share the ``unmatched`` label.
+    """
+
+    def __init__(self, app, on_request: Optional[Callable] = None):
+        self.app = app
+        # Extra per-request hook (the on-demand profiler); called with the scope
+        # and returns a callback to run when the request finishes, or None
+        self.on_request = on_request
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        finish = self.on_request(scope) if self.on_request is not None else None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUEST_DURATION.observe(elapsed, scope["method"], _route_template(scope), str(status_code))
+            if finish is not None:
+                finish()
@@ -0,0 +1,201 @@
+import cProfile
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Capture modes accepted by RequestProfiler.arm
+PROFILE_MODES = ("cprofile", "sampling")
+
+# Paths never captured, so scraping or polling the profiler does not use up the budget
+EXCLUDED_PATH_PREFIXES = ("/metrics", "/api/admin")
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the stacks of all other
+    threads every ``interval`` seconds. The output is in collapsed-stack format
+    (``thread;outer;...;inner count`` per line), which flamegraph.pl and
+    speedscope read directly.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """
+    Captures a profile of the next N requests to a file, armed through the admin API.
+
+    ``cprofile`` mode profiles the event loop thread while a captured request is
+    in flight, one request at a time; requests that arrive while another is being
+    profiled are not captured. Coroutines of other requests that run in between
+    are included, and work handed to thread pools is not. The result is a pstats
+    file (``python -m pstats``, snakeviz).
+
+    ``sampling`` mode samples every thread while any captured request is in
+    flight, so concurrent requests, thread pool work and ingestion workers are
+    all included, at a fixed cost per sample rather than per call.
+
+    When disarmed the per-request cost is one attribute check.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, sample_interval: Optional[float] = None):
+        self.output_dir = output_dir or settings.PROFILE_OUTPUT_DIR
+        self.sample_interval = sample_interval if sample_interval is not None else settings.PROFILE_SAMPLE_INTERVAL
+        self.armed = False
+        self._lock = threading.Lock()
+        self._mode: Optional[str] = None
+        self._path_prefix = "/"
+        self._remaining = 0
+        self._captured = 0
+        self._in_flight = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._started_at: Optional[datetime] = None
+        self.outputs: List[str] = []
+
+    def arm(self, requests: int, mode: str = "cprofile", path_prefix: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start capturing the next ``requests`` requests whose path starts with ``path_prefix``.
+
+        Raises:
+            ValueError: For an unknown mode or request count, or if a capture is already running
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'; use one of {', '.join(PROFILE_MODES)}")
+        if not 1 <= requests <= settings.PROFILE_MAX_REQUESTS:
+            raise ValueError(f"requests must be between 1 and {settings.PROFILE_MAX_REQUESTS}")
+        with self._lock:
+            if self.armed:
+                raise ValueError("A profile capture is already running")
+            self._mode = mode
+            self._path_prefix = path_prefix or "/"
+            self._remaining = requests
+            self._captured = 0
+            self._in_flight = 0
+            self._started_at = datetime.now()
+            if mode == "cprofile":
+                self._profile = cProfile.Profile()
+            else:
+                self._sampler = StackSampler(self.sample_interval)
+            self.armed = True
+        return self.status()
+
+    def cancel(self) -> Dict[str, Any]:
+        """
+        Stop capturing now, writing whatever was captured so far.
+        """
+        with self._lock:
+            if self.armed:
+                self._remaining = 0
+                if self._in_flight == 0:
+                    self._finish_locked()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "armed": self.armed,
+            "mode": self._mode,
+            "path_prefix": self._path_prefix,
+            "remaining": self._remaining,
+            "captured": self._captured,
+            "outputs": list(self.outputs),
+        }
+
+    def on_request(self, scope) -> Optional[Callable[[], None]]:
+        """
+        Claim a request for the capture if one is running.
+
+        Returns:
+            A callback to run when the request finishes, or None if it is not captured
+        """
+        if not self.armed:
+            return None
+        path = scope.get("path", "")
+        if not path.startswith(self._path_prefix) or path.startswith(EXCLUDED_PATH_PREFIXES):
+            return None
+
+        with self._lock:
+            if not self.armed or self._remaining == 0:
+                return None
+            if self._mode == "cprofile" and self._in_flight:
+                # cProfile can only follow one request at a time on the loop thread
+                return None
+            self._remaining -= 1
+            self._captured += 1
+            self._in_flight += 1
+            if self._mode == "cprofile":
+                self._profile.enable()
+            elif self._in_flight == 1 and self._sampler._thread is None:
+                self._sampler.start()
+
+        return self._request_finished
+
+    def _request_finished(self):
+        with self._lock:
+            if self._mode == "cprofile":
+                self._profile.disable()
+            self._in_flight -= 1
+            if self._remaining == 0 and self._in_flight == 0 and self.armed:
+                self._finish_locked()
+
+    def _finish_locked(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = self._started_at.strftime("%Y%m%d-%H%M%S")
+        if self._mode == "cprofile":
+            path = os.path.join(self.output_dir, f"profile-{stamp}-{self._captured}req.prof")
+            self._profile.dump_stats(path)
+            self._profile = None
+        else:
+            path = os.path.join(self.output_dir, f"profile-{stamp}-{self._captured}req.collapsed")
+            self._sampler.stop()
+            self._sampler.dump(path)
+            self._sampler = None
+        self.outputs = (self.outputs + [path])[-20:]
+        self.armed = False
+        logger.info("Profile of %d requests written to %s", self._captured, path)
+
+
+# Shared profiler, hooked into the metrics middleware
+request_profiler = RequestProfiler()
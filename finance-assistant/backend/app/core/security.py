@@ -1,72 +1,299 @@
-from datetime import datetime, timedelta
-from typing import Optional
-
-
-from fastapi import Depends, HTTPException, status, Header
-from fastapi.security import APIKeyHeader
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-
-
-from app.core.config import settings
-from app.core.database import get_db
-from app.models.user import User
-
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-# API Key authentication
-api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
-
-
-def verify_password(plain_password, hashed_password):
-    """
-    Verify if the plain password matches the hashed password.
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password):
-    """
-    Hash a password using bcrypt.
-    """
-    return pwd_context.hash(password)
-
-
-def verify_api_key(api_key: str = Depends(api_key_header)):
-    """
-    Verify the API key from the request header.
-    """
-    if api_key is None or api_key != settings.API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing API key"
-        )
-    return api_key
-
-
-def get_current_user_simple(db: Session = Depends(get_db)):
-    """
-    Get a default user for API key authentication.
-    For now, returns the first active user or creates a default one.
-    """
-    # Try to get the first active user
-    user = db.query(User).filter(User.is_active == True).first()
-   
-    if user is None:
-        # Create a default user if none exists
-        default_user = User(
-            email="api@finance-assistant.com",
-            first_name="API",
-            last_name="User",
-            hashed_password=get_password_hash("default_password"),
-            is_active=True
-        )
-        db.add(default_user)
-        db.commit()
-        db.refresh(default_user)
-        return default_user
-   
-    return user
\ No newline at end of file
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+
+from fastapi import Depends, HTTPException, status, Header
+from fastapi.security import APIKeyHeader
+from passlib.context import CryptContext
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.models.user import User
+from app.models.api_key import ApiKey
+
+
+# Password hashing context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Dedicated threads for bcrypt so hashing never blocks the event loop or starves the request thread pool
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+# API Key authentication
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+# Operator key for the admin endpoints; never sent by the frontend
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+# Prefix of generated per-user API keys
+API_KEY_PREFIX = "fa_"
+
+
+def verify_password(plain_password, hashed_password):
+    """
+    Verify if the plain password matches the hashed password.
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password):
+    """
+    Hash a password using bcrypt.
+    """
+    return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key for storage and lookup.
+
+    Generated keys carry 256 bits of randomness, so a single SHA-256 is enough
+    and keeps lookups cheap; bcrypt would put ~250 ms on every cache miss.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def generate_api_key() -> str:
+    """
+    Generate a new random API key.
+    """
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+class ApiPrincipal:
+    """
+    The user an API key resolves to.
+    """
+
+    def __init__(self, user: User, shared_key: bool = False):
+        self.user = user
+        # True for the deployment-wide settings.API_KEY, which acts as the default user
+        self.shared_key = shared_key
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache from API key hash to resolved principal.
+
+    Unknown keys are remembered in a separate, much smaller LRU (as None) so a
+    repeated bad key does not reach the database, while a flood of random keys
+    only churns that LRU and never evicts valid keys. Entries expire after
+    ``ttl`` seconds; ``invalidate_key`` drops one immediately when a key is
+    issued or revoked.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                 max_misses: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else settings.API_KEY_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else settings.API_KEY_CACHE_MAX_ENTRIES
+        self.max_misses = max_misses if max_misses is not None else settings.API_KEY_CACHE_MAX_MISSES
+        self._entries: Dict[str, Tuple[float, ApiPrincipal]] = {}
+        self._misses: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash: str) -> Tuple[bool, Optional[ApiPrincipal]]:
+        """
+        Returns:
+            (hit, principal); principal is None for a cached unknown key
+        """
+        entry = self._entries.get(key_hash)
+        if entry is not None:
+            expires_at, principal = entry
+            if time.monotonic() < expires_at:
+                return True, principal
+            with self._lock:
+                self._entries.pop(key_hash, None)
+            return False, None
+
+        with self._lock:
+            expires_at = self._misses.get(key_hash)
+            if expires_at is None:
+                return False, None
+            if time.monotonic() >= expires_at:
+                del self._misses[key_hash]
+                return False, None
+            self._misses.move_to_end(key_hash)
+            return True, None
+
+    def set(self, key_hash: str, principal: Optional[ApiPrincipal]):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if principal is None:
+                if self.max_misses <= 0:
+                    return
+                self._misses[key_hash] = expires_at
+                self._misses.move_to_end(key_hash)
+                while len(self._misses) > self.max_misses:
+                    self._misses.popitem(last=False)
+                return
+            self._misses.pop(key_hash, None)
+            if len(self._entries) >= self.max_entries and key_hash not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key_hash] = (expires_at, principal)
+
+    def invalidate_key(self, key_hash: str):
+        with self._lock:
+            self._entries.pop(key_hash, None)
+            self._misses.pop(key_hash, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._misses.clear()
+
+
+# Shared principal cache
+principal_cache = PrincipalCache()
+
+# In-flight database lookups by key hash, so concurrent misses for one key share a single lookup
+_pending_resolutions: Dict[str, "asyncio.Future"] = {}
+
+
+def _get_default_user(db: Session) -> User:
+    """
+    The user behind the shared deployment key: the first active user, created if none exists.
+    """
+    user = db.query(User).filter(User.is_active == True).order_by(User.id).first()
+
+    if user is None:
+        # Create a default user if none exists
+        user = User(
+            email="api@finance-assistant.com",
+            first_name="API",
+            last_name="User",
+            hashed_password=get_password_hash("default_password"),
+            is_active=True
+        )
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.rollback()
+            return db.query(User).filter(User.is_active == True).order_by(User.id).first()
+        db.refresh(user)
+
+    return user
+
+
+def resolve_api_key(api_key: str) -> Optional[ApiPrincipal]:
+    """
+    Resolve an API key against the database (cache miss path; blocking).
+
+    Per-user keys are looked up by hash; the shared settings.API_KEY resolves to
+    the default user, as before per-user keys existed.
+    """
+    db = SessionLocal()
+    try:
+        user = db.query(User).join(ApiKey, ApiKey.user_id == User.id).filter(
+            ApiKey.key_hash == hash_api_key(api_key),
+            ApiKey.is_active == True,
+            User.is_active == True
+        ).first()
+        principal = ApiPrincipal(user) if user is not None else None
+
+        if principal is None and hmac.compare_digest(api_key.encode(), settings.API_KEY.encode()):
+            principal = ApiPrincipal(_get_default_user(db), shared_key=True)
+
+        if principal is not None:
+            # Cached across requests, so detach it from this short-lived session
+            db.expunge(principal.user)
+        return principal
+    finally:
+        db.close()
+
+
+async def get_api_principal(api_key: str = Depends(api_key_header)) -> ApiPrincipal:
+    """
+    Resolve the request's API key, from the in-process cache when possible.
+    FastAPI resolves this once per request for both auth dependencies below.
+    """
+    if api_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+
+    key_hash = hash_api_key(api_key)
+    hit, principal = principal_cache.get(key_hash)
+    if not hit:
+        pending = _pending_resolutions.get(key_hash)
+        if pending is None:
+            pending = asyncio.ensure_future(run_in_threadpool(resolve_api_key, api_key))
+            _pending_resolutions[key_hash] = pending
+            pending.add_done_callback(lambda _: _pending_resolutions.pop(key_hash, None))
+        # Shielded so one cancelled request does not cancel the lookup other requests wait on
+        principal = await asyncio.shield(pending)
+        principal_cache.set(key_hash, principal)
+
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key"
+        )
+    return principal
+
+
+async def verify_api_key(
+    api_key: str = Depends(api_key_header),
+    principal: ApiPrincipal = Depends(get_api_principal)
+):
+    """
+    Verify the API key from the request header.
+    """
+    return api_key
+
+
+async def require_admin(admin_key: Optional[str] = Depends(admin_key_header)) -> str:
+    """
+    Allow only requests carrying settings.ADMIN_API_KEY in X-Admin-Key.
+
+    The shared API_KEY is not enough: it ships with the frontend. Admin endpoints
+    are disabled while ADMIN_API_KEY is unset.
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled; set ADMIN_API_KEY to enable them"
+        )
+    if admin_key is None or not hmac.compare_digest(admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access requires a valid X-Admin-Key"
+        )
+    return admin_key
+
+
+async def get_current_user_simple(principal: ApiPrincipal = Depends(get_api_principal)) -> User:
+    """
+    Get the user the request's API key belongs to.
+    The shared deployment key maps to the first active user (created if none exists).
+    """
+    return principal.user
@@ -1,67 +1,146 @@
-from pathlib import Path
-from dotenv import load_dotenv
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.middleware.cors import CORSMiddleware
-
-
-from app.core.config import settings
-from app.core.database import init_db
-
-
-dotenv_path = Path('.env')
-load_dotenv(dotenv_path=dotenv_path)
-
-
-app = FastAPI(
-    title="Finance Assistant API",
-    description="Backend API for Finance Assistant application",
-    version="0.1.0"
-)
-
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """
-    Initialize database tables on startup.
-    """
-    init_db()
-
-
-@app.get("/", tags=["Root"])
-async def root():
-    """
-    Root endpoint for health check.
-    """
-    return {"message": "Finance Assistant API is running"}
-
-
-# Import and include API routers
-from app.api.auth import router as auth_router
-from app.api.finance import router as finance_router
-from app.api.upload import router as upload_router
-from app.api.chat import router as chat_router
-
-
-app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(finance_router, prefix="/api/finance", tags=["Finance"])
-app.include_router(upload_router, prefix="/api/upload", tags=["Upload"])
-app.include_router(chat_router, prefix="/api/chat", tags=["Chat"])
-
-
-def get_application():
-    return app
-
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:get_application", host="0.0.0.0", port=8000, reload=True)
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
+from fastapi.middleware.cors import CORSMiddleware
+
+
+from app.core.config import settings
+from app.core.database import init_db, ensure_schema
+from app.core.metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, registry
+from app.core.profiling import request_profiler
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.uploads import RequestBodyLimitMiddleware
+from app.api.upload import request_body_limits
+
+
+dotenv_path = Path('.env')
+load_dotenv(dotenv_path=dotenv_path)
+
+# Application log records (app.*) go to stderr next to uvicorn's own logs;
+# the root logger is left alone so library request logs stay quiet
+app_logger = logging.getLogger("app")
+app_logger.setLevel(settings.LOG_LEVEL)
+if not app_logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(_log_handler)
+
+
+app = FastAPI(
+    title="Finance Assistant API",
+    description="Backend API for Finance Assistant application",
+    version="0.1.0"
+)
+
+
+# Turn away oversized uploads before their multipart body is spooled; added
+# first so the CORS headers are still set on the 413 response
+app.add_middleware(RequestBodyLimitMiddleware, limits=request_body_limits("/api/upload"))
+
+# Configure CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+)
+
+# Per-route request timing, and the hook for on-demand profiling
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, on_request=request_profiler.on_request)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Bring the database schema up to date on startup and resume unfinished ingestion jobs.
+    """
+    if settings.DB_SCHEMA_MODE == "create":
+        init_db()
+        schema_changed = True
+    elif settings.DB_SCHEMA_MODE == "check":
+        schema_changed = ensure_schema()
+    else:
+        schema_changed = False
+   
+    # Backfill summary rollups and import fingerprints the first time they are deployed
+    if schema_changed:
+        from app.core.database import SessionLocal
+        from app.services.rollups import monthly_rollups
+        from app.services.transactions import backfill_fingerprints
+        db = SessionLocal()
+        try:
+            if monthly_rollups.rebuild_if_empty(db):
+                db.commit()
+            if backfill_fingerprints(db):
+                db.commit()
+        finally:
+            db.close()
+   
+    from app.services.ingestion import ingestion_jobs
+    ingestion_jobs.recover()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop ingestion and PDF extraction workers, and close pooled LLM HTTP clients and database connections on shutdown.
+    """
+    from app.services.ingestion import ingestion_jobs
+    ingestion_jobs.shutdown()
+    
+    from app.services.pdf import pdf_text_extractor
+    pdf_text_extractor.shutdown()
+   
+    from app.services.chat import close_llm_clients
+    await close_llm_clients()
+   
+    from app.core.database import close_async_engine
+    await close_async_engine()
+
+
+@app.get("/", tags=["Root"])
+async def root():
+    """
+    Root endpoint for health check.
+    """
+    return {"message": "Finance Assistant API is running"}
+
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def metrics(request: Request):
+    """
+    Metrics in the Prometheus text format.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# Import and include API routers
+from app.api.auth import router as auth_router
+from app.api.finance import router as finance_router
+from app.api.upload import router as upload_router
+from app.api.chat import router as chat_router
+from app.api.admin import router as admin_router
+
+
+app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
+app.include_router(finance_router, prefix="/api/finance", tags=["Finance"])
+app.include_router(upload_router, prefix="/api/upload", tags=["Upload"])
+app.include_router(chat_router, prefix="/api/chat", tags=["Chat"])
+app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
+
+
+def get_application():
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("main:get_application", host="0.0.0.0", port=8000, reload=True)
@@ -1 +1 @@
-# Initialize models module
+# Initialize models module
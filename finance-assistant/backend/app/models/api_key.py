@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class ApiKey(Base):
+    """
+    Per-user API key. Only the SHA-256 of the key is stored.
+    """
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    key_hash = Column(String(64), unique=True, index=True, nullable=False)
+    prefix = Column(String(12), nullable=False)  # First characters of the key, for display
+    name = Column(String(100), nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class IngestionJob(Base):
+    """
+    Bank statement ingestion job database model.
+    """
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String(36), primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(1024), nullable=False)
+    file_size = Column(Integer, nullable=True)
+    file_sha256 = Column(String(64), nullable=True, index=True)
+    file_format = Column(String(10), nullable=True)  # 'pdf', 'csv', 'ofx'; NULL for jobs queued before CSV/OFX import
+    import_options = Column(Text, nullable=True)  # CSV column mapping as JSON
+    status = Column(String(20), nullable=False, index=True)  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    stage = Column(String(50), nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    transaction_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=True, default=0)  # rows skipped as already imported
+    unreadable_count = Column(Integer, nullable=True)  # CSV/OFX rows that could not be parsed; NULL for PDFs
+    error = Column(String(1000), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class MerchantCategory(Base):
+    """
+    Per-user merchant-to-category observation counts used for local categorization.
+    """
+    __tablename__ = "merchant_categories"
+    __table_args__ = (
+        UniqueConstraint("user_id", "merchant_key", "category", name="uq_merchant_categories_user_key_category"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    merchant_key = Column(String(100), nullable=False)
+    category = Column(String(100), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
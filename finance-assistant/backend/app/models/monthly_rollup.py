@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class MonthlyRollup(Base):
+    """
+    Per-user monthly transaction totals by type and category, maintained on insert.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "year", "month", "transaction_type", "category",
+                         name="uq_monthly_rollups_user_month_type_category"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    transaction_type = Column(String(50), nullable=False)
+    category = Column(String(100), nullable=False)  # 'Uncategorized' when the transaction has none
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class SchemaVersion(Base):
+    """
+    Schema versions applied to this database, newest last; checked on startup
+    so create_all only runs when the models changed.
+    """
+    __tablename__ = "schema_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(String(32), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
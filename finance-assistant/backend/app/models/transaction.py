@@ -1,29 +1,44 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-
-from app.core.database import Base
-
-class Transaction(Base):
-    """
-    Financial transaction database model.
-    """
-    __tablename__ = "transactions"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    date = Column(DateTime, nullable=False)
-    description = Column(String(255), nullable=False)
-    amount = Column(Float, nullable=False)
-    category = Column(String(100), nullable=True)
-    transaction_type = Column(String(50), nullable=False)  # 'expense', 'income', 'investment'
-    source = Column(String(100), nullable=False)  # 'manual', 'bank_statement'
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-    # Relationship
-    user = relationship("User", back_populates="transactions")
-
-# Add relationship to User model
-from app.models.user import User
-User.transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+class Transaction(Base):
+    """
+    Financial transaction database model.
+    """
+    __tablename__ = "transactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    date = Column(DateTime, nullable=False)
+    description = Column(String(255), nullable=False)
+    amount = Column(Float, nullable=False)
+    category = Column(String(100), nullable=True)
+    transaction_type = Column(String(50), nullable=False)  # 'expense', 'income', 'investment'
+    source = Column(String(100), nullable=False)  # 'manual', 'bank_statement'
+    # SHA-256 of the normalized row, set on imported rows only (see app/services/transactions.py)
+    fingerprint = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationship
+    user = relationship("User", back_populates="transactions")
+
+# Composite indexes for per-user queries: the listing order, and summary date ranges by type
+Index("ix_transactions_user_date_id", Transaction.user_id, Transaction.date.desc(), Transaction.id.desc())
+Index("ix_transactions_user_type_date", Transaction.user_id, Transaction.transaction_type, Transaction.date)
+
+# Imported rows are unique by fingerprint; manual rows have none, so the index is
+# filtered (SQL Server would otherwise allow only one NULL in a unique index)
+Index(
+    "ix_transactions_fingerprint", Transaction.fingerprint, unique=True,
+    mssql_where=Transaction.fingerprint.isnot(None),
+    postgresql_where=Transaction.fingerprint.isnot(None),
+    sqlite_where=Transaction.fingerprint.isnot(None)
+)
+
+# Add relationship to User model
+from app.models.user import User
+User.transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
@@ -1 +1 @@
-# Initialize schemas module
+# Initialize schemas module
@@ -0,0 +1,30 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class ApiKeyCreate(BaseModel):
+    """
+    API key creation schema.
+    """
+    name: Optional[str] = Field(None, max_length=100)
+
+class ApiKey(BaseModel):
+    """
+    API key response schema (never includes the key itself).
+    """
+    id: int
+    user_id: int
+    prefix: str
+    name: Optional[str] = None
+    is_active: bool
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class ApiKeyCreated(ApiKey):
+    """
+    API key creation response; the only time the plain key is returned.
+    """
+    key: str
@@ -0,0 +1,45 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class IngestionJob(BaseModel):
+    """
+    Ingestion job response schema.
+    """
+    id: str
+    filename: str
+    file_size: Optional[int] = None
+    file_sha256: Optional[str] = None
+    file_format: Optional[str] = None  # 'pdf', 'csv', 'ofx'
+    status: str  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    stage: Optional[str] = None
+    progress: int
+    transaction_count: int
+    duplicate_count: Optional[int] = None
+    unreadable_count: Optional[int] = None  # CSV/OFX imports only
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class BatchUploadFile(BaseModel):
+    """
+    Batch upload result for one statement: its queued job, or why it was rejected.
+    """
+    filename: str
+    job: Optional[IngestionJob] = None
+    error: Optional[str] = None
+
+
+class BatchUpload(BaseModel):
+    """
+    Batch upload response schema.
+    """
+    queued: int
+    rejected: int
+    files: List[BatchUploadFile]
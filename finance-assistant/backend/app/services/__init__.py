@@ -1 +1 @@
-# Initialize services module
+# Initialize services module
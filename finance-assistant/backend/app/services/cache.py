@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Cache levels, in pipeline order
+CACHE_LEVELS = ('text', 'sanitized', 'parsed')
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed key from a file hash and the versions of the
+    pipeline stages that produced a value.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 64 * 1024) -> str:
+    """
+    Compute the SHA-256 hash of a file without loading it into memory.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestionCache:
+    """
+    Content-addressed disk cache for the ingestion pipeline.
+
+    Values are JSON documents stored under ``<directory>/<level>/<key[:2]>/<key>.json``.
+    The total size is bounded by ``max_bytes``; when it is exceeded the least
+    recently used entries are evicted (a hit refreshes the entry's mtime).
+    Entries may contain statement text, so files are created owner-readable only.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        self.directory = directory or settings.INGESTION_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.INGESTION_CACHE_MAX_BYTES
+        self.enabled = enabled if enabled is not None else settings.INGESTION_CACHE_ENABLED
+        self._lock = threading.Lock()
+        # path -> (size, last used); loaded from disk on first use
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        self.hits = {level: 0 for level in CACHE_LEVELS}
+        self.misses = {level: 0 for level in CACHE_LEVELS}
+
+    def _path(self, level: str, key: str) -> str:
+        return os.path.join(self.directory, level, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        for level in CACHE_LEVELS:
+            level_dir = os.path.join(self.directory, level)
+            if not os.path.isdir(level_dir):
+                continue
+            for root, _, files in os.walk(level_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    self._index[path] = (stat.st_size, stat.st_mtime)
+                    self._total_bytes += stat.st_size
+
+    def get(self, level: str, key: str) -> Optional[Any]:
+        """
+        Get a cached value, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(level, key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)['value']
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses[level] += 1
+            return None
+
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits[level] += 1
+            if self._index is not None and path in self._index:
+                self._index[path] = (self._index[path][0], now)
+        return value
+
+    def set(self, level: str, key: str, value: Any):
+        """
+        Store a value and evict least recently used entries if over the size limit.
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(level, key)
+        data = json.dumps({'value': value}).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("Error writing ingestion cache entry: %s", e)
+            return
+
+        with self._lock:
+            self._load_index()
+            previous = self._index.get(path)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._index[path] = (len(data), time.time())
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            del self._index[path]
+            self._total_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit and miss counters per level, and the current cache size.
+        """
+        with self._lock:
+            self._load_index()
+            return {
+                'enabled': self.enabled,
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'entries': len(self._index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+# Shared cache instance
+ingestion_cache = IngestionCache()
@@ -0,0 +1,284 @@
+import re
+import json
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.models.merchant_category import MerchantCategory
+from app.models.transaction import Transaction
+from app.services.chat import get_llm
+from app.utils.upsert import upsert_rows
+
+
+logger = logging.getLogger(__name__)
+
+# Categories used by the extraction prompt
+TRANSACTION_CATEGORIES = [
+    'Food & Dining', 'Transportation', 'Shopping', 'Entertainment', 'Healthcare', 'Utilities',
+    'Groceries', 'Gas', 'ATM', 'Transfer', 'Salary', 'Investment', 'Insurance', 'Education',
+    'Travel', 'Other'
+]
+
+# Categories that carry no information and are never learned
+UNINFORMATIVE_CATEGORIES = {None, '', 'Uncategorized'}
+
+# Global seed rules, checked in order after the user's own history
+GLOBAL_SEED_RULES = [
+    (r'\buber\s*eats\b|\bdoordash\b|\bgrubhub\b', 'Food & Dining'),
+    (r'\bstarbucks\b|\bmcdonald|\bchipotle\b|\bsubway\b|\bdunkin\b|\brestaurant\b|\bcafe\b|\bcoffee\b', 'Food & Dining'),
+    (r'\buber\b|\blyft\b|\bparking\b|\btransit\b|\bmetro\b', 'Transportation'),
+    (r'\bshell\b|\bchevron\b|\bexxon\b|\bmobil\b|\bgas station\b', 'Gas'),
+    (r'\bwalmart\b|\bkroger\b|\bwhole foods\b|\bsafeway\b|\btrader joe|\baldi\b|\bcostco\b', 'Groceries'),
+    (r'\bamazon\b|\btarget\b|\bbest buy\b|\bebay\b', 'Shopping'),
+    (r'\bnetflix\b|\bspotify\b|\bhulu\b|\bdisney\b|\bsteam\b', 'Entertainment'),
+    (r'\bcvs\b|\bwalgreens\b|\bpharmacy\b|\bhospital\b|\bclinic\b', 'Healthcare'),
+    (r'\bcomcast\b|\bverizon\b|\bat&t\b|\butility\b|\belectric\b|\bwater\b', 'Utilities'),
+    (r'\bpayroll\b|\bdirect deposit\b|\bsalary\b', 'Salary'),
+    (r'\batm\b|\bcash withdrawal\b', 'ATM'),
+    (r'\bzelle\b|\bvenmo\b|\bpaypal\b|\btransfer\b', 'Transfer'),
+    (r'\bairline|\bhotel\b|\bairbnb\b|\bexpedia\b', 'Travel'),
+    (r'\binsurance\b|\bgeico\b|\bprogressive\b', 'Insurance'),
+    (r'\btuition\b|\buniversity\b|\bcoursera\b', 'Education'),
+    (r'\bvanguard\b|\bfidelity\b|\brobinhood\b|\bschwab\b', 'Investment'),
+]
+
+# Confidence assigned to a seed rule match
+SEED_RULE_CONFIDENCE = 0.9
+
+# Words that name a kind of transaction rather than a merchant; a key made up
+# only of these ("check", "credit") would lump unrelated payees together
+GENERIC_MERCHANT_WORDS = frozenset({
+    'check', 'cheque', 'payment', 'transfer', 'deposit', 'withdrawal', 'credit', 'debit', 'fee',
+    'to', 'from', 'for', 'of', 'the'
+})
+
+# Unique key of the merchant index (uq_merchant_categories_user_key_category)
+MERCHANT_INDEX_KEY = ('user_id', 'merchant_key', 'category')
+
+# Sanitizer placeholders ("[NAME REMOVED]"); they say nothing about the merchant
+_PLACEHOLDER_PATTERN = re.compile(r'\[[A-Z ]+ REMOVED\]')
+_DIGITS_PATTERN = re.compile(r'\d+')
+_NON_WORD_PATTERN = re.compile(r"[^a-z&' ]+")
+_NOISE_PATTERN = re.compile(
+    r'\b(?:pos|purchase|debit|card|checkcard|recurring|payment|online|web|ach|visa|mc|www|com|inc|llc|co)\b'
+)
+
+
+@lru_cache(maxsize=16384)
+def normalize_merchant(description: Optional[str]) -> str:
+    """
+    Reduce a transaction description to a stable merchant key.
+
+    Store numbers, reference ids, punctuation, sanitizer placeholders and
+    card/POS noise words are removed, and the first three remaining words are
+    kept, so "POS STARBUCKS #1234 SEATTLE" and "Starbucks 5678 Seattle" share a
+    key. Descriptions with nothing but generic words left ("Check #1042",
+    "[NAME REMOVED] 0231") get no key, so they are neither learned nor looked
+    up. Cached, as long imports repeat the same descriptions.
+    """
+    if not description:
+        return ''
+    text = _PLACEHOLDER_PATTERN.sub(' ', description).lower()
+    text = _DIGITS_PATTERN.sub(' ', text)
+    text = _NON_WORD_PATTERN.sub(' ', text)
+    text = _NOISE_PATTERN.sub(' ', text)
+    words = text.split()[:3]
+    if all(word in GENERIC_MERCHANT_WORDS for word in words):
+        return ''
+    return ' '.join(words)[:100]
+
+
+class MerchantCategorizer:
+    """
+    Categorizes transactions from a per-user merchant index and global seed rules.
+
+    The index stores, for each user and normalized merchant key, how often each
+    category was seen. A description is categorized locally when its key's top
+    category has at least ``min_count`` observations and ``min_confidence`` share,
+    or when a seed rule matches. Only the remaining descriptions go to the LLM.
+    """
+
+    def __init__(self, min_confidence: Optional[float] = None, min_count: Optional[int] = None):
+        self.min_confidence = min_confidence if min_confidence is not None else settings.CATEGORIZER_MIN_CONFIDENCE
+        self.min_count = min_count if min_count is not None else settings.CATEGORIZER_MIN_COUNT
+        self.seed_rules = [(re.compile(pattern), category) for pattern, category in GLOBAL_SEED_RULES]
+
+    def rebuild_user_index(self, db: Session, user_id: int):
+        """
+        Rebuild a user's merchant index from their transaction history.
+        Changes are added to the session; the caller commits.
+        """
+        history = db.query(
+            Transaction.description, Transaction.category, func.count(Transaction.id)
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.category.isnot(None)
+        ).group_by(Transaction.description, Transaction.category).all()
+
+        counts = defaultdict(int)
+        for description, category, count in history:
+            key = normalize_merchant(description)
+            if key and category not in UNINFORMATIVE_CATEGORIES:
+                counts[(key, category)] += count
+
+        db.query(MerchantCategory).filter(MerchantCategory.user_id == user_id).delete(synchronize_session=False)
+        # A concurrent ingestion may rebuild the same index; both compute the
+        # same counts, so the later write simply replaces them
+        upsert_rows(db, MerchantCategory.__table__, MERCHANT_INDEX_KEY, [
+            {'user_id': user_id, 'merchant_key': key, 'category': category, 'count': count}
+            for (key, category), count in counts.items()
+        ], replace=('count',))
+
+    def _ensure_user_index(self, db: Session, user_id: int):
+        has_index = db.query(MerchantCategory.id).filter(MerchantCategory.user_id == user_id).first()
+        if has_index is None:
+            has_history = db.query(Transaction.id).filter(Transaction.user_id == user_id).first()
+            if has_history is not None:
+                self.rebuild_user_index(db, user_id)
+
+    def lookup(self, db: Session, user_id: int, descriptions: List[str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Categorize descriptions locally.
+
+        Returns:
+            Mapping of description to (category, confidence) for the descriptions
+            resolved with enough confidence; unknown descriptions are omitted
+        """
+        self._ensure_user_index(db, user_id)
+
+        keys = {description: normalize_merchant(description) for description in descriptions}
+        distinct_keys = {key for key in keys.values() if key}
+
+        # One query for all keys in the statement
+        observed = defaultdict(dict)
+        if distinct_keys:
+            for row in db.query(MerchantCategory).filter(
+                MerchantCategory.user_id == user_id,
+                MerchantCategory.merchant_key.in_(distinct_keys)
+            ).all():
+                observed[row.merchant_key][row.category] = row.count
+
+        resolved = {}
+        for description, key in keys.items():
+            categories = observed.get(key)
+            if categories:
+                category, count = max(categories.items(), key=lambda item: item[1])
+                confidence = count / sum(categories.values())
+                if count >= self.min_count and confidence >= self.min_confidence:
+                    resolved[description] = (category, confidence)
+                    continue
+            seed_text = ' '.join((description or '').lower().split())
+            for pattern, category in self.seed_rules:
+                if pattern.search(seed_text):
+                    resolved[description] = (category, SEED_RULE_CONFIDENCE)
+                    break
+        return resolved
+
+    def record(self, db: Session, user_id: int, transactions_data: List[Dict[str, Any]]):
+        """
+        Add categorized transactions to the user's index.
+        Runs in the session's transaction so it commits with the transactions.
+        """
+        counts = defaultdict(int)
+        for data in transactions_data:
+            key = normalize_merchant(data.get('description'))
+            category = data.get('category')
+            if key and category not in UNINFORMATIVE_CATEGORIES:
+                counts[(key, category)] += 1
+        if not counts:
+            return
+
+        # Counts are added in SQL, so ingestions of the same user's statements
+        # running in parallel can record the same new merchant
+        upsert_rows(db, MerchantCategory.__table__, MERCHANT_INDEX_KEY, [
+            {'user_id': user_id, 'merchant_key': key, 'category': category, 'count': count}
+            for (key, category), count in counts.items()
+        ], increment=('count',))
+
+    def categorize(self, db: Session, user_id: int, transactions_data: List[Dict[str, Any]],
+                   use_llm: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fill in transaction categories, asking the LLM only about unknown merchants.
+
+        Confident local matches take precedence over categories already present
+        (e.g. from an imported file's category column) so a merchant is categorized the same
+        way every month. With ``use_llm=False`` unknown merchants keep the
+        category they came with.
+        """
+        descriptions = list({data.get('description') or '' for data in transactions_data})
+        resolved = self.lookup(db, user_id, descriptions)
+
+        unknown = sorted({
+            data.get('description') or '' for data in transactions_data
+            if (data.get('description') or '') not in resolved and data.get('category') in UNINFORMATIVE_CATEGORIES
+        })
+        llm_categories = categorize_with_llm(unknown) if unknown and use_llm else {}
+
+        for data in transactions_data:
+            description = data.get('description') or ''
+            if description in resolved:
+                data['category'] = resolved[description][0]
+            elif data.get('category') in UNINFORMATIVE_CATEGORIES and description in llm_categories:
+                data['category'] = llm_categories[description]
+        return transactions_data
+
+
+def categorize_with_llm(descriptions: List[str]) -> Dict[str, str]:
+    """
+    Ask the LLM to categorize transaction descriptions.
+
+    Args:
+        descriptions: Distinct descriptions the local index could not resolve
+
+    Returns:
+        Mapping of description to category (descriptions the LLM skipped are omitted)
+    """
+    try:
+        from langchain_core.messages import HumanMessage, SystemMessage
+        llm = get_llm()
+
+        system_message = f"""
+        You categorize bank transaction descriptions.
+        Return a JSON object mapping each description exactly as given to one of these categories:
+        {', '.join(TRANSACTION_CATEGORIES)}
+
+        Return only a valid JSON object, no explanations or additional text.
+        """
+        human_message = json.dumps(descriptions)
+
+        with stage_timer("llm_categorize"):
+            response = llm.invoke([
+                SystemMessage(content=system_message),
+                HumanMessage(content=human_message)
+            ])
+
+        response_text = response.content.strip()
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        if start_idx == -1 or end_idx == 0:
+            logger.warning("No JSON object found in LLM categorization response")
+            return {}
+
+        with stage_timer("json_parse"):
+            categories = json.loads(response_text[start_idx:end_idx])
+        if not isinstance(categories, dict):
+            return {}
+        return {
+            description: category
+            for description, category in categories.items()
+            if description in descriptions and category in TRANSACTION_CATEGORIES
+        }
+
+    except Exception:
+        logger.exception("Error calling LLM for transaction categorization")
+        return {}
+
+
+# Shared categorizer instance
+merchant_categorizer = MerchantCategorizer()
@@ -1,215 +1,294 @@
-from typing import List, Dict, Any, Optional
-import os
-from datetime import datetime
-
-
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.graph import END, StateGraph
-
-
-from app.models.transaction import Transaction
-from app.core.config import settings
-
-
-# Configure the OpenAI client based on settings
-def get_llm():
-    """
-    Get LLM based on configuration.
-    """
-    # if settings.OPENAI_API_TYPE == "azure":
-    return  AzureChatOpenAI(
-        azure_deployment=settings.deployment_name,
-        azure_endpoint=settings.azure_endpoint,
-        api_key=settings.api_key,
-        api_version=settings.api_version,
-        temperature=0.7
-    )
-    # else:
-    #     return ChatOpenAI(
-    #         model="gpt-4",
-    #         temperature=0.7,
-    #         api_key=settings.OPENAI_API_KEY
-    #     )
-
-
-# Create a state graph for the conversation
-def create_conversation_graph():
-    """
-    Create a LangGraph conversation graph.
-    """
-    # Define the state
-    class ConversationState(dict):
-        user_id: str
-        message: str
-        transactions: List[Dict[str, Any]]
-        context: Optional[Dict[str, Any]] = None
-        response: Optional[str] = None
-   
-    # Define nodes
-    def add_context(state):
-        """Add financial context to the state."""
-        transactions = state.get("transactions", [])
-       
-        # Initialize default context
-        context = {
-            "total_income": 0.0,
-            "total_expense": 0.0,
-            "total_investment": 0.0,
-            "net_savings": 0.0,
-            "expense_by_category": {}
-        }
-       
-        # Only calculate metrics if there are transactions
-        if transactions:
-            # Calculate financial metrics
-            total_income = sum(t["amount"] for t in transactions if t["transaction_type"] == "income")
-            total_expense = sum(t["amount"] for t in transactions if t["transaction_type"] == "expense")
-            total_investment = sum(t["amount"] for t in transactions if t["transaction_type"] == "investment")
-           
-            # Group expenses by category
-            expense_by_category = {}
-            for t in transactions:
-                if t["transaction_type"] == "expense":
-                    category = t["category"] or "Uncategorized"
-                    if category in expense_by_category:
-                        expense_by_category[category] += t["amount"]
-                    else:
-                        expense_by_category[category] = t["amount"]
-           
-            # Update context with calculated values
-            context.update({
-                "total_income": total_income,
-                "total_expense": total_expense,
-                "total_investment": total_investment,
-                "net_savings": total_income - total_expense - total_investment,
-                "expense_by_category": expense_by_category
-            })
-       
-        # Add context to state
-        state["context"] = context
-       
-        return state
-   
-    def generate_response(state):
-        """Generate a response using the LLM."""
-        try:
-            llm = get_llm()
-       
-            context = state.get("context", {})
-            current_date = datetime.now().strftime("%B %d, %Y")
-       
-            # Check if there are any transactions
-            has_transactions = (
-                context and
-                context.get('total_income', 0) > 0 or
-                context.get('total_expense', 0) > 0 or
-                context.get('total_investment', 0) > 0
-            )
-       
-            if has_transactions:
-                # Create system message with financial context
-                system_message = f"""
-                You are a helpful financial assistant. Today is {current_date}.
-           
-                The user has the following financial information:
-                - Total Income: ${context['total_income']:.2f}
-                - Total Expenses: ${context['total_expense']:.2f}
-                - Total Investments: ${context['total_investment']:.2f}
-                - Net Savings: ${context['net_savings']:.2f}
-           
-                Expense Breakdown by Category:
-                {' '.join([f'- {cat}: ${amount:.2f}' for cat, amount in context['expense_by_category'].items()])}
-           
-                Provide helpful, concise financial advice and answer questions based on this data.
-                Be professional but friendly. Keep responses under 3 paragraphs.
-                """
-            else:
-                # Create general financial assistant system message
-                system_message = f"""
-                You are a helpful financial assistant. Today is {current_date}.
-           
-                The user hasn't provided any transaction data yet, so provide general financial advice,
-                budgeting tips, investment guidance, or answer their financial questions directly.
-           
-                You can help with:
-                - Personal finance advice
-                - Budgeting strategies
-                - Investment basics
-                - Saving tips
-                - Financial planning
-                - Expense tracking guidance
-           
-                Be professional but friendly. Keep responses under 3 paragraphs unless the user asks for detailed information.
-                """
-       
-            messages = [
-                SystemMessage(content=system_message),
-                HumanMessage(content=state["message"])
-            ]
-       
-            response = llm.invoke(messages)
-            state["response"] = response.content
-       
-            return state
-        except Exception as e:
-            print(f"❌ Error during response generation: {e}")
-   
-    # Create the graph
-    workflow = StateGraph(ConversationState)
-   
-    # Add nodes
-    workflow.add_node("add_context", add_context)
-    workflow.add_node("generate_response", generate_response)
-   
-    # Define edges
-    workflow.add_edge("add_context", "generate_response")
-    workflow.add_edge("generate_response", END)
-   
-    # Set entry point
-    workflow.set_entry_point("add_context")
-   
-    return workflow.compile()
-
-
-# Initialize the conversation graph
-conversation_graph = create_conversation_graph()
-
-
-async def generate_chat_response(user_id: int, message: str, transactions: List[Transaction]) -> str:
-    """
-    Generate a response to a user message using LangChain and LangGraph.
-   
-    Args:
-        user_id: User ID
-        message: User message
-        transactions: List of user transactions
-       
-    Returns:
-        Generated response
-    """
-    # Convert transactions to dictionaries
-    transaction_dicts = []
-    for t in transactions:
-        transaction_dicts.append({
-            "date": t.date.isoformat(),
-            "description": t.description,
-            "amount": t.amount,
-            "category": t.category,
-            "transaction_type": t.transaction_type,
-            "source": t.source
-        })
-   
-    # Create initial state
-    initial_state = {
-        "user_id": str(user_id),
-        "message": message,
-        "transactions": transaction_dicts
-    }
-   
-    # Run the conversation graph
-    result = conversation_graph.invoke(initial_state)
-   
-    return result["response"]
\ No newline at end of file
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Optional, Tuple
+import os
+import logging
+import threading
+from datetime import datetime
+
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+
+
+logger = logging.getLogger(__name__)
+
+# httpx, langchain and langgraph are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import AzureChatOpenAI
+
+
+# Shared HTTP clients and LLM instances, reused across requests so connections stay alive
+_http_client: Optional["httpx.Client"] = None
+_http_async_client: Optional["httpx.AsyncClient"] = None
+_llm_cache: Dict[Tuple[Optional[str], float], "AzureChatOpenAI"] = {}
+_llm_lock = threading.Lock()
+
+# Compiled conversation graph, built by get_conversation_graph on first use
+_conversation_graph = None
+_graph_lock = threading.Lock()
+
+
+def _get_http_clients() -> Tuple["httpx.Client", "httpx.AsyncClient"]:
+    """
+    Get the process-wide HTTP clients used by every LLM instance.
+    """
+    global _http_client, _http_async_client
+    if _http_client is None or _http_async_client is None:
+        import httpx
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(settings.LLM_HTTP_TIMEOUT)
+        _http_client = httpx.Client(limits=limits, timeout=timeout)
+        _http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+    return _http_client, _http_async_client
+
+
+# Configure the OpenAI client based on settings
+def get_llm(deployment_name: Optional[str] = None, temperature: float = 0.7):
+    """
+    Get LLM based on configuration.
+   
+    Instances are cached per deployment and temperature and share pooled
+    keep-alive HTTP clients, so repeated calls do not open new connections.
+    """
+    deployment_name = deployment_name or settings.deployment_name
+    key = (deployment_name, temperature)
+   
+    llm = _llm_cache.get(key)
+    if llm is not None:
+        return llm
+   
+    with _llm_lock:
+        llm = _llm_cache.get(key)
+        if llm is None:
+            if settings.LLM_PROVIDER == "fake":
+                # Offline provider with injected latency and errors, for load tests
+                from app.services.fake_llm import FakeChatModel
+                llm = FakeChatModel.from_settings()
+            else:
+                from langchain_openai import AzureChatOpenAI
+                http_client, http_async_client = _get_http_clients()
+                # if settings.OPENAI_API_TYPE == "azure":
+                llm = AzureChatOpenAI(
+                    azure_deployment=deployment_name,
+                    azure_endpoint=settings.azure_endpoint,
+                    api_key=settings.api_key,
+                    api_version=settings.api_version,
+                    temperature=temperature,
+                    http_client=http_client,
+                    http_async_client=http_async_client
+                )
+                # else:
+                #     return ChatOpenAI(
+                #         model="gpt-4",
+                #         temperature=0.7,
+                #         api_key=settings.OPENAI_API_KEY
+                #     )
+            _llm_cache[key] = llm
+    return llm
+
+
+async def close_llm_clients():
+    """
+    Close the pooled HTTP clients and drop cached LLM instances.
+    """
+    global _http_client, _http_async_client
+    with _llm_lock:
+        _llm_cache.clear()
+        http_client, http_async_client = _http_client, _http_async_client
+        _http_client = None
+        _http_async_client = None
+    if http_client is not None:
+        http_client.close()
+    if http_async_client is not None:
+        await http_async_client.aclose()
+
+
+# Create a state graph for the conversation
+def create_conversation_graph():
+    """
+    Create a LangGraph conversation graph.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from langgraph.graph import END, StateGraph
+   
+    # Define the state
+    class ConversationState(dict):
+        user_id: str
+        message: str
+        context: Optional[Dict[str, Any]] = None
+        response: Optional[str] = None
+   
+    # Define nodes
+    async def add_context(state):
+        """Add financial context to the state."""
+        # The context is aggregated in SQL by the caller; default to empty totals
+        context = {
+            "total_income": 0.0,
+            "total_expense": 0.0,
+            "total_investment": 0.0,
+            "net_savings": 0.0,
+            "expense_by_category": {}
+        }
+        context.update(state.get("context") or {})
+       
+        # Add context to state
+        state["context"] = context
+       
+        return state
+   
+    async def generate_response(state):
+        """Generate a response using the LLM."""
+        try:
+            llm = get_llm()
+       
+            context = state.get("context", {})
+            current_date = datetime.now().strftime("%B %d, %Y")
+       
+            # Check if there are any transactions
+            has_transactions = (
+                context and
+                context.get('total_income', 0) > 0 or
+                context.get('total_expense', 0) > 0 or
+                context.get('total_investment', 0) > 0
+            )
+       
+            if has_transactions:
+                # Create system message with financial context
+                system_message = f"""
+                You are a helpful financial assistant. Today is {current_date}.
+           
+                The user has the following financial information:
+                - Total Income: ${context['total_income']:.2f}
+                - Total Expenses: ${context['total_expense']:.2f}
+                - Total Investments: ${context['total_investment']:.2f}
+                - Net Savings: ${context['net_savings']:.2f}
+           
+                Expense Breakdown by Category:
+                {' '.join([f'- {cat}: ${amount:.2f}' for cat, amount in context['expense_by_category'].items()])}
+           
+                Provide helpful, concise financial advice and answer questions based on this data.
+                Be professional but friendly. Keep responses under 3 paragraphs.
+                """
+            else:
+                # Create general financial assistant system message
+                system_message = f"""
+                You are a helpful financial assistant. Today is {current_date}.
+           
+                The user hasn't provided any transaction data yet, so provide general financial advice,
+                budgeting tips, investment guidance, or answer their financial questions directly.
+           
+                You can help with:
+                - Personal finance advice
+                - Budgeting strategies
+                - Investment basics
+                - Saving tips
+                - Financial planning
+                - Expense tracking guidance
+           
+                Be professional but friendly. Keep responses under 3 paragraphs unless the user asks for detailed information.
+                """
+       
+            messages = [
+                SystemMessage(content=system_message),
+                HumanMessage(content=state["message"])
+            ]
+       
+            with stage_timer("llm_chat"):
+                response = await llm.ainvoke(messages)
+            state["response"] = response.content
+       
+            return state
+        except Exception:
+            # Raised so callers see the failure: a stream that already sent
+            # tokens must end in an error, not look like a complete reply
+            logger.exception("Error during response generation")
+            raise
+   
+    # Create the graph
+    workflow = StateGraph(ConversationState)
+   
+    # Add nodes
+    workflow.add_node("add_context", add_context)
+    workflow.add_node("generate_response", generate_response)
+   
+    # Define edges
+    workflow.add_edge("add_context", "generate_response")
+    workflow.add_edge("generate_response", END)
+   
+    # Set entry point
+    workflow.set_entry_point("add_context")
+   
+    return workflow.compile()
+
+
+def get_conversation_graph():
+    """
+    Get the shared conversation graph, compiling it on the first chat request.
+    """
+    global _conversation_graph
+    if _conversation_graph is None:
+        with _graph_lock:
+            if _conversation_graph is None:
+                _conversation_graph = create_conversation_graph()
+    return _conversation_graph
+
+
+async def generate_chat_response(user_id: int, message: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Generate a response to a user message using LangChain and LangGraph.
+   
+    Args:
+        user_id: User ID
+        message: User message
+        context: Aggregated financial context (see FinancialContextCache.get)
+       
+    Returns:
+        Generated response
+    """
+    # Create initial state
+    initial_state = {
+        "user_id": str(user_id),
+        "message": message,
+        "context": context
+    }
+   
+    # Run the conversation graph
+    result = await get_conversation_graph().ainvoke(initial_state)
+   
+    return result["response"]
+
+
+async def stream_chat_response(user_id: int, message: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Stream a response to a user message token by token.
+   
+    Runs the same conversation graph as generate_chat_response; the LLM call in
+    the generate_response node is streamed through LangGraph's "messages" stream
+    mode. Closing or cancelling the iterator cancels the upstream LLM request.
+   
+    Args:
+        user_id: User ID
+        message: User message
+        context: Aggregated financial context (see FinancialContextCache.get)
+       
+    Yields:
+        Response text fragments as the LLM produces them
+    """
+    initial_state = {
+        "user_id": str(user_id),
+        "message": message,
+        "context": context
+    }
+   
+    stream = get_conversation_graph().astream(initial_state, stream_mode="messages")
+    try:
+        async for chunk, metadata in stream:
+            if metadata.get("langgraph_node") == "generate_response" and chunk.content:
+                yield chunk.content
+    finally:
+        # Close the graph stream explicitly so an abandoned response stops the LLM call now
+        await stream.aclose()
\ No newline at end of file
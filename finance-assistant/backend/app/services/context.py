@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.rollups import monthly_rollups
+from app.services.summaries import overall_summary_from_transactions
+
+
+# Session.info key holding the user ids whose context is invalidated on commit
+_PENDING_KEY = "financial_context_invalidations"
+
+
+class FinancialContextCache:
+    """
+    Per-user cache of the financial context given to the chat assistant.
+
+    The context (all-time totals by type and expenses by category) is computed
+    with one aggregate query. Each user has a data version that is bumped when
+    their transactions change; a computed context is only stored if the version
+    did not move while it was being computed, so a concurrent change is never
+    overwritten with stale totals. Entries also expire after ``ttl`` seconds to
+    pick up changes made by other processes.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_users: int = 10000):
+        self.ttl = ttl if ttl is not None else settings.CHAT_CONTEXT_CACHE_TTL
+        self.max_users = max_users
+        self._entries: Dict[int, Tuple[int, float, Dict[str, Any]]] = {}
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _compute(self, db: Session, user_id: int) -> Dict[str, Any]:
+        if settings.SUMMARY_USE_ROLLUPS:
+            return monthly_rollups.overall_summary(db, user_id)
+        return overall_summary_from_transactions(db, user_id)
+
+    def get(self, db: Session, user_id: int) -> Dict[str, Any]:
+        """
+        Get the user's financial context, computing it on a miss.
+
+        Returns:
+            Dictionary with total_income, total_expense, total_investment,
+            net_savings and expense_by_category
+        """
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and now - entry[1] < self.ttl:
+                return entry[2]
+
+        context = self._compute(db, user_id)
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                if len(self._entries) >= self.max_users and user_id not in self._entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[user_id] = (version, now, context)
+        return context
+
+    def invalidate(self, user_id: int):
+        """
+        Drop the user's cached context and bump their data version.
+        """
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def invalidate_on_commit(self, db: Session, user_id: int):
+        """
+        Invalidate the user's context when the session commits.
+
+        Other sessions keep seeing the old data until the commit, so the cached
+        context stays valid until then; a rollback discards the invalidation.
+        """
+        db.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+# Shared context cache instance
+financial_context = FinancialContextCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        financial_context.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.core.config import settings
+from app.services.templates import AMOUNT_PATTERN, DEFAULT_ROW_CANDIDATE, DEFAULT_INCOME_KEYWORDS, _parse_amount
+
+
+# Reply used for chat prompts
+CHAT_REPLY = (
+    "Based on your recent transactions, your spending is within a healthy range. "
+    "Consider setting aside a fixed share of each paycheck for savings and reviewing "
+    "recurring subscriptions once a month."
+)
+
+# Date formats recognised in statement rows, tried in order
+ROW_DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%m-%d-%Y']
+
+
+class FakeLLMError(Exception):
+    """
+    Failure injected by the fake LLM provider (see FAKE_LLM_ERROR_RATE).
+    """
+    pass
+
+
+def _fake_transactions(text: str) -> List[Dict[str, Any]]:
+    """
+    Read transaction rows back out of an extraction prompt, as the real model would.
+    """
+    rows = []
+    for line in text.split('\n'):
+        if not DEFAULT_ROW_CANDIDATE.match(line):
+            continue
+        parts = line.split(None, 1)
+        if len(parts) < 2:
+            continue
+        date_text, rest = parts
+        amount_match = AMOUNT_PATTERN.search(rest)
+        if amount_match is None:
+            continue
+        amount = _parse_amount(amount_match.group(0)) or 0.0
+        description = ' '.join(rest[:amount_match.start()].split())
+        date = date_text
+        for fmt in ROW_DATE_FORMATS:
+            try:
+                date = datetime.strptime(date_text, fmt).strftime('%Y-%m-%d')
+                break
+            except ValueError:
+                continue
+        income = any(keyword in description.lower() for keyword in DEFAULT_INCOME_KEYWORDS)
+        rows.append({
+            'date': date,
+            'description': description or 'Unknown Transaction',
+            'amount': abs(amount),
+            'transaction_type': 'income' if income else 'expense'
+        })
+    return rows
+
+
+def fake_reply(messages: List[BaseMessage]) -> str:
+    """
+    Build a canned reply with the shape the calling prompt expects.
+
+    Extraction prompts get a JSON array of the transaction rows in the prompt,
+    categorization prompts a JSON object mapping each description to a
+    category, and anything else a chat reply.
+    """
+    system = ' '.join(str(message.content) for message in messages if message.type == 'system')
+    human = str(messages[-1].content) if messages else ''
+
+    if 'JSON array' in system:
+        return f"```json\n{json.dumps(_fake_transactions(human))}\n```"
+    if 'JSON object mapping each description' in system:
+        try:
+            descriptions = json.loads(human)
+        except ValueError:
+            descriptions = []
+        return json.dumps({description: 'Other' for description in descriptions if isinstance(description, str)})
+    return CHAT_REPLY
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for load tests, selected with LLM_PROVIDER=fake.
+
+    Each call waits ``latency`` seconds plus uniform jitter of up to ``jitter``,
+    fails with FakeLLMError at ``error_rate``, and answers with fake_reply.
+    Streamed replies are sent one word at a time, ``token_delay`` apart.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    token_delay: float = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "FakeChatModel":
+        return cls(
+            latency=settings.FAKE_LLM_LATENCY,
+            jitter=settings.FAKE_LLM_JITTER,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            token_delay=settings.FAKE_LLM_TOKEN_DELAY
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _check_failure(self):
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeLLMError("Injected fake LLM failure")
+
+    @staticmethod
+    def _result(reply: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+    @staticmethod
+    def _tokens(reply: str) -> List[str]:
+        words = reply.split(' ')
+        return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        self._check_failure()
+        return self._result(fake_reply(messages))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        self._check_failure()
+        return self._result(fake_reply(messages))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay())
+        self._check_failure()
+        for index, token in enumerate(self._tokens(fake_reply(messages))):
+            if index and self.token_delay:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay())
+        self._check_failure()
+        for index, token in enumerate(self._tokens(fake_reply(messages))):
+            if index and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
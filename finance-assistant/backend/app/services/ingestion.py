@@ -0,0 +1,290 @@
+import os
+import logging
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ingestion_job import IngestionJob
+from app.services.file_import import CsvColumnMapping, FILE_FORMATS, import_transactions_file
+from app.services.pdf import extract_transactions_from_pdf, IngestionCancelled
+
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states are picked up again after a restart
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class IngestionJobManager:
+    """
+    Runs bank statement ingestion jobs (PDF statements, and CSV or OFX/QFX
+    exports) on a bounded in-process worker pool.
+
+    Job state lives in the ``ingestion_jobs`` table, so clients can poll it and
+    unfinished jobs can be recovered when the process restarts. Cancellation is
+    cooperative: a running job stops at its next stage boundary, before any
+    transactions are committed.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.INGESTION_MAX_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cancel_requested: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ingestion"
+                )
+            return self._executor
+
+    def create_job(self, db: Session, user_id: int, filename: str, file_path: str,
+                   file_size: Optional[int] = None, file_sha256: Optional[str] = None,
+                   file_format: str = "pdf", import_options: Optional[str] = None) -> IngestionJob:
+        """
+        Record a new queued job for an uploaded statement or export.
+        """
+        job = IngestionJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            filename=filename,
+            file_path=file_path,
+            file_size=file_size,
+            file_sha256=file_sha256,
+            file_format=file_format,
+            import_options=import_options,
+            status="queued",
+            stage="queued",
+            progress=0,
+            transaction_count=0
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def submit(self, job_id: str):
+        """
+        Schedule a queued job on the worker pool.
+        """
+        self._get_executor().submit(self._run, job_id)
+
+    def submit_batch(self, job_ids: List[str], max_parallel: Optional[int] = None):
+        """
+        Schedule queued jobs from one batch upload, running at most ``max_parallel``
+        of them at a time so one large batch cannot take every worker.
+
+        Each job still runs, commits and fails on its own. Jobs recovered after a
+        restart are resubmitted individually, without the batch limit.
+        """
+        if max_parallel is None:
+            max_parallel = settings.UPLOAD_BATCH_MAX_PARALLEL
+        pending = deque(job_ids)
+        pending_lock = threading.Lock()
+
+        def run_next():
+            with pending_lock:
+                job_id = pending.popleft() if pending else None
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            finally:
+                try:
+                    self._get_executor().submit(run_next)
+                except RuntimeError:
+                    # Shutting down; the remaining queued jobs are recovered on restart
+                    pass
+
+        for _ in range(max(1, min(max_parallel, len(job_ids)))):
+            self._get_executor().submit(run_next)
+
+    def get_job(self, db: Session, job_id: str, user_id: int) -> Optional[IngestionJob]:
+        """
+        Get a job owned by the given user.
+        """
+        return db.query(IngestionJob).filter(
+            IngestionJob.id == job_id,
+            IngestionJob.user_id == user_id
+        ).first()
+
+    def list_jobs(self, db: Session, user_id: int, status: Optional[str] = None,
+                  skip: int = 0, limit: int = 50) -> List[IngestionJob]:
+        """
+        List a user's jobs, newest first.
+        """
+        query = db.query(IngestionJob).filter(IngestionJob.user_id == user_id)
+        if status:
+            query = query.filter(IngestionJob.status == status)
+        return query.order_by(IngestionJob.created_at.desc()).offset(skip).limit(limit).all()
+
+    def cancel(self, db: Session, job: IngestionJob) -> IngestionJob:
+        """
+        Request cancellation of a job.
+
+        Queued jobs are cancelled immediately. Running jobs are flagged and stop
+        at their next stage boundary; if the transactions were already committed
+        the job still finishes as succeeded. A CSV or OFX import stops after its
+        current batch and keeps the batches it committed.
+        """
+        if job.status not in ACTIVE_STATUSES:
+            return job
+
+        with self._lock:
+            self._cancel_requested.add(job.id)
+
+        if job.status == "queued":
+            self._finish(db, job, "cancelled")
+            self._remove_file(job.file_path)
+        else:
+            job.stage = "cancelling"
+            db.commit()
+            db.refresh(job)
+        return job
+
+    def recover(self):
+        """
+        Requeue jobs left unfinished by a previous process.
+
+        Statement rows are only committed at the end of an ingestion, and CSV
+        or OFX imports skip the batches they already committed, so a job that
+        was running when the process stopped can safely run again from the start.
+        """
+        db = SessionLocal()
+        try:
+            jobs = db.query(IngestionJob).filter(
+                IngestionJob.status.in_(ACTIVE_STATUSES)
+            ).order_by(IngestionJob.created_at).all()
+
+            requeued = []
+            for job in jobs:
+                if not os.path.exists(job.file_path):
+                    job.status = "failed"
+                    job.error = "Uploaded file was lost before processing finished"
+                    job.finished_at = datetime.now(timezone.utc)
+                    continue
+                job.status = "queued"
+                job.stage = "queued"
+                job.progress = 0
+                job.started_at = None
+                requeued.append(job.id)
+            db.commit()
+        finally:
+            db.close()
+
+        for job_id in requeued:
+            self.submit(job_id)
+        return requeued
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the worker pool. Jobs that have not finished are recovered on the next start.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _is_cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancel_requested
+
+    def _finish(self, db: Session, job: IngestionJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.stage = status
+        job.error = error[:1000] if error else None
+        job.finished_at = datetime.now(timezone.utc)
+        if status == "succeeded":
+            job.progress = 100
+        db.commit()
+        db.refresh(job)
+
+    @staticmethod
+    def _remove_file(file_path: str):
+        try:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+        except OSError as e:
+            logger.warning("Error removing uploaded file %s: %s", file_path, e)
+
+    def _run(self, job_id: str):
+        db = SessionLocal()
+        job = None
+        try:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None or job.status != "queued":
+                return
+            if self._is_cancel_requested(job_id):
+                self._finish(db, job, "cancelled")
+                return
+
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            db.commit()
+
+            def on_progress(stage: str, progress: int, transaction_count: Optional[int] = None,
+                            duplicate_count: Optional[int] = None, unreadable_count: Optional[int] = None):
+                if transaction_count is not None:
+                    # Rows a CSV/OFX import has committed so far; kept if it is cancelled now
+                    job.transaction_count = transaction_count
+                    job.duplicate_count = duplicate_count
+                    job.unreadable_count = unreadable_count
+                    db.commit()
+                if self._is_cancel_requested(job_id):
+                    raise IngestionCancelled()
+                job.stage = stage
+                job.progress = progress
+                db.commit()
+
+            # The job row and the extracted transactions use separate sessions so
+            # progress updates never commit half-built transactions
+            work_db = SessionLocal()
+            try:
+                if job.file_format in FILE_FORMATS:
+                    transaction_count, duplicate_count, unreadable_count = import_transactions_file(
+                        job.file_path, job.user_id, work_db, job.file_format,
+                        mapping=CsvColumnMapping.from_json(job.import_options),
+                        progress_callback=on_progress
+                    )
+                else:
+                    transactions, duplicate_count = extract_transactions_from_pdf(
+                        job.file_path, job.user_id, work_db,
+                        progress_callback=on_progress, file_sha256=job.file_sha256
+                    )
+                    transaction_count = len(transactions)
+                    unreadable_count = None
+            finally:
+                work_db.close()
+
+            job.transaction_count = transaction_count
+            job.duplicate_count = duplicate_count
+            job.unreadable_count = unreadable_count
+            self._finish(db, job, "succeeded")
+        except IngestionCancelled:
+            db.rollback()
+            self._finish(db, job, "cancelled")
+        except Exception as e:
+            logger.exception("Ingestion job %s failed", job_id)
+            db.rollback()
+            if job is not None:
+                self._finish(db, job, "failed", str(e))
+        finally:
+            with self._lock:
+                self._cancel_requested.discard(job_id)
+            if job is not None and job.status not in ACTIVE_STATUSES:
+                self._remove_file(job.file_path)
+            db.close()
+
+
+# Shared job manager instance
+ingestion_jobs = IngestionJobManager()
@@ -1,309 +1,691 @@
-import re
-import json
-import hashlib
-import base64
-from datetime import datetime
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
-
-
-from app.models.transaction import Transaction
-from app.services.chat import get_llm
-from langchain_core.messages import HumanMessage, SystemMessage
-
-
-def sanitize_bank_statement(text: str) -> Dict[str, Any]:
-    """
-    Remove and encrypt sensitive information before sending to LLM.
-   
-    Args:
-        text: Raw bank statement text
-       
-    Returns:
-        Dictionary containing sanitized text and mappings for restoration
-    """
-    sanitized_text = text
-    mappings = {}
-   
-    # 1. Remove and encrypt account numbers (keep pattern for context)
-    account_pattern = r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b|\b\d{10,20}\b'
-    def encrypt_account(match):
-        account_num = match.group()
-        # Create a hash for internal reference
-        account_hash = hashlib.sha256(account_num.encode()).hexdigest()[:8]
-        encrypted_ref = f"ACCT_{account_hash}"
-        mappings[encrypted_ref] = account_num
-        return f"****-****-****-{account_num[-4:]}"  # Show only last 4 digits
-   
-    sanitized_text = re.sub(account_pattern, encrypt_account, sanitized_text)
-   
-    # 2. Remove routing numbers
-    routing_pattern = r'\b\d{9}\b'
-    sanitized_text = re.sub(routing_pattern, '*********', sanitized_text)
-   
-    # 3. Remove Social Security Numbers
-    ssn_pattern = r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b'
-    sanitized_text = re.sub(ssn_pattern, '***-**-****', sanitized_text)
-   
-    # 4. Remove phone numbers
-    phone_pattern = r'\b\(?[\d\s\-\(\)]{10,15}\b'
-    sanitized_text = re.sub(phone_pattern, '(***) ***-****', sanitized_text)
-   
-    # 5. Remove email addresses
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    sanitized_text = re.sub(email_pattern, '****@****.com', sanitized_text)
-   
-    # 6. Remove full addresses (but keep city for context)
-    # Remove street addresses but keep city/state for geographic context
-    address_pattern = r'\b\d+\s+[A-Za-z0-9\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd|Circle|Cir|Court|Ct|Place|Pl)\b'
-    sanitized_text = re.sub(address_pattern, '[STREET ADDRESS REMOVED]', sanitized_text, flags=re.IGNORECASE)
-   
-    # 7. Remove names (common patterns) but keep business names for categorization
-    # Remove full names in "First Last" format but preserve business names
-    name_pattern = r'\b[A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\b'
-    def anonymize_name(match):
-        name = match.group()
-        # Don't remove if it looks like a business name (contains certain keywords)
-        business_keywords = ['Bank', 'Corp', 'LLC', 'Inc', 'Company', 'Store', 'Market', 'Restaurant',
-                           'Gas', 'Station', 'Pharmacy', 'Hospital', 'University', 'School', 'Hotel',
-                           'Walmart', 'Amazon', 'Starbucks', 'Netflix', 'McDonald', 'Shell', 'Target',
-                           'CVS', 'Kroger', 'Uber', 'Lyft', 'PayPal', 'Venmo', 'Zelle', 'Chase',
-                           'Wells', 'Fargo', 'Citibank', 'BOA', 'Deposit', 'Withdrawal', 'Transfer']
-        if any(keyword.lower() in name.lower() for keyword in business_keywords):
-            return name  # Keep business names
-        return '[NAME REMOVED]'
-   
-    sanitized_text = re.sub(name_pattern, anonymize_name, sanitized_text)
-   
-    # 8. Remove specific personal identifiers in statement headers
-    # Remove "Account Holder:" lines
-    sanitized_text = re.sub(r'Account Holder:?\s*[^\n\r]*', 'Account Holder: [NAME REMOVED]', sanitized_text, flags=re.IGNORECASE)
-   
-    # 9. Remove check numbers (but keep for transaction matching)
-    check_pattern = r'\bCheck\s*#?\s*\d+\b'
-    sanitized_text = re.sub(check_pattern, 'Check #****', sanitized_text, flags=re.IGNORECASE)
-   
-    # 10. Remove credit card numbers (different from account numbers)
-    cc_pattern = r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b'
-    sanitized_text = re.sub(cc_pattern, lambda m: f"****-****-****-{m.group()[-4:]}", sanitized_text)
-   
-    # 11. Fix over-sanitization of common transaction descriptions
-    # Restore common merchant names that got incorrectly removed
-    merchant_fixes = {
-        '[NAME REMOVED] Supercenter': 'Walmart Supercenter',
-        '[NAME REMOVED] Coffee': 'Starbucks Coffee',
-        '[NAME REMOVED] Subscription': 'Netflix Subscription',
-        '[NAME REMOVED] Restaurant': 'McDonald\'s Restaurant',
-        '[NAME REMOVED] Ride': 'Uber Ride',
-        '[NAME REMOVED] Store': 'Target Store',
-        'Direct [NAME REMOVED]': 'Direct Deposit'
-    }
-   
-    for incorrect, correct in merchant_fixes.items():
-        sanitized_text = sanitized_text.replace(incorrect, correct)
-   
-    return {
-        'sanitized_text': sanitized_text,
-        'mappings': mappings,
-        'original_length': len(text),
-        'sanitized_length': len(sanitized_text)
-    }
-
-
-def extract_transactions_from_pdf(pdf_path: str, user_id: int, db: Session) -> List[Transaction]:
-    """
-    Extract transactions from a bank statement PDF file using LLM for intelligent parsing.
-   
-    Args:
-        pdf_path: Path to the PDF file
-        user_id: User ID
-        db: Database session
-       
-    Returns:
-        List of extracted Transaction objects
-    """
-    try:
-        # Import necessary libraries for PDF extraction
-        from pypdf import PdfReader
-        from pdfminer.high_level import extract_text
-       
-        # Use pdfminer for text extraction
-        text = extract_text(pdf_path)
-       
-        # Sanitize the text before sending to LLM
-        sanitization_result = sanitize_bank_statement(text)
-        sanitized_text = sanitization_result['sanitized_text']
-       
-        print(f"Data sanitization complete:")
-        print(f"Original text length: {sanitization_result['original_length']} characters")
-        print(f"Sanitized text length: {sanitization_result['sanitized_length']} characters")
-        print(f"Encrypted {len(sanitization_result['mappings'])} account references")
-       
-        # Use LLM to parse the sanitized document
-        transactions_data = parse_transactions_with_llm(sanitized_text)
-       
-        # Convert LLM output to Transaction objects
-        transactions = []
-       
-        for transaction_data in transactions_data:
-            try:
-                # Parse date from LLM output
-                if isinstance(transaction_data.get('date'), str):
-                    # Try multiple date formats
-                    date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S']
-                    date = None
-                    for fmt in date_formats:
-                        try:
-                            date = datetime.strptime(transaction_data['date'].split()[0], fmt)
-                            break
-                        except ValueError:
-                            continue
-                   
-                    if date is None:
-                        # Fallback to current date if parsing fails
-                        date = datetime.now()
-                else:
-                    date = datetime.now()
-               
-                # Create transaction object
-                db_transaction = Transaction(
-                    user_id=user_id,
-                    date=date,
-                    description=transaction_data.get('description', 'Unknown Transaction'),
-                    amount=abs(float(transaction_data.get('amount', 0))),
-                    category=transaction_data.get('category', 'Uncategorized'),
-                    transaction_type=transaction_data.get('transaction_type', 'expense'),
-                    source='bank_statement'
-                )
-               
-                # Add to session
-                db.add(db_transaction)
-                transactions.append(db_transaction)
-               
-            except Exception as e:
-                print(f"Error processing transaction: {transaction_data}, Error: {str(e)}")
-                continue
-       
-        # Commit all transactions
-        if transactions:
-            db.commit()
-           
-            # Refresh all transactions to get their IDs
-            for transaction in transactions:
-                db.refresh(transaction)
-            for transaction in transactions:
-                db.refresh(transaction)
-       
-        return transactions
-   
-    except Exception as e:
-        # Rollback the session in case of error
-        db.rollback()
-        # Re-raise the exception
-        raise Exception(f"Error extracting transactions from PDF: {str(e)}")
-
-
-def parse_transactions_with_llm(document_text: str) -> List[Dict[str, Any]]:
-    """
-    Use LLM to parse bank statement text and extract transaction data.
-   
-    Args:
-        document_text: Raw text extracted from the PDF
-       
-    Returns:
-        List of transaction dictionaries
-    """
-    try:
-        llm = get_llm()
-       
-        system_message = """
-        You are an expert financial data extraction specialist. Your task is to analyze bank statement text and extract individual transactions with detailed categorization.
-
-
-        Extract each transaction and return a JSON array with the following format:
-        [
-            {
-                "date": "YYYY-MM-DD",
-                "description": "Transaction description",
-                "amount": 123.45,
-                "transaction_type": "income|expense|investment",
-                "category": "Food & Dining|Transportation|Shopping|Entertainment|Healthcare|Utilities|Groceries|Gas|ATM|Transfer|Salary|Investment|Insurance|Education|Travel|Other"
-            }
-        ]
-
-
-        Guidelines:
-        1. Parse dates accurately and convert to YYYY-MM-DD format
-        2. Extract clean, meaningful descriptions
-        3. Determine if it's income, expense, or investment
-        4. Categorize intelligently based on merchant names and descriptions
-        5. Use positive numbers for amounts (we'll handle debit/credit logic)
-        6. Skip headers, footers, balances, and non-transaction data
-        7. Only include actual financial transactions
-
-
-        Common categories to use:
-        - Food & Dining: restaurants, cafes, food delivery
-        - Transportation: gas, parking, uber, public transport
-        - Shopping: retail stores, online shopping, clothing
-        - Groceries: supermarkets, grocery stores
-        - Entertainment: movies, games, subscriptions
-        - Healthcare: medical, pharmacy, insurance
-        - Utilities: electricity, water, internet, phone
-        - ATM: cash withdrawals
-        - Transfer: bank transfers, payments
-        - Salary: paycheck, wages
-        - Investment: stocks, bonds, retirement
-        - Education: tuition, books, courses
-        - Travel: hotels, flights, vacation
-        - Other: miscellaneous expenses
-
-
-        Return only valid JSON array, no explanations or additional text.
-        """
-       
-        human_message = f"""
-        Please analyze this bank statement text and extract all transactions:
-
-
-        {document_text[:4000]}  # Limit text to avoid token limits
-        """
-       
-        messages = [
-            SystemMessage(content=system_message),
-            HumanMessage(content=human_message)
-        ]
-       
-        response = llm.invoke(messages)
-       
-        # Parse the JSON response
-        try:
-            # Clean the response to extract JSON
-            response_text = response.content.strip()
-           
-            # Find JSON array in the response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
-           
-            if start_idx != -1 and end_idx != 0:
-                json_text = response_text[start_idx:end_idx]
-                transactions_data = json.loads(json_text)
-               
-                # Validate the structure
-                if isinstance(transactions_data, list):
-                    return transactions_data
-                else:
-                    print("LLM response is not a list")
-                    return []
-            else:
-                print("No JSON array found in LLM response")
-                return []
-               
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON from LLM response: {str(e)}")
-            print(f"LLM Response: {response.content}")
-            return []
-   
-    except Exception as e:
-        print(f"Error calling LLM for transaction parsing: {str(e)}")
-        return []
\ No newline at end of file
+import os
+import re
+import sys
+import json
+import logging
+import time
+import hashlib
+import base64
+import itertools
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+from sqlalchemy.orm import Session
+
+
+from app.core.config import settings
+from app.core.metrics import STAGE_DURATION, stage_timer
+from app.schemas.transaction import Transaction as TransactionSchema
+from app.services.chat import get_llm
+from app.services.categorizer import merchant_categorizer
+from app.services.cache import ingestion_cache, make_cache_key, hash_file
+from app.services.pdf_pages import PAGE_EXTRACTORS, count_pages, extract_pages
+from app.services.sanitizer import default_sanitizer, sanitize_bank_statement, SANITIZER_VERSION
+from app.services.templates import template_registry
+from app.services.transactions import save_imported_transactions, validate_transaction_rows
+
+
+logger = logging.getLogger(__name__)
+
+class IngestionCancelled(Exception):
+    """
+    Raised by a progress callback to stop an ingestion before it commits.
+    """
+    pass
+
+
+def extract_transactions_from_pdf(
+    pdf_path: str,
+    user_id: int,
+    db: Session,
+    progress_callback: Optional[Callable[[str, int], None]] = None,
+    file_sha256: Optional[str] = None
+) -> Tuple[List[TransactionSchema], int]:
+    """
+    Extract transactions from a bank statement PDF file using LLM for intelligent parsing.
+   
+    Args:
+        pdf_path: Path to the PDF file
+        user_id: User ID
+        db: Database session
+        progress_callback: Optional callable receiving (stage, percent) before each
+            stage; it may raise IngestionCancelled to abort without committing
+        file_sha256: SHA-256 of the file if already known; used as the cache key
+       
+    Returns:
+        Inserted transactions as response objects, and the number of rows
+        skipped because they were already imported
+    """
+    def report(stage: str, progress: int):
+        if progress_callback is not None:
+            progress_callback(stage, progress)
+   
+    try:
+        # Content-addressed cache keys: each level depends on the one before it.
+        # Only statements no template matches are sanitized, so the sanitized
+        # level is keyed on the templates too: a hit means none matches and
+        # the PDF does not have to be read at all.
+        file_hash = file_sha256 or hash_file(pdf_path)
+        text_key = make_cache_key(file_hash, pdf_text_extractor.version)
+        sanitized_key = make_cache_key(text_key, SANITIZER_VERSION, template_registry.version())
+        parsed_key = make_cache_key(
+            sanitized_key, EXTRACTION_PROMPT_VERSION, template_registry.version(),
+            settings.LLM_PROVIDER, settings.deployment_name
+        )
+       
+        transactions_data = ingestion_cache.get('parsed', parsed_key)
+        sanitized_text = None
+        if transactions_data is None:
+            sanitized_text = ingestion_cache.get('sanitized', sanitized_key)
+        if sanitized_text is not None:
+            # Use LLM to parse the sanitized document
+            report("parsing", 40)
+            transactions_data, complete = _parse_transactions(sanitized_text)
+            # Partial results (a chunk failed) are not cached so a retry calls the LLM again
+            if complete:
+                ingestion_cache.set('parsed', parsed_key, transactions_data)
+        elif transactions_data is None:
+            report("extracting_text", 10)
+            cached_text = ingestion_cache.get('text', text_key)
+            extraction = {'pages': [], 'complete': False}
+            if cached_text is not None:
+                pages = iter(cached_text.split('\f'))
+            else:
+                # Pages arrive as they are extracted, so sanitizing and LLM
+                # parsing overlap with extraction of the later pages
+                pages = _record_pages(pdf_text_extractor.iter_pages(pdf_path), extraction)
+            
+            # Known bank layouts are parsed deterministically; only rows the
+            # template cannot read are sent to the LLM
+            header_pages = _read_header_pages(pages)
+            template = template_registry.match('\f'.join(header_pages))
+            pages = itertools.chain(header_pages, pages)
+            if template is not None:
+                text = '\f'.join(pages)
+                report("parsing", 40)
+                transactions_data, unparsed_rows = template.parse(text)
+                complete = True
+                logger.info("Matched statement template '%s': %d rows parsed, %d sent to LLM",
+                            template.name, len(transactions_data), len(unparsed_rows))
+                if unparsed_rows:
+                    with stage_timer("sanitize"):
+                        fallback_text = sanitize_bank_statement('\n'.join(unparsed_rows))['sanitized_text']
+                    fallback_data, complete = _parse_transactions(fallback_text)
+                    transactions_data.extend(fallback_data)
+            else:
+                # Sanitize each page before sending it to the LLM
+                report("sanitizing", 30)
+                sanitization_results = []
+                report("parsing", 40)
+                transactions_data, complete = _parse_transactions(
+                    _sanitize_pages(pages, sanitization_results)
+                )
+                sanitized_text = '\f'.join(result['sanitized_text'] for result in sanitization_results)
+                ingestion_cache.set('sanitized', sanitized_key, sanitized_text)
+                logger.info(
+                    "Sanitized statement: %d -> %d characters, %d account references encrypted",
+                    sum(r['original_length'] for r in sanitization_results),
+                    sum(r['sanitized_length'] for r in sanitization_results),
+                    sum(len(r['mappings']) for r in sanitization_results)
+                )
+            
+            # A text entry must hold every page: a later run that hits it would
+            # otherwise silently lose the transactions on the pages never read
+            if cached_text is None and extraction['complete']:
+                ingestion_cache.set('text', text_key, '\f'.join(extraction['pages']))
+            
+            # Partial results (a chunk failed) are not cached so a retry calls the LLM again
+            if complete:
+                ingestion_cache.set('parsed', parsed_key, transactions_data)
+       
+        # Categorize known merchants locally; only unknown merchants go to the LLM
+        report("categorizing", 80)
+        transactions_data = merchant_categorizer.categorize(
+            db, user_id, [dict(row) for row in transactions_data if isinstance(row, dict)]
+        )
+       
+        # Convert LLM output to transaction rows
+        rows = []
+       
+        for transaction_data in transactions_data:
+            try:
+                # Parse date from LLM output
+                if isinstance(transaction_data.get('date'), str):
+                    # Try multiple date formats
+                    date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S']
+                    date = None
+                    for fmt in date_formats:
+                        try:
+                            date = datetime.strptime(transaction_data['date'].split()[0], fmt)
+                            break
+                        except ValueError:
+                            continue
+                   
+                    if date is None:
+                        # Fallback to current date if parsing fails
+                        date = datetime.now()
+                else:
+                    date = datetime.now()
+               
+                rows.append({
+                    'date': date,
+                    'description': transaction_data.get('description', 'Unknown Transaction'),
+                    'amount': abs(float(transaction_data.get('amount', 0))),
+                    'category': transaction_data.get('category') or 'Uncategorized',
+                    'transaction_type': transaction_data.get('transaction_type', 'expense'),
+                    'source': 'bank_statement'
+                })
+               
+            except Exception as e:
+                logger.warning("Skipping unreadable transaction %r: %s", transaction_data, e)
+                continue
+       
+        # Insert rows not already imported (overlapping statements, re-uploads)
+        # in batches and commit once
+        report("saving", 90)
+        with stage_timer("db_commit"):
+            transactions, duplicate_count = save_imported_transactions(
+                db, user_id, validate_transaction_rows(rows),
+                on_inserted=lambda inserted: merchant_categorizer.record(db, user_id, [
+                    {'description': t.description, 'category': t.category} for t in inserted
+                ])
+            )
+        if duplicate_count:
+            logger.info("Skipped %d transactions already imported", duplicate_count)
+       
+        return transactions, duplicate_count
+   
+    except IngestionCancelled:
+        db.rollback()
+        raise
+    except Exception as e:
+        # Rollback the session in case of error
+        db.rollback()
+        # Re-raise the exception
+        raise Exception(f"Error extracting transactions from PDF: {str(e)}")
+
+
+# Version of each backend's text output; bump when an extractor's output changes
+TEXT_EXTRACTOR_VERSIONS = {
+    "pypdf": "pypdf-1",
+    # Sanitized text is cached per page since pypdf was added, hence the bump
+    "pdfminer": "pdfminer-2",
+}
+
+
+class PdfTextExtractor:
+    """
+    Extracts statement text page by page with a pluggable backend (see
+    ``app.services.pdf_pages.PAGE_EXTRACTORS``).
+
+    Statements of at least ``parallel_min_pages`` pages are split into ranges of
+    ``pages_per_task`` pages that run on a process pool shared by all ingestions.
+    Pages are yielded in order as soon as their range is done, so callers can
+    sanitize and parse the first pages while later ones are still being read.
+    The pypdf backend falls back to pdfminer when pypdf cannot read a file.
+    """
+
+    def __init__(self, backend: Optional[str] = None, max_workers: Optional[int] = None,
+                 parallel_min_pages: Optional[int] = None, pages_per_task: Optional[int] = None):
+        self.backend = backend or settings.PDF_EXTRACTOR
+        if self.backend not in PAGE_EXTRACTORS:
+            raise ValueError(f"Unknown PDF extractor '{self.backend}'; use one of {', '.join(PAGE_EXTRACTORS)}")
+        self.max_workers = max_workers if max_workers is not None else settings.PDF_EXTRACT_WORKERS
+        self.parallel_min_pages = parallel_min_pages if parallel_min_pages is not None else settings.PDF_PARALLEL_MIN_PAGES
+        self.pages_per_task = max(1, pages_per_task or settings.PDF_PAGES_PER_TASK)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        return TEXT_EXTRACTOR_VERSIONS[self.backend]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the server process runs threads (ingestion
+                # workers, the event loop) whose locks must not be copied
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the worker processes; they are started again on the next parallel extraction.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Yield the text of each page in order.
+        """
+        if self.backend != "pdfminer":
+            yielded = False
+            try:
+                for page in self._iter_pages(self.backend, pdf_path):
+                    yielded = True
+                    yield page
+                return
+            except BrokenExecutor:
+                # The pool failed, not the file; pdfminer would fail the same way
+                raise
+            except Exception as e:
+                if yielded:
+                    raise
+                logger.warning("%s could not read %s (%s); falling back to pdfminer",
+                               self.backend, os.path.basename(pdf_path), e)
+        yield from self._iter_pages("pdfminer", pdf_path)
+
+    def extract_text(self, pdf_path: str) -> str:
+        """
+        Extract the whole statement, with pages separated by form feeds.
+        """
+        return '\f'.join(self.iter_pages(pdf_path))
+
+    def _iter_pages(self, backend: str, pdf_path: str) -> Iterator[str]:
+        try:
+            page_count = count_pages(pdf_path)
+        except Exception:
+            if backend != "pdfminer":
+                raise
+            # pypdf cannot read the page tree; pdfminer reads the whole file in one go
+            page_count = None
+        
+        waited = 0.0
+        try:
+            if page_count is None:
+                start = time.perf_counter()
+                pages = extract_pages(backend, pdf_path, 0, sys.maxsize)
+                waited += time.perf_counter() - start
+                yield from pages
+            elif self.max_workers <= 1 or page_count < self.parallel_min_pages:
+                for first in range(0, page_count, self.pages_per_task):
+                    start = time.perf_counter()
+                    pages = extract_pages(backend, pdf_path, first, first + self.pages_per_task)
+                    waited += time.perf_counter() - start
+                    yield from pages
+            else:
+                executor = self._get_executor()
+                futures = []
+                try:
+                    for first in range(0, page_count, self.pages_per_task):
+                        futures.append(executor.submit(
+                            extract_pages, backend, pdf_path, first, first + self.pages_per_task
+                        ))
+                    for future in futures:
+                        start = time.perf_counter()
+                        pages = future.result()
+                        waited += time.perf_counter() - start
+                        yield from pages
+                except BrokenExecutor:
+                    # A worker died (e.g. killed for memory); start a fresh pool next time
+                    with self._lock:
+                        if self._executor is executor:
+                            self._executor = None
+                    raise
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            # Time spent waiting for text, excluding the caller's work between pages
+            STAGE_DURATION.observe(waited, "pdf_extract")
+
+
+# Shared extractor used by the ingestion path
+pdf_text_extractor = PdfTextExtractor()
+
+
+def _record_pages(pages: Iterable[str], extraction: Dict[str, Any]) -> Iterator[str]:
+    """
+    Pass pages through, keeping a copy of each in ``extraction['pages']`` for the
+    text cache; ``extraction['complete']`` is set once the last page has been read.
+    """
+    for page in pages:
+        extraction['pages'].append(page)
+        yield page
+    extraction['complete'] = True
+
+
+def _read_header_pages(pages: Iterator[str]) -> List[str]:
+    """
+    Read pages until they hold the header every registered template fingerprints.
+    """
+    needed = max((template.header_lines for template in template_registry.templates), default=0)
+    header_pages = []
+    lines = 0
+    for page in pages:
+        header_pages.append(page)
+        lines += page.count('\n') + 1
+        if lines >= needed:
+            break
+    return header_pages
+
+
+def _sanitize_pages(pages: Iterable[str], results: List[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Sanitize pages as they arrive, keeping each result for the sanitized cache.
+    """
+    for page in pages:
+        with stage_timer("sanitize"):
+            result = default_sanitizer.sanitize(page)
+        results.append(result)
+        yield result['sanitized_text']
+
+
+EXTRACTION_SYSTEM_MESSAGE = """
+        You are an expert financial data extraction specialist. Your task is to analyze bank statement text and extract individual transactions.
+
+
+        Extract each transaction and return a JSON array with the following format:
+        [
+            {
+                "date": "YYYY-MM-DD",
+                "description": "Transaction description",
+                "amount": 123.45,
+                "transaction_type": "income|expense|investment"
+            }
+        ]
+
+
+        Guidelines:
+        1. Parse dates accurately and convert to YYYY-MM-DD format
+        2. Extract clean, meaningful descriptions
+        3. Determine if it's income, expense, or investment
+        4. Use positive numbers for amounts (we'll handle debit/credit logic)
+        5. Skip headers, footers, balances, and non-transaction data
+        6. Only include actual financial transactions
+
+
+        Return only valid JSON array, no explanations or additional text.
+        """
+
+
+# Bumped when merge_chunk_results changes which rows it keeps
+CHUNK_MERGE_VERSION = "2"
+
+# Changes whenever the prompt, chunking or merging changes, invalidating cached LLM output
+EXTRACTION_PROMPT_VERSION = hashlib.sha256(
+    f"{EXTRACTION_SYSTEM_MESSAGE}|{settings.LLM_CHUNK_MAX_TOKENS}|{settings.LLM_CHUNK_OVERLAP_LINES}|"
+    f"{CHUNK_MERGE_VERSION}".encode()
+).hexdigest()[:12]
+
+
+# Rough characters-per-token ratio used to size chunks without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def iter_statement_chunks(pages: Iterable[str], max_tokens: int = None, overlap_lines: int = None) -> Iterator[str]:
+    """
+    Split statement pages into chunks that fit the LLM token budget.
+   
+    Chunks are cut on page boundaries (form feeds) where possible, and on row
+    boundaries when a single page is over budget. Row cuts repeat the last few
+    rows at the start of the next chunk so a row split across the cut is still
+    seen whole; the duplicates are removed by ``merge_chunk_results``.
+   
+    Args:
+        pages: Sanitized page texts; may be a generator, each chunk is yielded as soon as it is full
+        max_tokens: Token budget per chunk (defaults to settings.LLM_CHUNK_MAX_TOKENS)
+        overlap_lines: Rows repeated after a row cut (defaults to settings.LLM_CHUNK_OVERLAP_LINES)
+       
+    Yields:
+        Chunk texts
+    """
+    for chunk, _ in _iter_chunks(pages, max_tokens, overlap_lines):
+        yield chunk
+
+
+def _iter_chunks(pages: Iterable[str], max_tokens: int = None, overlap_lines: int = None) -> Iterator[Tuple[str, int]]:
+    """
+    iter_statement_chunks, yielding each chunk with the number of lines it
+    repeats from the previous chunk (0 after a page boundary).
+    """
+    if max_tokens is None:
+        max_tokens = settings.LLM_CHUNK_MAX_TOKENS
+    if overlap_lines is None:
+        overlap_lines = settings.LLM_CHUNK_OVERLAP_LINES
+    max_chars = max(max_tokens * CHARS_PER_TOKEN, 1)
+   
+    current = []
+    current_len = 0
+    # Lines at the start of ``current`` carried over from the previous chunk
+    current_overlap = 0
+   
+    for page in pages:
+        if not page.strip():
+            continue
+       
+        # Whole page fits in the current chunk
+        if current_len + len(page) + 1 <= max_chars:
+            current.append(page)
+            current_len += len(page) + 1
+            continue
+       
+        # Start a new chunk on the page boundary
+        if current:
+            yield '\n'.join(current), current_overlap
+            current = []
+            current_len = 0
+            current_overlap = 0
+       
+        if len(page) <= max_chars:
+            current.append(page)
+            current_len = len(page) + 1
+            continue
+       
+        # Page is larger than the budget: cut on row boundaries
+        for line in page.split('\n'):
+            pieces = [line[i:i + max_chars] for i in range(0, len(line), max_chars)] or ['']
+            for piece in pieces:
+                if current and current_len + len(piece) + 1 > max_chars:
+                    yield '\n'.join(current), current_overlap
+                    current = current[-overlap_lines:] if overlap_lines > 0 else []
+                    current_len = sum(len(row) + 1 for row in current)
+                    current_overlap = len(current)
+                current.append(piece)
+                current_len += len(piece) + 1
+   
+    if current:
+        yield '\n'.join(current), current_overlap
+
+
+def split_statement_into_chunks(document_text: str, max_tokens: int = None, overlap_lines: int = None) -> List[str]:
+    """
+    Split statement text into chunks that fit the LLM token budget.
+    
+    Chunks are cut on page boundaries (form feeds) where possible; see
+    ``iter_statement_chunks``.
+    
+    Args:
+        document_text: Sanitized statement text
+        max_tokens: Token budget per chunk (defaults to settings.LLM_CHUNK_MAX_TOKENS)
+        overlap_lines: Rows repeated after a row cut (defaults to settings.LLM_CHUNK_OVERLAP_LINES)
+        
+    Returns:
+        List of chunk texts
+    """
+    return list(iter_statement_chunks(document_text.split('\f'), max_tokens, overlap_lines))
+
+
+def _parse_llm_response(response_text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extract the JSON array of transactions from an LLM response.
+    Returns None if the response does not contain a valid JSON array.
+    """
+    try:
+        # Clean the response to extract JSON
+        response_text = response_text.strip()
+       
+        # Find JSON array in the response
+        start_idx = response_text.find('[')
+        end_idx = response_text.rfind(']') + 1
+       
+        if start_idx != -1 and end_idx != 0:
+            json_text = response_text[start_idx:end_idx]
+            transactions_data = json.loads(json_text)
+           
+            # Validate the structure
+            if isinstance(transactions_data, list):
+                return transactions_data
+            else:
+                logger.warning("LLM response is not a list")
+                return None
+        else:
+            logger.warning("No JSON array found in LLM response")
+            return None
+           
+    except json.JSONDecodeError as e:
+        logger.warning("Error parsing JSON from LLM response: %s", e)
+        logger.debug("LLM response: %s", response_text)
+        return None
+
+
+def _parse_chunk_with_llm(llm, chunk: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Send one statement chunk to the LLM and parse the transactions it returns.
+    Returns None if the call fails or the response cannot be parsed.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+   
+    human_message = f"""
+        Please analyze this bank statement text and extract all transactions:
+
+
+        {chunk}
+        """
+   
+    messages = [
+        SystemMessage(content=EXTRACTION_SYSTEM_MESSAGE),
+        HumanMessage(content=human_message)
+    ]
+   
+    try:
+        with stage_timer("llm_extract"):
+            response = llm.invoke(messages)
+    except Exception:
+        logger.exception("Error calling LLM for transaction parsing")
+        return None
+   
+    with stage_timer("json_parse"):
+        return _parse_llm_response(response.content)
+
+
+def _transaction_key(transaction_data: Dict[str, Any]) -> tuple:
+    """
+    Key used to recognise the same row extracted from two adjacent chunks.
+    """
+    try:
+        amount = round(abs(float(transaction_data.get('amount', 0))), 2)
+    except (TypeError, ValueError):
+        amount = transaction_data.get('amount')
+    description = ' '.join(str(transaction_data.get('description', '')).lower().split())
+    return (
+        str(transaction_data.get('date', '')).strip(),
+        description,
+        amount,
+        transaction_data.get('transaction_type')
+    )
+
+
+def merge_chunk_results(
+    chunk_results: List[List[Dict[str, Any]]],
+    overlaps: Optional[List[int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk LLM results in statement order.
+   
+    A chunk that starts with lines repeated from a row cut returns the rows on
+    those lines a second time. Its leading rows that the previous chunk also
+    returned are dropped, at most one per repeated line. Everything else is
+    kept, so identical rows within a chunk or on both sides of a page boundary
+    (e.g. two coffees on the same day) stay separate transactions.
+   
+    Args:
+        chunk_results: Transactions extracted from each chunk, in chunk order
+        overlaps: Lines each chunk repeats from the previous one (see
+            _iter_chunks); no chunk overlaps when None
+       
+    Returns:
+        Merged list of transaction dictionaries
+    """
+    merged = []
+    previous = Counter()
+   
+    for index, rows in enumerate(chunk_results):
+        rows = [row for row in rows if isinstance(row, dict)]
+        keys = [_transaction_key(row) for row in rows]
+        carried = Counter(previous)
+        repeated = overlaps[index] if overlaps is not None else 0
+        skip = 0
+        while skip < min(repeated, len(rows)) and carried[keys[skip]] > 0:
+            carried[keys[skip]] -= 1
+            skip += 1
+        merged.extend(rows[skip:])
+        previous = Counter(keys)
+   
+    return merged
+
+
+def _parse_transactions(document: Union[str, Iterable[str]]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Parse all chunks of a statement with the LLM.
+    
+    Args:
+        document: Statement text, or its pages (possibly still being extracted);
+            each chunk is sent to the LLM as soon as it is complete
+    
+    Returns:
+        Merged transactions, and whether every chunk was parsed successfully
+    """
+    pages = document.split('\f') if isinstance(document, str) else document
+    chunks = _iter_chunks(pages)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return [], True
+    
+    llm = get_llm()
+    
+    # At most settings.LLM_MAX_CONCURRENCY chunks are sent at a time; futures are
+    # collected in chunk order so results merge in statement order
+    max_workers = max(1, settings.LLM_MAX_CONCURRENCY)
+    overlaps = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for chunk, overlap in itertools.chain([first_chunk], chunks):
+            overlaps.append(overlap)
+            futures.append(executor.submit(_parse_chunk_with_llm, llm, chunk))
+        chunk_results = [future.result() for future in futures]
+    
+    complete = all(rows is not None for rows in chunk_results)
+    return merge_chunk_results([rows or [] for rows in chunk_results], overlaps), complete
+
+
+def parse_transactions_with_llm(document_text: str) -> List[Dict[str, Any]]:
+    """
+    Use LLM to parse bank statement text and extract transaction data.
+   
+    The text is split into chunks within the token budget, the chunks are sent
+    to the LLM concurrently (at most settings.LLM_MAX_CONCURRENCY at a time),
+    and the results are merged in statement order.
+   
+    Args:
+        document_text: Raw text extracted from the PDF
+       
+    Returns:
+        List of transaction dictionaries
+    """
+    try:
+        transactions_data, _ = _parse_transactions(document_text)
+        return transactions_data
+   
+    except Exception:
+        logger.exception("Error calling LLM for transaction parsing")
+        return []
@@ -0,0 +1,48 @@
+"""
+Page-range text extraction backends for statement PDFs.
+
+This module deliberately imports nothing from the app, so process pool workers
+(started with ``spawn``) only load it and the PDF library they use.
+"""
+from typing import Callable, Dict, List
+
+
+def count_pages(pdf_path: str) -> int:
+    """
+    Number of pages in a PDF, read from its page tree without extracting text.
+    """
+    from pypdf import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def pypdf_pages(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages ``start`` to ``stop - 1`` with pypdf.
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    return [reader.pages[index].extract_text() for index in range(start, min(stop, len(reader.pages)))]
+
+
+def pdfminer_pages(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages ``start`` to ``stop - 1`` with pdfminer's layout analysis.
+    """
+    from pdfminer.high_level import extract_text
+    # pdfminer ends every page with a form feed
+    text = extract_text(pdf_path, page_numbers=range(start, stop))
+    return text.split('\f')[:-1]
+
+
+# Page-range extractors by backend name
+PAGE_EXTRACTORS: Dict[str, Callable[[str, int, int], List[str]]] = {
+    'pypdf': pypdf_pages,
+    'pdfminer': pdfminer_pages,
+}
+
+
+def extract_pages(backend: str, pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Process pool entry point: extract a page range with the named backend.
+    """
+    return PAGE_EXTRACTORS[backend](pdf_path, start, stop)
@@ -0,0 +1,181 @@
+import argparse
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import extract, func
+from sqlalchemy.orm import Session
+
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.transaction import Transaction
+from app.services.summaries import TRANSACTION_TYPES, build_monthly_summary, build_yearly_summary
+from app.utils.upsert import upsert_rows
+
+
+# Unique key of a rollup row (uq_monthly_rollups_user_month_type_category)
+ROLLUP_KEY = ('user_id', 'year', 'month', 'transaction_type', 'category')
+
+
+def _rollup_category(category: Optional[str]) -> str:
+    return category or 'Uncategorized'
+
+
+class MonthlyRollupService:
+    """
+    Maintains per-user monthly totals so summaries never scan transaction history.
+
+    Every insert path calls ``apply`` in the same database transaction as the
+    insert, so the rollups commit or roll back together with the transactions.
+    Rows are upserted with the increments done in SQL (``total = total + delta``),
+    so concurrent inserts for the same month neither lose updates nor collide
+    on the unique key.
+    """
+
+    def apply(self, db: Session, user_id: int, transactions_data: List[Dict[str, Any]]):
+        """
+        Add transactions to the user's rollups. The caller commits.
+
+        Args:
+            db: Database session
+            user_id: Owner of the transactions
+            transactions_data: Dictionaries (or objects) with date, amount,
+                transaction_type and category
+        """
+        deltas: Dict[Tuple[int, int, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+        for data in transactions_data:
+            if not isinstance(data, dict):
+                data = {
+                    'date': data.date, 'amount': data.amount,
+                    'transaction_type': data.transaction_type, 'category': data.category
+                }
+            key = (data['date'].year, data['date'].month, data['transaction_type'], _rollup_category(data.get('category')))
+            deltas[key][0] += data['amount']
+            deltas[key][1] += 1
+
+        if not deltas:
+            return
+
+        # One upsert for the whole batch: new keys are inserted and existing ones
+        # incremented in SQL, so concurrent inserts for a new month cannot collide
+        # on the unique key (a single statement where ON CONFLICT is available)
+        upsert_rows(db, MonthlyRollup.__table__, ROLLUP_KEY, [
+            {
+                'user_id': user_id, 'year': year, 'month': month, 'transaction_type': transaction_type,
+                'category': category, 'total': total, 'count': count
+            }
+            for (year, month, transaction_type, category), (total, count) in deltas.items()
+        ], increment=('total', 'count'))
+
+    def rebuild(self, db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Recompute rollups from the transactions table. The caller commits.
+
+        Args:
+            db: Database session
+            user_id: Rebuild only this user's rollups (all users when None)
+
+        Returns:
+            Number of rollup rows written
+        """
+        year = extract('year', Transaction.date)
+        month = extract('month', Transaction.date)
+        query = db.query(
+            Transaction.user_id, year, month, Transaction.transaction_type, Transaction.category,
+            func.sum(Transaction.amount), func.count(Transaction.id)
+        )
+        delete = db.query(MonthlyRollup)
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+            delete = delete.filter(MonthlyRollup.user_id == user_id)
+        grouped = query.group_by(
+            Transaction.user_id, year, month, Transaction.transaction_type, Transaction.category
+        ).all()
+
+        # NULL and 'Uncategorized' are stored under the same category
+        totals: Dict[Tuple[int, int, int, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+        for row_user_id, row_year, row_month, transaction_type, category, total, count in grouped:
+            key = (row_user_id, int(row_year), int(row_month), transaction_type, _rollup_category(category))
+            totals[key][0] += total or 0
+            totals[key][1] += count
+
+        delete.delete(synchronize_session=False)
+        db.add_all([
+            MonthlyRollup(user_id=row_user_id, year=row_year, month=row_month, transaction_type=transaction_type,
+                          category=category, total=total, count=count)
+            for (row_user_id, row_year, row_month, transaction_type, category), (total, count) in totals.items()
+        ])
+        db.flush()
+        return len(totals)
+
+    def rebuild_if_empty(self, db: Session) -> int:
+        """
+        Build rollups for existing history the first time the table is deployed.
+        """
+        if db.query(MonthlyRollup.id).first() is not None:
+            return 0
+        if db.query(Transaction.id).first() is None:
+            return 0
+        return self.rebuild(db)
+
+    def monthly_summary(self, db: Session, user_id: int, year: int, month: int) -> Dict[str, Any]:
+        """
+        Totals by type and expenses by category for one month.
+        """
+        rows = db.query(MonthlyRollup.transaction_type, MonthlyRollup.category, MonthlyRollup.total).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year == year,
+            MonthlyRollup.month == month
+        ).all()
+        return build_monthly_summary(rows)
+
+    def overall_summary(self, db: Session, user_id: int) -> Dict[str, Any]:
+        """
+        All-time totals by type and expenses by category.
+        """
+        rows = db.query(
+            MonthlyRollup.transaction_type, MonthlyRollup.category, func.sum(MonthlyRollup.total)
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.transaction_type.in_(TRANSACTION_TYPES)
+        ).group_by(MonthlyRollup.transaction_type, MonthlyRollup.category).all()
+        return build_monthly_summary(rows)
+
+    def yearly_summary(self, db: Session, user_id: int, year: int) -> Dict[str, Any]:
+        """
+        Totals by month and type for one year.
+        """
+        rows = db.query(
+            MonthlyRollup.month, MonthlyRollup.transaction_type, func.sum(MonthlyRollup.total)
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year == year,
+            MonthlyRollup.transaction_type.in_(TRANSACTION_TYPES)
+        ).group_by(MonthlyRollup.month, MonthlyRollup.transaction_type).all()
+        return build_yearly_summary(rows)
+
+
+# Shared rollup service instance
+monthly_rollups = MonthlyRollupService()
+
+
+def main():
+    """
+    Rebuild monthly rollups from scratch:
+        python -m app.services.rollups [--user-id ID]
+    """
+    parser = argparse.ArgumentParser(description="Rebuild the monthly_rollups table from transactions")
+    parser.add_argument('--user-id', type=int, default=None, help="Rebuild only this user's rollups")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        count = monthly_rollups.rebuild(db, args.user_id)
+        db.commit()
+        print(f"Rebuilt {count} monthly rollup rows")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import re
+import hashlib
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+
+# Bump when the sanitizer output changes so cached sanitized text is not reused
+SANITIZER_VERSION = "1"
+
+
+# Business keywords that mark a "First Last" match as a merchant rather than a person
+BUSINESS_KEYWORDS = ['Bank', 'Corp', 'LLC', 'Inc', 'Company', 'Store', 'Market', 'Restaurant',
+                     'Gas', 'Station', 'Pharmacy', 'Hospital', 'University', 'School', 'Hotel',
+                     'Walmart', 'Amazon', 'Starbucks', 'Netflix', 'McDonald', 'Shell', 'Target',
+                     'CVS', 'Kroger', 'Uber', 'Lyft', 'PayPal', 'Venmo', 'Zelle', 'Chase',
+                     'Wells', 'Fargo', 'Citibank', 'BOA', 'Deposit', 'Withdrawal', 'Transfer']
+
+
+# Common merchant names that the name pass removes by mistake
+MERCHANT_FIXES = {
+    '[NAME REMOVED] Supercenter': 'Walmart Supercenter',
+    '[NAME REMOVED] Coffee': 'Starbucks Coffee',
+    '[NAME REMOVED] Subscription': 'Netflix Subscription',
+    '[NAME REMOVED] Restaurant': 'McDonald\'s Restaurant',
+    '[NAME REMOVED] Ride': 'Uber Ride',
+    '[NAME REMOVED] Store': 'Target Store',
+    'Direct [NAME REMOVED]': 'Direct Deposit'
+}
+
+
+class StatementSanitizer:
+    """
+    Precompiled sanitizer for bank statement text.
+
+    All patterns, the business keyword matcher and the merchant fix table are
+    compiled once. Passes run in the same order as the original implementation
+    because later passes see the output of earlier ones; passes whose trigger
+    cannot occur in the text are skipped.
+    """
+
+    def __init__(self, business_keywords: Optional[List[str]] = None,
+                 merchant_fixes: Optional[Dict[str, str]] = None):
+        business_keywords = business_keywords if business_keywords is not None else BUSINESS_KEYWORDS
+        merchant_fixes = merchant_fixes if merchant_fixes is not None else MERCHANT_FIXES
+
+        # 1. Account numbers
+        self.account_pattern = re.compile(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b|\b\d{10,20}\b')
+        # 2. Routing numbers
+        self.routing_pattern = re.compile(r'\b\d{9}\b')
+        # 3. Social Security Numbers
+        self.ssn_pattern = re.compile(r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b')
+        # 4. Phone numbers
+        self.phone_pattern = re.compile(r'\b\(?[\d\s\-\(\)]{10,15}\b')
+        # 5. Email addresses
+        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        # 6. Street addresses (city/state are kept for geographic context).
+        # Same alternatives as Street|St|Avenue|Ave|...|Place|Pl, factored by prefix in the
+        # same order and guarded by their first letters so backtracking fails fast.
+        self.address_pattern = re.compile(
+            r'\b\d+\s+[A-Za-z0-9\s,]+(?=[sarldbcp])'
+            r'(?:St(?:reet)?|Ave(?:nue)?|R(?:oad|d)|Dr(?:ive)?|L(?:ane|n)|B(?:oulevard|lvd)|C(?:ir(?:cle)?|ourt|t)|Pl(?:ace)?)\b',
+            re.IGNORECASE
+        )
+        # 7. Personal names in "First Last" format
+        self.name_pattern = re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\b')
+        # 8. "Account Holder:" header lines
+        self.holder_pattern = re.compile(r'Account Holder:?\s*[^\n\r]*', re.IGNORECASE)
+        # 9. Check numbers
+        self.check_pattern = re.compile(r'\bCheck\s*#?\s*\d+\b', re.IGNORECASE)
+        # 10. Credit card numbers
+        self.cc_pattern = re.compile(
+            r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3[0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b'
+        )
+
+        # Single case-insensitive alternation replaces the per-match keyword loop
+        self.business_pattern = re.compile(
+            '|'.join(re.escape(keyword) for keyword in business_keywords),
+            re.IGNORECASE
+        ) if business_keywords else None
+
+        # Single-pass merchant fixes. Prefix fixes ("Direct [NAME REMOVED]") are applied
+        # after suffix fixes in the original loop, so they must not steal a placeholder
+        # that a suffix fix would have consumed first.
+        self.merchant_fixes = dict(merchant_fixes)
+        self.merchant_pattern = self._compile_merchant_fixes(self.merchant_fixes)
+
+        # Decisions for names already seen; statements repeat the same payees
+        self._name_cache: Dict[str, str] = {}
+
+    @staticmethod
+    def _compile_merchant_fixes(merchant_fixes: Dict[str, str]) -> Optional[re.Pattern]:
+        """
+        Compile the merchant fix table into one pattern that gives the same result
+        as applying ``str.replace`` for each entry in order.
+        """
+        placeholder = '[NAME REMOVED]'
+        suffix_keys = [key for key in merchant_fixes if key.startswith(placeholder)]
+        prefix_keys = [key for key in merchant_fixes if key not in suffix_keys]
+
+        # Only the table shape used by the original function can be fused safely
+        if not merchant_fixes or any(not key.endswith(placeholder) for key in prefix_keys):
+            return None
+        if list(merchant_fixes) != suffix_keys + prefix_keys:
+            return None
+
+        alternatives = [re.escape(key) for key in suffix_keys]
+        if prefix_keys:
+            suffix_tails = '|'.join(re.escape(key[len(placeholder):]) for key in suffix_keys)
+            guard = f'(?!{suffix_tails})' if suffix_tails else ''
+            alternatives.extend(re.escape(key) + guard for key in prefix_keys)
+        return re.compile('|'.join(alternatives))
+
+    def _encrypt_account(self, mappings: Dict[str, str]):
+        def encrypt_account(match):
+            account_num = match.group()
+            # Create a hash for internal reference
+            account_hash = hashlib.sha256(account_num.encode()).hexdigest()[:8]
+            encrypted_ref = f"ACCT_{account_hash}"
+            mappings[encrypted_ref] = account_num
+            return f"****-****-****-{account_num[-4:]}"  # Show only last 4 digits
+        return encrypt_account
+
+    def _anonymize_name(self, match) -> str:
+        name = match.group()
+        cached = self._name_cache.get(name)
+        if cached is not None:
+            return cached
+        # Don't remove if it looks like a business name (contains certain keywords)
+        if self.business_pattern is not None and self.business_pattern.search(name):
+            result = name
+        else:
+            result = '[NAME REMOVED]'
+        if len(self._name_cache) < 65536:
+            self._name_cache[name] = result
+        return result
+
+    def _apply_merchant_fixes(self, text: str) -> str:
+        if self.merchant_pattern is None:
+            for incorrect, correct in self.merchant_fixes.items():
+                text = text.replace(incorrect, correct)
+            return text
+        if '[NAME REMOVED]' not in text:
+            return text
+        return self.merchant_pattern.sub(lambda m: self.merchant_fixes[m.group()], text)
+
+    def sanitize(self, text: str) -> Dict[str, Any]:
+        """
+        Remove and encrypt sensitive information before sending to LLM.
+
+        Args:
+            text: Raw bank statement text
+
+        Returns:
+            Dictionary containing sanitized text and mappings for restoration
+        """
+        mappings = {}
+        sanitized_text = self._sanitize_text(text, mappings)
+        return {
+            'sanitized_text': sanitized_text,
+            'mappings': mappings,
+            'original_length': len(text),
+            'sanitized_length': len(sanitized_text)
+        }
+
+    def mask_account_numbers(self, text: str) -> str:
+        """
+        Mask account and card numbers only, keeping their last 4 digits.
+
+        For descriptions stored as the user's own data (CSV/OFX imports and rows
+        read by a statement template) that are never sent to the LLM; merchant
+        and payee names are kept as they are.
+        """
+        text = self.account_pattern.sub(lambda m: f"****-****-****-{m.group()[-4:]}", text)
+        return self.cc_pattern.sub(lambda m: f"****-****-****-{m.group()[-4:]}", text)
+
+    def sanitize_pages(self, pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Sanitize a statement page by page.
+
+        Each page is sanitized independently, so a pattern that would span a page
+        break in the joined text is not matched across it.
+
+        Args:
+            pages: Iterable of page texts (e.g. a generator from the PDF extractor)
+
+        Yields:
+            One result dictionary per page, in the same format as ``sanitize``
+        """
+        for page in pages:
+            yield self.sanitize(page)
+
+    def _sanitize_text(self, text: str, mappings: Dict[str, str]) -> str:
+        # One pass per pattern, in this order: each pass sees the previous
+        # passes' output, and the patterns overlap. Account numbers must be
+        # masked before the routing, SSN and phone patterns take their digits;
+        # the phone pattern also rewrites runs of amounts ("210.34    4547.17"
+        # becomes "210.(***) ***-****.17"); the name pass turns "Account
+        # Holder" itself into a placeholder, so the holder pass only sees
+        # lines it left alone. A single alternation would pick one
+        # match per position and change the output, so cached sanitized text
+        # and the LLM input would differ from what this version produces.
+        sanitized_text = text
+
+        sanitized_text = self.account_pattern.sub(self._encrypt_account(mappings), sanitized_text)
+        sanitized_text = self.routing_pattern.sub('*********', sanitized_text)
+        sanitized_text = self.ssn_pattern.sub('***-**-****', sanitized_text)
+        sanitized_text = self.phone_pattern.sub('(***) ***-****', sanitized_text)
+        if '@' in sanitized_text:
+            sanitized_text = self.email_pattern.sub('****@****.com', sanitized_text)
+        sanitized_text = self.address_pattern.sub('[STREET ADDRESS REMOVED]', sanitized_text)
+        sanitized_text = self.name_pattern.sub(self._anonymize_name, sanitized_text)
+        sanitized_text = self.holder_pattern.sub('Account Holder: [NAME REMOVED]', sanitized_text)
+        sanitized_text = self.check_pattern.sub('Check #****', sanitized_text)
+        sanitized_text = self.cc_pattern.sub(lambda m: f"****-****-****-{m.group()[-4:]}", sanitized_text)
+        sanitized_text = self._apply_merchant_fixes(sanitized_text)
+
+        return sanitized_text
+
+
+# Shared sanitizer instance
+default_sanitizer = StatementSanitizer()
+
+
+def sanitize_bank_statement(text: str) -> Dict[str, Any]:
+    """
+    Remove and encrypt sensitive information before sending to LLM.
+
+    Args:
+        text: Raw bank statement text
+
+    Returns:
+        Dictionary containing sanitized text and mappings for restoration
+    """
+    return default_sanitizer.sanitize(text)
@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+
+
+TRANSACTION_TYPES = ('income', 'expense', 'investment')
+
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """
+    Half-open [start, end) datetime range covering one month.
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def year_range(year: int) -> Tuple[datetime, datetime]:
+    """
+    Half-open [start, end) datetime range covering one year.
+    """
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def build_monthly_summary(rows: Iterable[Tuple[str, Optional[str], float]]) -> Dict[str, Any]:
+    """
+    Build the monthly summary response (also used for all-time totals) from grouped totals.
+
+    Args:
+        rows: (transaction_type, category, total) tuples; a category may appear
+            more than once (e.g. NULL and 'Uncategorized')
+
+    Returns:
+        Totals by type, net savings and expenses by category
+    """
+    totals = {transaction_type: 0 for transaction_type in TRANSACTION_TYPES}
+    expense_by_category = {}
+    for transaction_type, category, total in rows:
+        total = total or 0
+        if transaction_type in totals:
+            totals[transaction_type] += total
+        if transaction_type == 'expense':
+            category = category or 'Uncategorized'
+            expense_by_category[category] = expense_by_category.get(category, 0) + total
+
+    return {
+        "total_income": totals['income'],
+        "total_expense": totals['expense'],
+        "total_investment": totals['investment'],
+        "net_savings": totals['income'] - totals['expense'] - totals['investment'],
+        "expense_by_category": expense_by_category
+    }
+
+
+def build_yearly_summary(rows: Iterable[Tuple[int, str, float]]) -> Dict[str, Any]:
+    """
+    Build the yearly summary response from grouped totals.
+
+    Args:
+        rows: (month, transaction_type, total) tuples
+
+    Returns:
+        Totals by month and type, and yearly totals
+    """
+    monthly_data = {i: {"income": 0, "expense": 0, "investment": 0} for i in range(1, 13)}
+    for month, transaction_type, total in rows:
+        if transaction_type in TRANSACTION_TYPES:
+            monthly_data[int(month)][transaction_type] += total or 0
+
+    yearly_totals = {
+        "total_income": sum(data["income"] for data in monthly_data.values()),
+        "total_expense": sum(data["expense"] for data in monthly_data.values()),
+        "total_investment": sum(data["investment"] for data in monthly_data.values())
+    }
+    yearly_totals["net_savings"] = yearly_totals["total_income"] - yearly_totals["total_expense"] - yearly_totals["total_investment"]
+
+    return {
+        "monthly_data": monthly_data,
+        "yearly_totals": yearly_totals
+    }
+
+
+def monthly_summary_from_transactions(db: Session, user_id: int, year: int, month: int) -> Dict[str, Any]:
+    """
+    Monthly summary computed with one grouped aggregate over the transactions table.
+    """
+    start, end = month_range(year, month)
+    rows = db.query(
+        Transaction.transaction_type, Transaction.category, func.sum(Transaction.amount)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.transaction_type.in_(TRANSACTION_TYPES),
+        Transaction.date >= start,
+        Transaction.date < end
+    ).group_by(Transaction.transaction_type, Transaction.category).all()
+    return build_monthly_summary(rows)
+
+
+def overall_summary_from_transactions(db: Session, user_id: int) -> Dict[str, Any]:
+    """
+    All-time totals in the monthly summary shape, from one grouped aggregate.
+    """
+    rows = db.query(
+        Transaction.transaction_type, Transaction.category, func.sum(Transaction.amount)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.transaction_type.in_(TRANSACTION_TYPES)
+    ).group_by(Transaction.transaction_type, Transaction.category).all()
+    return build_monthly_summary(rows)
+
+
+def yearly_summary_from_transactions(db: Session, user_id: int, year: int) -> Dict[str, Any]:
+    """
+    Yearly summary computed with one grouped aggregate over the transactions table.
+    """
+    start, end = year_range(year)
+    month = extract('month', Transaction.date)
+    rows = db.query(
+        month, Transaction.transaction_type, func.sum(Transaction.amount)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.transaction_type.in_(TRANSACTION_TYPES),
+        Transaction.date >= start,
+        Transaction.date < end
+    ).group_by(month, Transaction.transaction_type).all()
+    return build_yearly_summary(rows)
@@ -0,0 +1,280 @@
+import re
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.services.sanitizer import default_sanitizer
+
+
+# Lines that start with a date are transaction row candidates
+DEFAULT_ROW_CANDIDATE = re.compile(r'^\s*\d{1,4}[/-]\d{1,2}(?:[/-]\d{2,4})?\b')
+
+# Amount tokens such as 1,234.56, -12.00 or (12.00)
+AMOUNT_PATTERN = re.compile(r'\(?-?\$?[\d,]*\d\.\d{2}\)?')
+
+# Descriptions that mark a positive amount as income on statements with unsigned
+# amounts. Not 'credit': it also names card payments ("Credit Card Payment");
+# credits are told apart by their column (ColumnStatementTemplate) or sign instead
+DEFAULT_INCOME_KEYWORDS = ('deposit', 'payroll', 'salary', 'refund', 'interest paid', 'dividend')
+
+
+def _parse_amount(token: str) -> Optional[float]:
+    token = token.strip()
+    negative = token.startswith('(') and token.endswith(')') or '-' in token
+    cleaned = token.strip('()').replace('$', '').replace(',', '').replace('-', '')
+    try:
+        value = float(cleaned)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+class StatementTemplate:
+    """
+    Deterministic parser for one bank statement layout.
+
+    A template recognises a statement by fingerprint patterns that must all
+    appear in the header (the first ``header_lines`` lines of the statement), then
+    parses each row candidate with a compiled row pattern. Candidates that do not
+    match are returned as unparsed so the caller can fall back to the LLM for just
+    those lines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        fingerprint: List[str],
+        row_pattern: str,
+        date_formats: List[str],
+        income_keywords: Tuple[str, ...] = DEFAULT_INCOME_KEYWORDS,
+        signed_amounts: bool = False,
+        header_lines: int = 40,
+        row_candidate: re.Pattern = DEFAULT_ROW_CANDIDATE
+    ):
+        """
+        Args:
+            name: Template name
+            version: Bump when parsing changes so cached results are invalidated
+            fingerprint: Patterns that must all match the statement header
+            row_pattern: Pattern with ``date``, ``description`` and ``amount`` groups
+            date_formats: strptime formats tried in order for the ``date`` group
+            income_keywords: Description keywords that mark a positive amount as income
+                when the statement's amounts are unsigned
+            signed_amounts: Positive amounts are credits (income) and negative are debits;
+                also assumed for any statement that shows a negative amount
+            header_lines: Number of leading lines used for fingerprinting
+            row_candidate: Pattern identifying lines that should be transactions
+        """
+        self.name = name
+        self.version = version
+        self.fingerprint = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in fingerprint]
+        self.row_pattern = re.compile(row_pattern)
+        self.date_formats = date_formats
+        self.income_keywords = tuple(keyword.lower() for keyword in income_keywords)
+        self.signed_amounts = signed_amounts
+        self.header_lines = header_lines
+        self.row_candidate = row_candidate
+
+    def matches(self, text: str) -> bool:
+        """
+        Check whether the statement header matches this template's fingerprint.
+        """
+        header = '\n'.join(text.split('\n', self.header_lines)[:self.header_lines])
+        return all(pattern.search(header) for pattern in self.fingerprint)
+
+    def _parse_date(self, value: str) -> Optional[str]:
+        for fmt in self.date_formats:
+            try:
+                return datetime.strptime(value.strip(), fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return None
+
+    def _transaction_type(self, description: str, amount: float, signed: bool) -> str:
+        if amount < 0:
+            return 'expense'
+        if signed:
+            return 'income'
+        lowered = description.lower()
+        if any(keyword in lowered for keyword in self.income_keywords):
+            return 'income'
+        return 'expense'
+
+    def _build_row(self, date_text: str, description: str, amount_text: str,
+                   signed: bool = False) -> Optional[Dict[str, Any]]:
+        date = self._parse_date(date_text)
+        amount = _parse_amount(amount_text)
+        if date is None or amount is None:
+            return None
+        description = ' '.join(description.split())
+        transaction_type = self._transaction_type(description, amount, signed)
+        return {
+            'date': date,
+            # Template rows never reach the LLM; keep the description apart from
+            # account and card numbers
+            'description': default_sanitizer.mask_account_numbers(description),
+            'amount': abs(amount),
+            'transaction_type': transaction_type
+        }
+
+    def parse_row(self, line: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Parse one row candidate, or return None if it does not fit the layout.
+        """
+        match = self.row_pattern.match(line)
+        if match is None:
+            return None
+        return self._build_row(match.group('date'), match.group('description'), match.group('amount'),
+                               context.get('signed', False))
+
+    def prepare(self, text: str) -> Dict[str, Any]:
+        """
+        Compute per-statement layout context (e.g. column positions) before parsing rows.
+
+        A statement that shows any row amount as negative signs its amounts, so
+        the sign alone tells debits from credits.
+        """
+        signed = self.signed_amounts
+        if not signed:
+            for line in text.replace('\f', '\n').split('\n'):
+                match = self.row_pattern.match(line) if self.row_candidate.match(line) else None
+                if match is not None and (_parse_amount(match.group('amount')) or 0) < 0:
+                    signed = True
+                    break
+        return {'signed': signed}
+
+    def parse(self, text: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Parse a statement.
+
+        Returns:
+            Parsed transaction dictionaries, and row candidates the template could not parse
+        """
+        context = self.prepare(text)
+        rows = []
+        unparsed = []
+        for line in text.replace('\f', '\n').split('\n'):
+            if not self.row_candidate.match(line):
+                continue
+            row = self.parse_row(line, context)
+            if row is None:
+                unparsed.append(line)
+            else:
+                rows.append(row)
+        return rows, unparsed
+
+
+class ColumnStatementTemplate(StatementTemplate):
+    """
+    Template for layouts with separate debit and credit columns.
+
+    Column positions are taken from the column header line, and each amount on a
+    row is assigned to the column whose header it is aligned under. The last
+    amount column (usually the running balance) is ignored.
+    """
+
+    def __init__(self, name: str, version: str, fingerprint: List[str], header_pattern: str,
+                 date_formats: List[str], debit_column: str = 'Debit', credit_column: str = 'Credit',
+                 **kwargs):
+        super().__init__(name, version, fingerprint, row_pattern=r'(?P<date>\S+)', date_formats=date_formats, **kwargs)
+        self.header_pattern = re.compile(header_pattern, re.IGNORECASE | re.MULTILINE)
+        self.debit_column = debit_column.lower().rstrip('s')
+        self.credit_column = credit_column.lower().rstrip('s')
+        self.date_token = re.compile(r'^\s*(\S+)\s+')
+
+    def prepare(self, text: str) -> Dict[str, Any]:
+        match = self.header_pattern.search(text)
+        if match is None:
+            return {}
+        header = match.group(0)
+        columns = {}
+        for word in re.finditer(r'\S+', header):
+            # Amount columns are right aligned, so keep the end offset of each header
+            columns[word.group(0).lower().rstrip('s')] = word.end()
+        return {'columns': columns}
+
+    def parse_row(self, line: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        columns = context.get('columns') or {}
+        if self.debit_column not in columns or self.credit_column not in columns:
+            return None
+
+        date_match = self.date_token.match(line)
+        amounts = list(AMOUNT_PATTERN.finditer(line))
+        if date_match is None or not amounts:
+            return None
+
+        description = line[date_match.end():amounts[0].start()]
+        for amount in amounts:
+            end = amount.end()
+            column = min(columns, key=lambda name: abs(columns[name] - end))
+            if column == self.debit_column:
+                value = _parse_amount(amount.group(0))
+                return self._build_row(date_match.group(1), description, f"-{abs(value)}" if value is not None else '')
+            if column == self.credit_column:
+                row = self._build_row(date_match.group(1), description, amount.group(0))
+                if row is not None:
+                    row['transaction_type'] = 'income'
+                return row
+        return None
+
+
+class TemplateRegistry:
+    """
+    Registry of statement templates, tried in registration order.
+    """
+
+    def __init__(self):
+        self.templates: List[StatementTemplate] = []
+
+    def register(self, template: StatementTemplate) -> StatementTemplate:
+        """
+        Register a template. Returns it so registration can be chained.
+        """
+        self.templates.append(template)
+        return template
+
+    def match(self, text: str) -> Optional[StatementTemplate]:
+        """
+        Find the first template whose fingerprint matches the statement.
+        """
+        for template in self.templates:
+            if template.matches(text):
+                return template
+        return None
+
+    def version(self) -> str:
+        """
+        Version of the registered template set, used in cache keys.
+        """
+        signature = '|'.join(f"{template.name}:{template.version}" for template in self.templates)
+        return hashlib.sha256(signature.encode()).hexdigest()[:12]
+
+
+# Shared registry with the built-in layouts
+template_registry = TemplateRegistry()
+
+# Single signed or unsigned amount column followed by a running balance:
+# 01/15/2024  Starbucks Coffee        4.50   1,234.56
+template_registry.register(StatementTemplate(
+    name='amount_balance_columns',
+    version='3',
+    fingerprint=[r'^[ \t]*Date[ \t]+Description[ \t]+Amount[ \t]+Balance[ \t]*$'],
+    row_pattern=(
+        r'^\s*(?P<date>\d{1,2}/\d{1,2}/\d{4})\s+(?P<description>\S.*?)\s{2,}'
+        r'(?P<amount>\(?-?\$?[\d,]*\d\.\d{2}\)?)\s+\(?-?\$?[\d,]*\d\.\d{2}\)?\s*$'
+    ),
+    date_formats=['%m/%d/%Y']
+))
+
+# Separate debit and credit columns followed by a running balance:
+# 01/15/2024  Starbucks Coffee        4.50                  1,234.56
+template_registry.register(ColumnStatementTemplate(
+    name='debit_credit_columns',
+    version='2',
+    fingerprint=[r'^[ \t]*Date[ \t]+Description[ \t]+Debits?[ \t]+Credits?[ \t]+Balance[ \t]*$'],
+    header_pattern=r'^[ \t]*Date[ \t]+Description[ \t]+Debits?[ \t]+Credits?[ \t]+Balance[ \t]*$',
+    date_formats=['%m/%d/%Y', '%m/%d/%y'],
+    debit_column='Debit',
+    credit_column='Credit'
+))
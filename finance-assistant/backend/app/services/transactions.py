@@ -0,0 +1,320 @@
+import hashlib
+import logging
+import re
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Callable, Optional, Tuple, Union
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionCreate, Transaction as TransactionSchema
+from app.services.context import financial_context
+from app.services.rollups import monthly_rollups
+
+
+logger = logging.getLogger(__name__)
+
+# Columns returned by the INSERT so response objects need no follow-up SELECT
+_RETURNING_COLUMNS = (Transaction.id, Transaction.created_at, Transaction.updated_at)
+
+# Runs of anything but letters and digits, collapsed to one space in fingerprints
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# How the unique fingerprint index names itself in IntegrityError messages
+# (SQL Server and PostgreSQL name the index, SQLite the column)
+_FINGERPRINT_CONFLICT_MARKERS = ('ix_transactions_fingerprint', 'transactions.fingerprint')
+
+
+def validate_transaction_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate rows against TransactionCreate, skipping invalid ones.
+
+    Returns:
+        Validated rows as plain dictionaries
+    """
+    validated = []
+    for row in rows:
+        try:
+            validated.append(TransactionCreate(**row).dict())
+        except Exception as e:
+            logger.warning("Skipping invalid transaction %r: %s", row, e)
+    return validated
+
+
+def bulk_insert_transactions(
+    db: Session,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    returning: bool = True
+) -> Union[List[TransactionSchema], List[Dict[str, Any]]]:
+    """
+    Insert validated transaction rows with batched multi-row INSERT statements.
+
+    Where the dialect supports INSERT ... RETURNING for multiple rows (SQLite,
+    PostgreSQL, SQL Server via OUTPUT), generated ids and timestamps come back
+    with the insert itself. Otherwise the rows are flushed through the ORM and
+    the timestamps read back with one SELECT per batch. Monthly rollups are
+    updated in the same database transaction, and the user's cached chat
+    context is invalidated when it commits. The caller commits.
+
+    Callers that do not need ids back pass ``returning=False`` for a plain
+    executemany; SQLite cannot return ids from a multi-row INSERT in order, so
+    with RETURNING it sends one statement per row.
+
+    Args:
+        db: Database session
+        user_id: Owner of the transactions
+        rows: Rows already validated by validate_transaction_rows
+        batch_size: Rows per INSERT statement (defaults to settings.BULK_INSERT_BATCH_SIZE)
+        returning: Read back generated ids and timestamps
+
+    Returns:
+        Transaction response objects in input order, or the inserted values
+        (without ids) when ``returning`` is False
+    """
+    if not rows:
+        return []
+    if batch_size is None:
+        batch_size = settings.BULK_INSERT_BATCH_SIZE
+
+    values = [dict(row, user_id=user_id) for row in rows]
+
+    # Summaries read from the rollups, so they change in the same database transaction
+    monthly_rollups.apply(db, user_id, values)
+    financial_context.invalidate_on_commit(db, user_id)
+
+    if not returning:
+        db.connection().execute(insert(Transaction.__table__), values)
+        return values
+
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        statement = insert(Transaction).returning(*_RETURNING_COLUMNS, sort_by_parameter_order=True)
+        result = db.execute(
+            statement.execution_options(insertmanyvalues_page_size=batch_size),
+            values
+        )
+        generated = result.all()
+        return [
+            TransactionSchema(**value, id=row.id, created_at=row.created_at, updated_at=row.updated_at)
+            for value, row in zip(values, generated)
+        ]
+
+    # Fallback for dialects without multi-row RETURNING: one flush, then read the
+    # server-generated timestamps for all new rows with a single SELECT
+    transactions = [Transaction(**value) for value in values]
+    db.add_all(transactions)
+    db.flush()
+    ids = [transaction.id for transaction in transactions]
+    generated = {}
+    for start in range(0, len(ids), batch_size):
+        for row in db.query(*_RETURNING_COLUMNS).filter(Transaction.id.in_(ids[start:start + batch_size])):
+            generated[row.id] = row
+    return [
+        TransactionSchema(**value, id=row_id, created_at=generated[row_id].created_at,
+                          updated_at=generated[row_id].updated_at)
+        for value, row_id in zip(values, ids)
+    ]
+
+
+def _fingerprint_key(user_id: int, row: Dict[str, Any]) -> str:
+    date = row.get('date')
+    day = date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else str(date)[:10]
+    description = _NON_ALNUM.sub(' ', str(row.get('description', '')).lower()).strip()
+    amount = round(abs(float(row.get('amount') or 0)), 2)
+    return f"{user_id}|{day}|{amount:.2f}|{description}|{str(row.get('transaction_type', '')).lower()}"
+
+
+def _fingerprint(key: str, occurrence: int) -> str:
+    return hashlib.sha256(f"{key}|{occurrence}".encode()).hexdigest()
+
+
+def _occurrence_id(first_fingerprint: str) -> int:
+    # Identical rows are counted under 64 bits of their first fingerprint, which
+    # is computed anyway and takes far less memory in a long import than the key
+    return int(first_fingerprint[:16], 16)
+
+
+def transaction_fingerprints(
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    occurrences: Optional[Counter] = None
+) -> List[str]:
+    """
+    Fingerprint imported rows so the same row is recognised in an overlapping
+    statement or a re-upload.
+    
+    A fingerprint hashes the user, the day, the amount rounded to cents, the
+    description lowercased with punctuation and spacing collapsed, and the
+    type, plus the row's occurrence number among identical rows of the same
+    import. Two identical coffees on one day stay two rows, and match the same
+    two rows when the statement is imported again.
+    
+    Args:
+        user_id: Owner of the transactions
+        rows: Rows in statement order
+        occurrences: Counts of the rows seen so far, for an import written in
+            several batches; updated in place
+        
+    Returns:
+        One fingerprint per row, in input order
+    """
+    if occurrences is None:
+        occurrences = Counter()
+    fingerprints = []
+    for row in rows:
+        key = _fingerprint_key(user_id, row)
+        first = _fingerprint(key, 1)
+        occurrence_id = _occurrence_id(first)
+        occurrences[occurrence_id] += 1
+        count = occurrences[occurrence_id]
+        fingerprints.append(first if count == 1 else _fingerprint(key, count))
+    return fingerprints
+
+
+def _existing_fingerprints(db: Session, fingerprints: List[str], batch_size: int) -> set:
+    # One probe of the unique fingerprint index per row, a batch per statement
+    existing = set()
+    for start in range(0, len(fingerprints), batch_size):
+        batch = fingerprints[start:start + batch_size]
+        existing.update(db.scalars(select(Transaction.fingerprint).where(Transaction.fingerprint.in_(batch))))
+    return existing
+
+
+def insert_new_transactions(
+    db: Session,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    occurrences: Optional[Counter] = None,
+    returning: bool = True
+) -> Tuple[Union[List[TransactionSchema], List[Dict[str, Any]]], int]:
+    """
+    Insert imported rows that are not stored yet, skipping duplicates by fingerprint.
+    
+    Fingerprints already in the table are looked up set-wise through the unique
+    fingerprint index, and only the new rows go to bulk_insert_transactions.
+    The unique index still rejects a row that a concurrent import committed in
+    between, as an IntegrityError; save_imported_transactions retries on it.
+    The caller commits.
+    
+    Args:
+        db: Database session
+        user_id: Owner of the transactions
+        rows: Rows already validated by validate_transaction_rows, in statement order
+        batch_size: Rows per lookup and INSERT statement (defaults to settings.BULK_INSERT_BATCH_SIZE)
+        occurrences: Row counts carried over from earlier batches of the same import
+        returning: Read back ids and timestamps (see bulk_insert_transactions)
+        
+    Returns:
+        Inserted transactions in input order, and the number of rows skipped as duplicates
+    """
+    if not rows:
+        return [], 0
+    if batch_size is None:
+        batch_size = settings.BULK_INSERT_BATCH_SIZE
+    
+    fingerprints = transaction_fingerprints(user_id, rows, occurrences)
+    existing = _existing_fingerprints(db, fingerprints, batch_size)
+    new_rows = [
+        dict(row, fingerprint=fingerprint)
+        for row, fingerprint in zip(rows, fingerprints)
+        if fingerprint not in existing
+    ]
+    return bulk_insert_transactions(db, user_id, new_rows, batch_size, returning), len(rows) - len(new_rows)
+
+
+def save_imported_transactions(
+    db: Session,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    on_inserted: Optional[Callable[[List[Any]], None]] = None,
+    occurrences: Optional[Counter] = None,
+    returning: bool = True
+) -> Tuple[Union[List[TransactionSchema], List[Dict[str, Any]]], int]:
+    """
+    Insert new imported rows with insert_new_transactions and commit.
+    
+    When an overlapping statement is imported at the same time (e.g. two months
+    of one batch upload), both may pass the duplicate check for the shared rows;
+    the unique fingerprint index rejects the later insert, which is rolled back
+    and retried so the retry skips the rows the other import stored. Each such
+    conflict means another import committed at least one of these rows, so the
+    retries end. Any other IntegrityError is raised. The session must hold no
+    other uncommitted work.
+    
+    Args:
+        db: Database session
+        user_id: Owner of the transactions
+        rows: Rows already validated by validate_transaction_rows, in statement order
+        on_inserted: Called with the inserted transactions before the commit, to
+            write related rows in the same database transaction
+        occurrences: Row counts carried over from earlier batches of the same
+            import (see transaction_fingerprints); updated in place
+        returning: Read back ids and timestamps (see bulk_insert_transactions)
+            
+    Returns:
+        Inserted transactions in input order, and the number of rows skipped as duplicates
+    """
+    while True:
+        try:
+            transactions, duplicate_count = insert_new_transactions(
+                db, user_id, rows, occurrences=occurrences, returning=returning
+            )
+            if transactions:
+                if on_inserted is not None:
+                    on_inserted(transactions)
+                db.commit()
+            return transactions, duplicate_count
+        except IntegrityError as e:
+            db.rollback()
+            if not _is_fingerprint_conflict(e):
+                raise
+            if occurrences is not None:
+                # The retry counts this batch's rows again
+                occurrences.subtract(
+                    _occurrence_id(_fingerprint(_fingerprint_key(user_id, row), 1)) for row in rows
+                )
+            logger.info("Import for user %s raced a concurrent import of the same rows; retrying", user_id)
+
+
+def _is_fingerprint_conflict(error: IntegrityError) -> bool:
+    message = str(error.orig).lower()
+    return any(marker in message for marker in _FINGERPRINT_CONFLICT_MARKERS)
+
+
+def backfill_fingerprints(db: Session) -> int:
+    """
+    Fingerprint imported rows stored before fingerprints existed, so new imports
+    skip them. Rows are numbered in date order, like one import per user; a row
+    whose fingerprint is already taken is left without one. The caller commits.
+    
+    Returns:
+        Number of rows fingerprinted
+    """
+    rows = db.execute(
+        select(Transaction.id, Transaction.user_id, Transaction.date, Transaction.description,
+               Transaction.amount, Transaction.transaction_type)
+        .where(Transaction.fingerprint.is_(None), Transaction.source != 'manual')
+        .order_by(Transaction.user_id, Transaction.date, Transaction.id)
+    ).mappings().all()
+    
+    by_user = defaultdict(list)
+    for row in rows:
+        by_user[row['user_id']].append(row)
+    
+    updates = []
+    for user_id, user_rows in by_user.items():
+        fingerprints = transaction_fingerprints(user_id, user_rows)
+        taken = _existing_fingerprints(db, fingerprints, settings.BULK_INSERT_BATCH_SIZE)
+        updates.extend(
+            {'id': row['id'], 'fingerprint': fingerprint}
+            for row, fingerprint in zip(user_rows, fingerprints)
+            if fingerprint not in taken
+        )
+    if updates:
+        db.execute(update(Transaction), updates)
+    return len(updates)
@@ -1 +1 @@
-# Initialize utils module
+# Initialize utils module
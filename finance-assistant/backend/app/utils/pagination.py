@@ -0,0 +1,37 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+# Response header carrying the cursor for the next page of a keyset-paginated list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(Exception):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+    pass
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    """
+    Encode the (date, id) position of the last row on a page as an opaque cursor.
+    """
+    raw = f"{date.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_text, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date_text), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
@@ -0,0 +1,50 @@
+import asyncio
+from typing import AsyncIterator, TypeVar
+
+
+T = TypeVar("T")
+
+# Marks the end of the source iterator in the hand-off queue
+_DONE = object()
+
+
+async def iterate_in_task(source: AsyncIterator[T], buffer: int = 64) -> AsyncIterator[T]:
+    """
+    Consume an async iterator in a separate task and re-yield its items.
+
+    Starlette cancels a streaming response's generator when the client
+    disconnects, and that cancellation keeps interrupting any cleanup awaited
+    inside it, so a nested stream (e.g. an LLM request) may never be closed.
+    Here the source runs in its own task, which is cancelled outright when the
+    consumer stops for any reason, so the source's own cancellation handling
+    runs to completion.
+
+    Args:
+        source: Async iterator to consume
+        buffer: Maximum number of items produced ahead of the consumer
+
+    Yields:
+        Items from ``source``; exceptions raised by ``source`` are re-raised
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
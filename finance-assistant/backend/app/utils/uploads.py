@@ -0,0 +1,316 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+import zlib
+from typing import Dict, List, Optional
+
+from fastapi import UploadFile
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+
+# A PDF header may be preceded by junk bytes, but must start within the first 1024 bytes
+PDF_MAGIC = b'%PDF-'
+PDF_HEADER_WINDOW = 1024
+
+# ZIP archives start with a local file header
+ZIP_MAGIC = b'PK\x03\x04'
+ZIP_CONTENT_TYPES = ('application/zip', 'application/x-zip-compressed')
+
+# OFX files (QFX included) start with an SGML header (version 1) or declare
+# themselves in an XML processing instruction (version 2)
+OFX_MARKERS = (b'OFXHEADER', b'<?OFX', b'<OFX>')
+
+# Allowance on top of the file size limits for multipart boundaries, part
+# headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload exceeds the configured size limit.
+    """
+    pass
+
+
+class InvalidUploadType(Exception):
+    """
+    Raised when an upload's content does not match the expected file type.
+    """
+    pass
+
+
+class SpooledUpload:
+    """
+    An upload written to disk, with its size and SHA-256 content hash.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+class _SpoolWriter:
+    """
+    Writes chunks to a new file in ``directory``, hashing them and enforcing the
+    size limit and file type as they arrive.
+    """
+
+    def __init__(self, directory: str, suffix: str, max_bytes: int, magic: Optional[bytes], header_window: int):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=directory)
+        self._out = os.fdopen(fd, 'wb')
+        self._hasher = hashlib.sha256()
+        self._max_bytes = max_bytes
+        self._magic = magic
+        self._header_window = header_window
+        self._header = b''
+        self._type_checked = magic is None
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise UploadTooLarge(f"File exceeds the {self._max_bytes} byte upload limit")
+
+        if not self._type_checked:
+            self._header += chunk[:self._header_window - len(self._header)]
+            if self._magic in self._header:
+                self._type_checked = True
+            elif len(self._header) >= self._header_window:
+                raise InvalidUploadType(f"File content is not {_type_name(self._magic)}")
+
+        self._hasher.update(chunk)
+        self._out.write(chunk)
+
+    def finish(self) -> SpooledUpload:
+        self._out.close()
+        if self.size == 0:
+            raise InvalidUploadType("File is empty")
+        if not self._type_checked:
+            raise InvalidUploadType(f"File content is not {_type_name(self._magic)}")
+        return SpooledUpload(path=self.path, size=self.size, sha256=self._hasher.hexdigest())
+
+    def discard(self):
+        self._out.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _type_name(magic: Optional[bytes]) -> str:
+    return "a ZIP archive" if magic == ZIP_MAGIC else "a PDF"
+
+
+async def spool_upload_to_disk(
+    file: UploadFile,
+    directory: str,
+    suffix: str = '.pdf',
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    magic: Optional[bytes] = PDF_MAGIC,
+    header_window: int = PDF_HEADER_WINDOW
+) -> SpooledUpload:
+    """
+    Stream an upload to a file in fixed-size chunks.
+
+    The content hash is computed while streaming, the upload is rejected as soon
+    as it passes ``max_bytes``, and the file type is checked against ``magic``
+    bytes in the header rather than the file name. Only one chunk is held in
+    memory at a time. The partial file is removed if the upload is rejected.
+
+    Args:
+        file: Uploaded file
+        directory: Directory to write the file to
+        suffix: File name suffix
+        max_bytes: Size limit (defaults to settings.MAX_UPLOAD_BYTES)
+        chunk_size: Read size (defaults to settings.UPLOAD_CHUNK_SIZE)
+        magic: Bytes that must appear within the first ``header_window`` bytes,
+            or None to skip the type check
+
+    Returns:
+        SpooledUpload describing the written file
+    """
+    if max_bytes is None:
+        max_bytes = settings.MAX_UPLOAD_BYTES
+    if chunk_size is None:
+        chunk_size = settings.UPLOAD_CHUNK_SIZE
+
+    writer = _SpoolWriter(directory, suffix, max_bytes, magic, header_window)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            writer.write(chunk)
+        return writer.finish()
+    except Exception:
+        writer.discard()
+        raise
+
+
+class RequestBodyLimitMiddleware:
+    """
+    ASGI middleware rejecting upload requests whose body is larger than the
+    route allows, before the multipart form is parsed.
+
+    The form is spooled by Starlette before the endpoint runs, so the size
+    check in ``spool_upload_to_disk`` alone would only fire once the whole
+    body is on disk. A declared ``Content-Length`` over the limit is answered
+    with 413 without reading the body; otherwise the body is counted as it is
+    received and the request fails with 413 as soon as it passes the limit.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        # Request path -> body size limit in bytes
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {limit} byte upload limit"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+class ArchiveMember:
+    """
+    A file found in an uploaded archive: spooled to disk, or rejected with an error.
+    """
+
+    def __init__(self, name: str, upload: Optional[SpooledUpload] = None, error: Optional[str] = None):
+        self.name = name
+        self.upload = upload
+        self.error = error
+
+
+def is_zip_upload(file: UploadFile) -> bool:
+    """
+    Whether an upload should be treated as a ZIP archive of statements.
+    """
+    return (file.filename or '').lower().endswith('.zip') or file.content_type in ZIP_CONTENT_TYPES
+
+
+def spool_pdfs_from_zip(
+    zip_path: str,
+    directory: str,
+    max_files: int,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> List[ArchiveMember]:
+    """
+    Spool every PDF in a ZIP archive to its own file.
+
+    Blocking; call it from a worker thread. Each member is decompressed in
+    chunks and held to the same size limit and PDF check as a direct upload,
+    so a member that lies about its size cannot fill the disk. Directories and
+    hidden files (e.g. ``__MACOSX/``) are skipped, and members that fail the
+    checks are returned with an error. At most ``max_files`` members are
+    examined; one more entry with an error then stands for the rest of the
+    archive. If an unexpected error escapes, the members already spooled are
+    deleted.
+
+    Args:
+        zip_path: Spooled archive
+        directory: Directory to write the PDFs to
+        max_files: Number of members to examine
+        max_bytes: Size limit per member (defaults to settings.MAX_UPLOAD_BYTES)
+        chunk_size: Read size (defaults to settings.UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        One ArchiveMember per examined file, in archive order
+
+    Raises:
+        InvalidUploadType: If the file is not a readable ZIP archive
+    """
+    if max_bytes is None:
+        max_bytes = settings.MAX_UPLOAD_BYTES
+    if chunk_size is None:
+        chunk_size = settings.UPLOAD_CHUNK_SIZE
+
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile:
+        raise InvalidUploadType("File content is not a ZIP archive")
+
+    members = []
+    try:
+        with archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or any(part.startswith(('.', '__MACOSX')) for part in name.split('/')):
+                    continue
+                if len(members) >= max_files:
+                    # One entry for the rest, however many members the archive lists
+                    members.append(ArchiveMember(
+                        name, error="Batch file limit reached; this and the remaining files were not processed"
+                    ))
+                    break
+                if info.file_size > max_bytes:
+                    members.append(ArchiveMember(name, error=f"File exceeds the {max_bytes} byte upload limit"))
+                    continue
+
+                writer = _SpoolWriter(directory, '.pdf', max_bytes, PDF_MAGIC, PDF_HEADER_WINDOW)
+                try:
+                    with archive.open(info) as member:
+                        while True:
+                            chunk = member.read(chunk_size)
+                            if not chunk:
+                                break
+                            writer.write(chunk)
+                    members.append(ArchiveMember(name, upload=writer.finish()))
+                except (UploadTooLarge, InvalidUploadType, zipfile.BadZipFile, RuntimeError, NotImplementedError, zlib.error) as e:
+                    # RuntimeError: encrypted member; NotImplementedError: unsupported compression
+                    writer.discard()
+                    members.append(ArchiveMember(name, error=str(e)))
+                except Exception:
+                    writer.discard()
+                    raise
+    except Exception:
+        # Nothing is returned, so nobody else would remove the members spooled so far
+        for member in members:
+            if member.upload is not None and os.path.exists(member.upload.path):
+                os.unlink(member.upload.path)
+        raise
+    return members
+
+
+def detect_export_format(file_path: str) -> Optional[str]:
+    """
+    Tell a transaction export's format from its first bytes.
+
+    Returns:
+        "ofx" for OFX/QFX, "csv" for other text, or None for binary content
+        such as a PDF or ZIP archive
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(PDF_HEADER_WINDOW)
+    upper = header.upper()
+    if any(marker in upper for marker in OFX_MARKERS):
+        return 'ofx'
+    if b'\x00' in header or PDF_MAGIC in header or header.startswith(ZIP_MAGIC):
+        return None
+    return 'csv'
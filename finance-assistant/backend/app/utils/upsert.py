@@ -0,0 +1,70 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Table, and_, bindparam, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+ON_CONFLICT_INSERTS = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}
+
+
+def upsert_rows(
+    db: Session,
+    table: Table,
+    key_columns: Sequence[str],
+    rows: List[Dict[str, Any]],
+    increment: Sequence[str] = (),
+    replace: Sequence[str] = ()
+):
+    """
+    Insert rows, or update the row already stored under the same unique key.
+
+    Columns in ``increment`` are added to the stored value in SQL and columns in
+    ``replace`` overwrite it, so concurrent writers of the same key neither lose
+    updates nor fail on the unique constraint. Runs in the session's transaction;
+    the caller commits.
+
+    Args:
+        db: Database session
+        table: Table with a unique constraint on ``key_columns``
+        key_columns: Columns of that unique constraint
+        rows: Full rows to insert, each key at most once
+        increment: Columns added to the existing row on conflict
+        replace: Columns overwritten on the existing row on conflict
+    """
+    if not rows:
+        return
+
+    dialect_insert = ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table)
+        values = {name: table.c[name] + statement.excluded[name] for name in increment}
+        values.update({name: statement.excluded[name] for name in replace})
+        if 'updated_at' in table.c:
+            values['updated_at'] = func.now()
+        db.connection().execute(statement.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns], set_=values
+        ), rows)
+        return
+
+    # No ON CONFLICT (SQL Server): update the existing row, insert in a
+    # savepoint when there is none, and update again if a concurrent
+    # transaction inserted the key in between
+    values = {name: table.c[name] + bindparam(f'new_{name}') for name in increment}
+    values.update({name: bindparam(f'new_{name}') for name in replace})
+    statement = update(table).where(
+        and_(*(table.c[name] == bindparam(f'key_{name}') for name in key_columns))
+    ).values(values)
+    for row in rows:
+        params = {f'key_{name}': row[name] for name in key_columns}
+        params.update({f'new_{name}': row[name] for name in (*increment, *replace)})
+        if db.connection().execute(statement, params).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.connection().execute(insert(table), row)
+        except IntegrityError:
+            db.connection().execute(statement, params)
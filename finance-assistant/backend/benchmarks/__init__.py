@@ -0,0 +1 @@
+# Initialize benchmarks module
@@ -0,0 +1,101 @@
+"""
+Benchmark database calls made from async endpoints: a blocking Session used
+directly in ``async def`` code versus the AsyncSession from ``get_async_db``.
+
+Each request runs one deliberately slow query. A ticker coroutine measures how
+long the event loop is stalled while the requests run concurrently; with the
+blocking session every query holds the loop, so requests serialize and the
+ticker cannot run. SQLite queries are CPU bound, so wall time only improves
+with spare cores; against a networked database the queries overlap as well.
+
+Run from the backend directory:
+    python -m benchmarks.bench_async_db --requests 8 --rows 1000000
+"""
+import os
+import argparse
+import asyncio
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-async-db-')
+_db_path = os.path.join(_db_dir, 'bench.db')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{_db_path}")
+os.environ.setdefault('ASYNC_DATABASE_URL', f"sqlite+aiosqlite:///{_db_path}")
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, get_async_sessionmaker, close_async_engine
+
+
+def slow_query(rows: int):
+    return text(
+        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) "
+        "SELECT count(*) FROM n"
+    ).bindparams(rows=rows)
+
+
+async def blocking_request(rows: int):
+    db = SessionLocal()
+    try:
+        return db.execute(slow_query(rows)).scalar()
+    finally:
+        db.close()
+
+
+async def async_request(rows: int):
+    async with get_async_sessionmaker()() as db:
+        return (await db.execute(slow_query(rows))).scalar()
+
+
+async def run(handler, requests: int, rows: int):
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker(interval=0.005):
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(time.perf_counter() - start - interval)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(rows) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    assert all(result == rows for result in results)
+    return elapsed, max(stalls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    async def bench():
+        # Warm both engines so connection setup is not timed
+        await blocking_request(1)
+        await async_request(1)
+        results = {
+            'blocking Session': await run(blocking_request, args.requests, args.rows),
+            'AsyncSession': await run(async_request, args.requests, args.rows),
+        }
+        await close_async_engine()
+        return results
+
+    single = time.perf_counter()
+    SessionLocal().execute(slow_query(args.rows)).scalar()
+    single = time.perf_counter() - single
+
+    results = asyncio.run(bench())
+    print(f"{args.requests} concurrent requests, one query each ({single * 1000:.0f} ms per query)")
+    print(f"{'session':<18} {'wall time':>10} {'max loop stall':>15}")
+    for name, (elapsed, stall) in results.items():
+        print(f"{name:<18} {elapsed * 1000:>8.0f}ms {stall * 1000:>13.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
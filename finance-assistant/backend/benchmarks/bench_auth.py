@@ -0,0 +1,73 @@
+"""
+Benchmark per-request API key authentication: principal cache hits versus
+resolving the key against the database on every request (cache disabled).
+
+Run from the backend directory:
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import os
+import argparse
+import asyncio
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-auth-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.security import principal_cache, get_api_principal
+from app.main import app
+
+
+def time_requests(client: TestClient, headers: dict, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.post('/api/auth/validate-api-key', headers=headers)
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / requests
+
+
+def time_dependency(api_key: str, requests: int) -> float:
+    """Time the auth dependency alone, without HTTP overhead."""
+    async def run():
+        start = time.perf_counter()
+        for _ in range(requests):
+            await get_api_principal(api_key)
+        return (time.perf_counter() - start) / requests
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        shared = {'X-API-Key': settings.API_KEY}
+        created = client.post('/api/auth/api-keys', headers=shared, json={'name': 'bench'})
+        user_key = {'X-API-Key': created.json()['key']}
+
+        results = {}
+        for name, headers in (('shared key', shared), ('per-user key', user_key)):
+            ttl = principal_cache.ttl
+            principal_cache.ttl = 0
+            principal_cache.clear()
+            results[(name, 'uncached')] = (
+                time_requests(client, headers, args.requests), time_dependency(headers['X-API-Key'], args.requests)
+            )
+            principal_cache.ttl = ttl
+            principal_cache.clear()
+            results[(name, 'cached')] = (
+                time_requests(client, headers, args.requests), time_dependency(headers['X-API-Key'], args.requests)
+            )
+
+    print(f"{'':<23} {'request':>10} {'auth only':>10}")
+    for (name, mode), (request, dependency) in results.items():
+        print(f"{name:<13} {mode:<9} {request * 1e6:8.0f} us {dependency * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
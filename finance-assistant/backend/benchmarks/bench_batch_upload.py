@@ -0,0 +1,101 @@
+"""
+Benchmark ingesting a year of statements: one upload at a time, each waited
+for in turn, against a single batch upload (as separate files or one ZIP).
+
+Runs the app in process on a throwaway SQLite database with the fake LLM
+provider. Statement templates are disabled so every statement goes through
+the LLM, which is where the time goes for unknown bank layouts.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch_upload --statements 12 --llm-latency 1.0
+"""
+import os
+import argparse
+import io
+import tempfile
+import time
+import zipfile
+
+
+def _wait_for_jobs(client, headers, job_ids, timeout: float = 600):
+    deadline = time.perf_counter() + timeout
+    pending = set(job_ids)
+    while pending:
+        for job_id in list(pending):
+            job = client.get(f'/api/upload/jobs/{job_id}', headers=headers).json()
+            if job['status'] not in ('queued', 'running'):
+                assert job['status'] == 'succeeded', job
+                pending.discard(job_id)
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{len(pending)} jobs still running")
+        time.sleep(0.05)
+
+
+def run(statements: int, pages: int, use_zip: bool):
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.main import app
+    from app.services.templates import template_registry
+    from benchmarks.synthetic import statement_pdf_bytes
+
+    template_registry.templates = []
+    headers = {'X-API-Key': settings.API_KEY}
+    pdfs = [statement_pdf_bytes(pages, 40, seed=month) for month in range(1, statements + 1)]
+    results = {}
+
+    with TestClient(app) as client:
+        # One upload at a time, waiting for each before the next
+        single_seconds = []
+        start = time.perf_counter()
+        for month, pdf in enumerate(pdfs, 1):
+            file_start = time.perf_counter()
+            job = client.post('/api/upload/bank-statement', headers=headers,
+                              files={'file': (f'2024-{month:02d}.pdf', pdf, 'application/pdf')}).json()
+            _wait_for_jobs(client, headers, [job['id']])
+            single_seconds.append(time.perf_counter() - file_start)
+        results['sequential'] = time.perf_counter() - start
+        results['slowest_single'] = max(single_seconds)
+
+        # The whole year in one request
+        if use_zip:
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w') as zf:
+                for month, pdf in enumerate(pdfs, 1):
+                    zf.writestr(f'2024-{month:02d}.pdf', pdf)
+            files = [('files', ('2024.zip', archive.getvalue(), 'application/zip'))]
+        else:
+            files = [('files', (f'2024-{month:02d}.pdf', pdf, 'application/pdf')) for month, pdf in enumerate(pdfs, 1)]
+        start = time.perf_counter()
+        batch = client.post('/api/upload/bank-statements', headers=headers, files=files).json()
+        assert batch['queued'] == statements, batch
+        _wait_for_jobs(client, headers, [entry['job']['id'] for entry in batch['files']])
+        results['batch'] = time.perf_counter() - start
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--statements', type=int, default=12)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--llm-latency', type=float, default=1.0)
+    parser.add_argument('--zip', action='store_true', help='Send the batch as one ZIP archive')
+    args = parser.parse_args()
+
+    # Settings are read at import, so configure the app before importing it
+    db_dir = tempfile.mkdtemp(prefix='bench-batch-upload-')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(db_dir, 'bench.db')}")
+    os.environ['LLM_PROVIDER'] = 'fake'
+    os.environ['FAKE_LLM_LATENCY'] = str(args.llm_latency)
+    os.environ['FAKE_LLM_JITTER'] = '0'
+    os.environ['INGESTION_CACHE_ENABLED'] = 'false'
+    os.environ['UPLOAD_SPOOL_DIR'] = os.path.join(db_dir, 'uploads')
+
+    results = run(args.statements, args.pages, args.zip)
+    print(f"{args.statements} statements of {args.pages} pages, LLM latency {args.llm_latency:.1f}s")
+    print(f"sequential uploads  {results['sequential']:7.2f} s")
+    print(f"batch upload        {results['batch']:7.2f} s  (slowest single statement {results['slowest_single']:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Show that concurrent chat requests overlap on one event loop.
+
+Starts a local fake OpenAI-compatible server, points the Azure settings at it
+and runs the chat pipeline N times concurrently. With a non-blocking pipeline
+the wall time is close to one round-trip, not N of them.
+
+Run from the backend directory:
+    python -m benchmarks.bench_chat_concurrency --requests 20 --delay 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from benchmarks.fake_openai import FakeOpenAIServer
+
+
+async def run_concurrent(requests: int):
+    from app.services.chat import generate_chat_response, close_llm_clients
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        generate_chat_response(user_id=1, message=f"Question {i}")
+        for i in range(requests)
+    ])
+    elapsed = time.perf_counter() - start
+    await close_llm_clients()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=0.5)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(port=args.port, delay=args.delay) as server:
+        settings.azure_endpoint = server.url
+        settings.deployment_name = "fake-deployment"
+        settings.api_key = "fake-key"
+        settings.api_version = "2024-02-01"
+
+        elapsed = asyncio.run(run_concurrent(args.requests))
+        overlap = server.app.state.max_in_flight
+
+    print(f"{args.requests} requests, {args.delay:.2f}s upstream delay")
+    print(f"  wall time        {elapsed:.2f}s (serial would be {args.requests * args.delay:.2f}s)")
+    print(f"  max in flight    {overlap}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark building the chat assistant's financial context as history grows:
+lazy-loading every transaction and summing in Python (the previous path),
+one aggregate query (cache miss), and the per-user cache (hit).
+
+Run from the backend directory:
+    python -m benchmarks.bench_chat_context --sizes 1000 10000 100000
+"""
+import os
+import argparse
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-chat-context-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from app.core.database import SessionLocal, init_db
+from app.models.user import User
+from app.services.context import financial_context
+from app.services.summaries import build_monthly_summary
+from benchmarks.bench_summaries import seed
+
+
+def context_from_orm(db, user_id):
+    """The previous path: load user.transactions, convert to dicts and sum in Python."""
+    user = db.query(User).get(user_id)
+    rows = [
+        {"amount": t.amount, "category": t.category, "transaction_type": t.transaction_type,
+         "date": t.date.isoformat(), "description": t.description, "source": t.source}
+        for t in user.transactions
+    ]
+    return build_monthly_summary((t["transaction_type"], t["category"], t["amount"]) for t in rows)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        for size in args.sizes:
+            user = User(email=f"bench-{time.time_ns()}@example.com", first_name='Bench', last_name='User',
+                        hashed_password='x')
+            db.add(user)
+            db.commit()
+            user_id = user.id
+            seed(db, user_id, size, years=3)
+
+            db.expunge_all()
+            orm = timed(lambda: context_from_orm(db, user_id))
+            db.expunge_all()
+            financial_context.invalidate(user_id)
+            miss = timed(lambda: financial_context.get(db, user_id))
+            hit = timed(lambda: financial_context.get(db, user_id))
+            print(f"{size:>8} rows: orm {orm * 1000:8.1f} ms   aggregate {miss * 1000:6.2f} ms   cached {hit * 1000:6.3f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Measure chat time-to-first-token: POST /api/chat/stream (server-sent events)
+versus POST /api/chat/message, against a local fake streaming LLM server.
+Also checks that disconnecting mid-stream cancels the upstream LLM request.
+
+Run from the backend directory:
+    python -m benchmarks.bench_chat_stream --delay 0.3 --token-delay 0.05
+"""
+import os
+import argparse
+import asyncio
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-chat-stream-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import verify_api_key, get_current_user_simple
+from app.main import app
+from benchmarks.fake_openai import BackgroundServer, FakeOpenAIServer
+
+
+REPLY = ("Based on your spending, groceries and dining are your largest categories. "
+         "Consider setting a monthly budget for each and reviewing it weekly.")
+
+
+class BenchUser:
+    id = 1
+
+
+async def time_message(client: httpx.AsyncClient):
+    start = time.perf_counter()
+    response = await client.post('/api/chat/message', json={'message': 'How am I doing?'})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def time_stream(client: httpx.AsyncClient):
+    start = time.perf_counter()
+    first = None
+    tokens = 0
+    async with client.stream('POST', '/api/chat/stream', json={'message': 'How am I doing?'}) as response:
+        async for line in response.aiter_lines():
+            if line.startswith('data: {"token"'):
+                tokens += 1
+                if first is None:
+                    first = time.perf_counter() - start
+            elif line.startswith('event: error'):
+                raise RuntimeError('stream reported an error')
+    return first, time.perf_counter() - start, tokens
+
+
+async def disconnect_mid_stream(client: httpx.AsyncClient):
+    async with client.stream('POST', '/api/chat/stream', json={'message': 'How am I doing?'}) as response:
+        async for line in response.aiter_lines():
+            if line.startswith('data: {"token"'):
+                break
+    # Leaving the block closes the connection after the first token
+
+
+async def run(repeat: int):
+    async with httpx.AsyncClient(base_url=server_url, timeout=30) as client:
+        # Warm up connections on both hops
+        await time_message(client)
+        results = {'message': [], 'stream_first': [], 'stream_total': []}
+        for _ in range(repeat):
+            results['message'].append(await time_message(client))
+            first, total, tokens = await time_stream(client)
+            results['stream_first'].append(first)
+            results['stream_total'].append(total)
+        await disconnect_mid_stream(client)
+    return results, tokens
+
+
+server_url = None
+
+
+def main():
+    global server_url
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=0.3, help="Upstream seconds before the first token")
+    parser.add_argument('--token-delay', type=float, default=0.05, help="Upstream seconds between tokens")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--llm-port', type=int, default=8765)
+    parser.add_argument('--app-port', type=int, default=8766)
+    args = parser.parse_args()
+
+    app.dependency_overrides[verify_api_key] = lambda: 'bench'
+    app.dependency_overrides[get_current_user_simple] = lambda: BenchUser
+
+    with FakeOpenAIServer(port=args.llm_port, delay=args.delay, reply=REPLY, token_delay=args.token_delay) as llm:
+        settings.azure_endpoint = llm.url
+        settings.deployment_name = "fake-deployment"
+        settings.api_key = "fake-key"
+        settings.api_version = "2024-02-01"
+
+        with BackgroundServer(app, port=args.app_port) as backend:
+            server_url = backend.url
+            results, tokens = asyncio.run(run(args.repeat))
+            # Give the backend a moment to propagate the cancellation upstream
+            deadline = time.time() + 2
+            while llm.app.state.disconnects == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            disconnects = llm.app.state.disconnects
+
+    def median(values):
+        return sorted(values)[len(values) // 2] * 1000
+
+    print(f"upstream: {args.delay:.2f}s to first token, {args.token_delay:.3f}s between {tokens} tokens")
+    print(f"  /message  full response     {median(results['message']):7.1f} ms")
+    print(f"  /stream   first token       {median(results['stream_first']):7.1f} ms")
+    print(f"  /stream   full response     {median(results['stream_total']):7.1f} ms")
+    print(f"  upstream requests cancelled on client disconnect: {disconnects}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark importing CSV and OFX transaction exports, which bypass the PDF and
+LLM pipeline: throughput, re-importing the same file (every row a duplicate),
+and optionally peak Python memory, against a throwaway SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_file_import --rows 300000 --trace-memory
+"""
+import os
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-file-import-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from app.core.database import SessionLocal, init_db
+from app.models.user import User
+from app.services.file_import import FILE_FORMATS, import_transactions_file
+from benchmarks.synthetic import write_transactions_csv, write_transactions_ofx
+
+
+WRITERS = {'csv': write_transactions_csv, 'ofx': write_transactions_ofx}
+
+
+def _import(db, path: str, user_id: int, file_format: str, batch_size: int, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    counts = import_transactions_file(path, user_id, db, file_format, batch_size=batch_size)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return counts, seconds, peak
+
+
+def run(rows: int, formats=FILE_FORMATS, batch_size: int = None, trace_memory: bool = False):
+    init_db()
+    db = SessionLocal()
+    results = {}
+    try:
+        for file_format in formats:
+            path = WRITERS[file_format](os.path.join(_db_dir, f'transactions.{file_format}'), rows)
+            user = User(email=f"bench-{time.time_ns()}@example.com", first_name='Bench', last_name='User',
+                        hashed_password='x')
+            db.add(user)
+            db.commit()
+
+            (inserted, _, unreadable), seconds, peak = _import(db, path, user.id, file_format, batch_size, trace_memory)
+            assert inserted == rows, inserted
+            assert unreadable == 0, unreadable
+            (_, duplicates, _), reimport_seconds, _ = _import(db, path, user.id, file_format, batch_size, False)
+            assert duplicates == rows, duplicates
+            results[file_format] = {
+                'seconds': seconds,
+                'rows_per_second': rows / seconds,
+                'reimport_seconds': reimport_seconds,
+                'file_mb': os.path.getsize(path) / (1024 * 1024),
+                'peak_memory_mb': peak / (1024 * 1024) if peak is not None else None,
+            }
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--formats', nargs='+', default=list(FILE_FORMATS), choices=FILE_FORMATS)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Report peak Python memory of the first import (slows it down)')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.formats, args.batch_size, args.trace_memory)
+    for file_format, result in results.items():
+        line = (f"{file_format:4s} {args.rows} rows ({result['file_mb']:.1f} MB)  {result['seconds']:6.2f} s  "
+                f"{result['rows_per_second']:8,.0f} rows/s  re-import {result['reimport_seconds']:6.2f} s")
+        if result['peak_memory_mb'] is not None:
+            line += f"  peak memory {result['peak_memory_mb']:.1f} MB"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark the LLM parsing path (chunking, response parsing and merging) with
+a stubbed LLM that answers instantly, so only our own overhead is measured.
+
+The stub's answers are computed in a warm-up pass and replayed in the timed
+passes: each chunk gets a JSON array of the rows it contains, wrapped in a
+Markdown code fence the way chat models usually answer.
+
+Run from the backend directory:
+    python -m benchmarks.bench_llm_parsing --pages 100
+"""
+import os
+import argparse
+import json
+import tempfile
+import time
+from types import SimpleNamespace
+
+# The PDF service imports the database engine; point it at SQLite (nothing is written)
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-llm-'), 'bench.db')}")
+
+from app.services import pdf
+from app.services.templates import template_registry
+from benchmarks.synthetic import generate_statement_text
+
+
+class RecordingLLM:
+    """
+    Answers each prompt with the rows a template parser finds in it, and
+    remembers the answer so the replay pass does no parsing of its own.
+    """
+
+    def __init__(self):
+        self.template = template_registry.templates[0]
+        self.responses = {}
+
+    def _answer(self, text: str) -> str:
+        rows = []
+        for line in text.split('\n'):
+            if self.template.row_candidate.match(line):
+                row = self.template.parse_row(line, {})
+                if row is not None:
+                    rows.append(row)
+        return f"```json\n{json.dumps(rows, indent=2)}\n```"
+
+    def invoke(self, messages):
+        prompt = messages[-1].content
+        response = self.responses.get(prompt)
+        if response is None:
+            response = self.responses[prompt] = self._answer(prompt)
+        return SimpleNamespace(content=response)
+
+
+class ReplayLLM:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def invoke(self, messages):
+        return SimpleNamespace(content=self.responses[messages[-1].content])
+
+
+def run(pages: int, rows_per_page: int, repeat: int):
+    # Unsanitized so the stub can read every row back; sanitizing does not change the chunking
+    text = generate_statement_text(pages, rows_per_page)
+    original_get_llm = pdf.get_llm
+    try:
+        recorder = RecordingLLM()
+        pdf.get_llm = lambda *args, **kwargs: recorder
+        expected, complete = pdf._parse_transactions(text)
+        assert complete and len(expected) == pages * rows_per_page, len(expected)
+
+        replay = ReplayLLM(recorder.responses)
+        pdf.get_llm = lambda *args, **kwargs: replay
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            transactions, complete = pdf._parse_transactions(text)
+            elapsed = time.perf_counter() - start
+            assert complete and transactions == expected
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        pdf.get_llm = original_get_llm
+
+    return {
+        'seconds': best,
+        'rows_per_second': len(expected) / best,
+        'chunks': len(recorder.responses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    result = run(args.pages, args.rows_per_page, args.repeat)
+    print(f"{args.pages * args.rows_per_page} rows in {result['chunks']} chunks: "
+          f"{result['seconds'] * 1000:.1f} ms, {result['rows_per_second']:,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the per-request cost of the metrics middleware and the on-demand
+profiler by calling a trivial ASGI app directly, with and without them.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import RequestProfiler
+
+
+async def plain_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+async def _receive():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def _send(message):
+    pass
+
+
+async def _time(app, requests: int) -> float:
+    scope = {'type': 'http', 'method': 'GET', 'path': '/api/finance/transactions'}
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), _receive, _send)
+    return time.perf_counter() - start
+
+
+def run(requests: int, repeat: int):
+    profiler = RequestProfiler(output_dir=tempfile.mkdtemp(prefix='bench-profile-'))
+    apps = {
+        'bare': plain_app,
+        'metrics': MetricsMiddleware(plain_app),
+        'metrics_profiler_disarmed': MetricsMiddleware(plain_app, on_request=profiler.on_request),
+    }
+    results = {}
+    for name, app in apps.items():
+        best = min(asyncio.run(_time(app, requests)) for _ in range(repeat))
+        results[name] = best / requests * 1e6
+
+    # Armed: every request is profiled with cProfile, up to the capture limit
+    captured = min(requests, settings.PROFILE_MAX_REQUESTS)
+    armed = MetricsMiddleware(plain_app, on_request=profiler.on_request)
+    profiler.arm(captured, mode='cprofile')
+    results['metrics_profiler_cprofile'] = asyncio.run(_time(armed, captured)) / captured * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.requests, args.repeat)
+    for name, micros in results.items():
+        overhead = micros - results['bare']
+        print(f"{name:28s} {micros:8.2f} us/request  (+{overhead:.2f} us)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark deep pages of GET /api/finance/transactions: offset paging versus
+cursor (keyset) paging, for one user with a long history on SQLite.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pagination --rows 200000 --limit 100
+"""
+import os
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-pagination-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal, init_db
+from app.core.security import verify_api_key, get_current_user_simple
+from app.main import app
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def seed(rows: int) -> int:
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(email=f"bench-{time.time_ns()}@example.com", first_name='Bench', last_name='User',
+                    hashed_password='x')
+        db.add(user)
+        db.commit()
+        rnd = random.Random(7)
+        start = datetime(2015, 1, 1)
+        for offset in range(0, rows, 10000):
+            db.execute(insert(Transaction), [
+                {
+                    'user_id': user.id,
+                    # Day granularity so many rows share a date and the id tiebreak matters
+                    'date': start + timedelta(days=rnd.randrange(3650)),
+                    'description': 'Synthetic transaction',
+                    'amount': 10.0,
+                    'category': 'Shopping',
+                    'transaction_type': 'expense',
+                    'source': 'bank_statement'
+                }
+                for _ in range(min(10000, rows - offset))
+            ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    user_id = seed(args.rows)
+
+    class BenchUser:
+        id = user_id
+
+    app.dependency_overrides[verify_api_key] = lambda: 'bench'
+    app.dependency_overrides[get_current_user_simple] = lambda: BenchUser
+
+    with TestClient(app) as client:
+        # Walk the cursor chain once, remembering the cursor that starts each page
+        cursors = {1: None}
+        cursor = None
+        for page in range(2, max(args.pages) + 1):
+            params = {'limit': args.limit}
+            if cursor:
+                params['cursor'] = cursor
+            cursor = client.get('/api/finance/transactions', params=params).headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+            cursors[page] = cursor
+
+        for page in args.pages:
+            if page not in cursors:
+                print(f"page {page:>5}: beyond the last page")
+                continue
+            offset_params = {'limit': args.limit, 'skip': (page - 1) * args.limit}
+            cursor_params = {'limit': args.limit}
+            if cursors[page]:
+                cursor_params['cursor'] = cursors[page]
+
+            timings = {}
+            bodies = {}
+            for name, params in (('offset', offset_params), ('cursor', cursor_params)):
+                start = time.perf_counter()
+                response = client.get('/api/finance/transactions', params=params)
+                timings[name] = time.perf_counter() - start
+                bodies[name] = [row['id'] for row in response.json()]
+            assert bodies['offset'] == bodies['cursor'], f"page {page} differs"
+            print(f"page {page:>5}: offset {timings['offset'] * 1000:7.1f} ms   cursor {timings['cursor'] * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
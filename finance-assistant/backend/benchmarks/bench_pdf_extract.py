@@ -0,0 +1,84 @@
+"""
+Benchmark the statement PDF text extractors (pdfminer, pypdf, and pypdf on a
+process pool) on a synthetic statement PDF. Reports total time and the time
+until the first page is available to the ingestion pipeline.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_extract --pages 50 --workers 1 4
+"""
+import os
+import argparse
+import tempfile
+import time
+
+# The PDF service imports the database engine; point it at SQLite (nothing is written)
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-pdf-'), 'bench.db')}")
+
+from app.services.pdf import PdfTextExtractor
+from app.services.pdf_pages import PAGE_EXTRACTORS
+from benchmarks.synthetic import write_statement_pdf
+
+
+BACKENDS = tuple(PAGE_EXTRACTORS)
+
+
+def _time_extraction(extractor: PdfTextExtractor, path: str):
+    start = time.perf_counter()
+    first_page = None
+    pages = 0
+    for _ in extractor.iter_pages(path):
+        if first_page is None:
+            first_page = time.perf_counter() - start
+        pages += 1
+    return time.perf_counter() - start, first_page, pages
+
+
+def run(pages: int, rows_per_page: int, repeat: int, backends=BACKENDS, workers=(1,)):
+    path = write_statement_pdf(os.path.join(tempfile.mkdtemp(prefix='bench-pdf-'), 'statement.pdf'),
+                               pages, rows_per_page)
+    file_mb = os.path.getsize(path) / (1024 * 1024)
+    results = {}
+    for backend in backends:
+        for worker_count in workers:
+            extractor = PdfTextExtractor(backend, max_workers=worker_count, parallel_min_pages=0)
+            try:
+                if worker_count > 1:
+                    # Start the pool outside the timing, as a running server would have
+                    _time_extraction(extractor, path)
+                best = None
+                for _ in range(repeat):
+                    timing = _time_extraction(extractor, path)
+                    assert timing[2] == pages
+                    if best is None or timing[0] < best[0]:
+                        best = timing
+            finally:
+                extractor.shutdown(wait=True)
+            name = backend if worker_count == 1 else f"{backend}_{worker_count}_workers"
+            results[name] = {
+                'seconds': best[0],
+                'first_page_seconds': best[1],
+                'pages_per_second': pages / best[0],
+                'file_mb': file_mb,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4],
+                        help='Process pool sizes to try; 1 extracts in the calling thread')
+    args = parser.parse_args()
+
+    results = run(args.pages, args.rows_per_page, args.repeat, args.backends, args.workers)
+    print(f"{args.pages} pages ({next(iter(results.values()))['file_mb']:.2f} MB), {os.cpu_count()} CPUs")
+    for name, result in results.items():
+        print(f"{name:24s} {result['seconds'] * 1000:8.1f} ms  first page {result['first_page_seconds'] * 1000:7.1f} ms  "
+              f"{result['pages_per_second']:7.1f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark cold start: time to import ``app.main`` and time from process start
+to the first served request under uvicorn.
+
+Each run is a fresh interpreter. The first server run creates the schema in an
+empty SQLite database; later runs only check the recorded schema version.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import os
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+
+# Modules that should only load on the first chat or ingestion request
+HEAVY_MODULES = ['langchain_core', 'langchain_openai', 'langgraph', 'openai', 'httpx', 'pdfminer', 'pypdf']
+
+IMPORT_SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_import(env: dict):
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT], env=env, capture_output=True, text=True, check=True
+    ).stdout.split('\n')
+    return float(output[0]), output[1]
+
+
+def time_first_request(env: dict, timeout: float = 60.0) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('server did not answer within the timeout')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='bench-startup-')
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(db_dir, 'bench.db')}")
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+
+    imports = [time_import(env) for _ in range(args.runs)]
+    first = time_first_request(env)
+    warm = [time_first_request(env) for _ in range(args.runs)]
+
+    print(f"import app.main:                  median {statistics.median(t for t, _ in imports) * 1000:.0f}ms")
+    print(f"heavy modules loaded at import:   {imports[0][1] or 'none'}")
+    print(f"first request, new database:      {first * 1000:.0f}ms")
+    print(f"first request, existing database: median {statistics.median(warm) * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark the monthly and yearly summary queries for one user with a long
+history: loading ORM rows and summing in Python (the previous endpoints),
+one grouped aggregate over transactions, and the monthly rollups.
+
+Run from the backend directory:
+    python -m benchmarks.bench_summaries --rows 500000
+"""
+import os
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-summaries-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from sqlalchemy import insert, extract
+
+from app.core.database import SessionLocal, init_db
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.rollups import monthly_rollups
+from app.services.summaries import (
+    build_monthly_summary, build_yearly_summary,
+    monthly_summary_from_transactions, yearly_summary_from_transactions
+)
+
+
+CATEGORIES = ['Food & Dining', 'Groceries', 'Shopping', 'Transportation', 'Utilities', None]
+TYPES = ['expense'] * 8 + ['income', 'investment']
+
+
+def seed(db, user_id: int, rows: int, years: int, seed_value: int = 42):
+    rnd = random.Random(seed_value)
+    start = datetime(2024 - years + 1, 1, 1)
+    span = int(timedelta(days=365 * years).total_seconds())
+    batch = []
+    for _ in range(rows):
+        batch.append({
+            'user_id': user_id,
+            'date': start + timedelta(seconds=rnd.randrange(span)),
+            'description': 'Synthetic transaction',
+            'amount': round(rnd.uniform(1, 500), 2),
+            'category': rnd.choice(CATEGORIES),
+            'transaction_type': rnd.choice(TYPES),
+            'source': 'bank_statement'
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Transaction), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Transaction), batch)
+    monthly_rollups.rebuild(db, user_id)
+    db.commit()
+
+
+def orm_monthly(db, user_id, year, month):
+    """The previous endpoint: load every row of the month and sum in Python."""
+    transactions = db.query(Transaction).filter(
+        Transaction.user_id == user_id,
+        extract('year', Transaction.date) == year,
+        extract('month', Transaction.date) == month
+    ).all()
+    return build_monthly_summary((t.transaction_type, t.category, t.amount) for t in transactions)
+
+
+def orm_yearly(db, user_id, year):
+    transactions = db.query(Transaction).filter(
+        Transaction.user_id == user_id,
+        extract('year', Transaction.date) == year
+    ).all()
+    return build_yearly_summary((t.date.month, t.transaction_type, t.amount) for t in transactions)
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def same(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    return abs(a - b) < 1e-6 * max(1, abs(a))
+
+
+def run(rows: int, years: int, repeat: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(email=f"bench-{time.time_ns()}@example.com", first_name='Bench', last_name='User',
+                    hashed_password='x')
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+        start = time.perf_counter()
+        seed(db, user_id, rows, years)
+        print(f"seeded {rows} transactions in {time.perf_counter() - start:.1f} s")
+
+        year, month = 2024, 6
+        cases = {
+            'monthly': {
+                'orm_rows': lambda: orm_monthly(db, user_id, year, month),
+                'group_by': lambda: monthly_summary_from_transactions(db, user_id, year, month),
+                'rollups': lambda: monthly_rollups.monthly_summary(db, user_id, year, month)
+            },
+            'yearly': {
+                'orm_rows': lambda: orm_yearly(db, user_id, year),
+                'group_by': lambda: yearly_summary_from_transactions(db, user_id, year),
+                'rollups': lambda: monthly_rollups.yearly_summary(db, user_id, year)
+            }
+        }
+        results = {}
+        for summary, variants in cases.items():
+            reference = None
+            for name, func in variants.items():
+                db.expunge_all()
+                seconds, result = timed(func, repeat)
+                reference = reference if reference is not None else result
+                assert same(reference, result), f"{summary}/{name} differs from orm_rows"
+                results[(summary, name)] = seconds
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for (summary, name), seconds in run(args.rows, args.years, args.repeat).items():
+        print(f"{summary:<8} {name:<10} {seconds * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
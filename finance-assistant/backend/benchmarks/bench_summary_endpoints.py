@@ -0,0 +1,96 @@
+"""
+Benchmark the monthly and yearly summary endpoints over HTTP (in-process
+TestClient) against a seeded SQLite database, with summaries read from the
+monthly rollups and from the grouped aggregate over transactions.
+
+Run from the backend directory:
+    python -m benchmarks.bench_summary_endpoints --rows 100000
+"""
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-summary-endpoints-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import SessionLocal, init_db
+from app.core.security import generate_api_key, hash_api_key
+from app.main import app
+from app.models.api_key import ApiKey
+from app.models.user import User
+from benchmarks.bench_summaries import seed
+
+
+ENDPOINTS = {
+    'monthly': ('/api/finance/monthly-summary', {'year': 2024, 'month': 6}),
+    'yearly': ('/api/finance/yearly-summary', {'year': 2024}),
+}
+
+
+def seed_user(rows: int, years: int) -> str:
+    """
+    Create a user with ``rows`` transactions and return an API key for them.
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(email=f"bench-{time.time_ns()}@example.com", first_name='Bench', last_name='User',
+                    hashed_password='x')
+        db.add(user)
+        db.commit()
+        api_key = generate_api_key()
+        db.add(ApiKey(user_id=user.id, key_hash=hash_api_key(api_key), prefix=api_key[:8], name='bench'))
+        seed(db, user.id, rows, years)
+        return api_key
+    finally:
+        db.close()
+
+
+def run(rows: int, years: int, requests: int):
+    api_key = seed_user(rows, years)
+    headers = {'X-API-Key': api_key}
+    use_rollups = settings.SUMMARY_USE_ROLLUPS
+    results = {}
+    try:
+        with TestClient(app) as client:
+            for source, rollups in (('rollups', True), ('group_by', False)):
+                settings.SUMMARY_USE_ROLLUPS = rollups
+                for name, (path, params) in ENDPOINTS.items():
+                    # Warm the connection pool and the API key cache
+                    assert client.get(path, params=params, headers=headers).status_code == 200
+                    timings = []
+                    for _ in range(requests):
+                        start = time.perf_counter()
+                        response = client.get(path, params=params, headers=headers)
+                        timings.append(time.perf_counter() - start)
+                        assert response.status_code == 200
+                    results[f"{name}_{source}"] = {
+                        'median_seconds': statistics.median(timings),
+                        'max_seconds': max(timings),
+                        'requests_per_second': requests / sum(timings),
+                    }
+    finally:
+        settings.SUMMARY_USE_ROLLUPS = use_rollups
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    for name, result in run(args.rows, args.years, args.requests).items():
+        print(f"{name:<18} median {result['median_seconds'] * 1000:7.2f} ms  "
+              f"max {result['max_seconds'] * 1000:7.2f} ms  {result['requests_per_second']:7.1f} req/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark the deterministic statement templates on synthetic statements.
+
+Run from the backend directory:
+    python -m benchmarks.bench_templates --pages 50
+"""
+import argparse
+import time
+
+from app.services.templates import template_registry
+from benchmarks.synthetic import generate_statement_text
+
+
+LAYOUTS = ('amount_balance', 'debit_credit')
+
+
+def run(pages: int, rows_per_page: int):
+    results = {}
+    for layout in LAYOUTS:
+        text = generate_statement_text(pages, rows_per_page, layout=layout)
+        start = time.perf_counter()
+        template = template_registry.match(text)
+        rows, unparsed = template.parse(text) if template is not None else ([], [])
+        elapsed = time.perf_counter() - start
+        results[layout] = {
+            'template': template.name if template is not None else None,
+            'rows': len(rows),
+            'unparsed': len(unparsed),
+            'seconds': elapsed
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    args = parser.parse_args()
+
+    expected = args.pages * args.rows_per_page
+    for layout, result in run(args.pages, args.rows_per_page).items():
+        print(f"{layout:<16} template={result['template']} rows={result['rows']}/{expected} "
+              f"unparsed={result['unparsed']} {result['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Check with SQLite EXPLAIN QUERY PLAN that the per-user listing and summary
+queries use their indexes instead of scanning the table.
+
+The queries are not restated here: the listing query is built by
+app.api.finance.transactions_page_query and the summaries run through the
+functions the endpoints call, with the SELECTs they send to the database
+captured and explained.
+
+Run from the backend directory (exits non-zero if a plan does not use its index):
+    python -m benchmarks.check_query_plans
+"""
+import os
+import sys
+import tempfile
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='check-query-plans-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'plans.db')}")
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import event
+
+from app.api.finance import transactions_page_query
+from app.core.database import SessionLocal, engine, init_db
+from app.services.rollups import monthly_rollups
+from app.services.summaries import monthly_summary_from_transactions, yearly_summary_from_transactions
+
+
+# SQLite names the index behind a table's first UNIQUE constraint itself
+ROLLUP_UNIQUE_INDEX = 'sqlite_autoindex_monthly_rollups_1'
+
+# Code path to run for user 1, index its SELECT must use, and whether ORDER BY
+# must come from the index
+CHECKS = {
+    'listing': (
+        lambda db: db.execute(transactions_page_query(1, 101)).all(),
+        'ix_transactions_user_date_id', True
+    ),
+    'listing_after_cursor': (
+        lambda db: db.execute(transactions_page_query(1, 101, after=(datetime(2024, 6, 1), 1000))).all(),
+        'ix_transactions_user_date_id', True
+    ),
+    'monthly_summary': (
+        lambda db: monthly_summary_from_transactions(db, 1, 2024, 6),
+        'ix_transactions_user_type_date', False
+    ),
+    'yearly_summary': (
+        lambda db: yearly_summary_from_transactions(db, 1, 2024),
+        'ix_transactions_user_type_date', False
+    ),
+    'rollup_monthly_summary': (
+        lambda db: monthly_rollups.monthly_summary(db, 1, 2024, 6),
+        ROLLUP_UNIQUE_INDEX, False
+    ),
+    'rollup_yearly_summary': (
+        lambda db: monthly_rollups.yearly_summary(db, 1, 2024),
+        ROLLUP_UNIQUE_INDEX, False
+    ),
+}
+
+
+@contextmanager
+def captured_selects():
+    """
+    Collect the (statement, parameters) of every SELECT sent to the engine.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+
+def check_plan(db, name: str) -> Tuple[bool, List[str]]:
+    """
+    Run one check and return whether it passed, with the plan of its SELECT.
+    """
+    run, index, ordered = CHECKS[name]
+    with captured_selects() as statements:
+        run(db)
+    if len(statements) != 1:
+        return False, [f"expected one SELECT, got {len(statements)}"]
+    statement, parameters = statements[0]
+    plan = [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()]
+    uses_index = any(index in step for step in plan)
+    sorts = ordered and any('TEMP B-TREE FOR ORDER BY' in step for step in plan)
+    return uses_index and not sorts, plan
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    failures = 0
+    try:
+        for name in CHECKS:
+            ok, plan = check_plan(db, name)
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':<5}{name}")
+            for step in plan:
+                print(f"       {step}")
+    finally:
+        db.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Minimal OpenAI-compatible chat completions server for offline runs.
+
+Serves both the Azure route (/openai/deployments/{deployment}/chat/completions)
+and the plain OpenAI route (/v1/chat/completions) with a fixed reply after a
+configurable delay. Requests with ``"stream": true`` get the reply as
+server-sent event chunks, one word at a time, optionally ending in an error
+event partway through.
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+def create_app(delay: float = 0.5, reply: str = "This is a canned response.",
+               token_delay: float = 0.0, fail_after: Optional[int] = None) -> FastAPI:
+    """
+    Create the fake server application.
+
+    Args:
+        delay: Seconds to wait before answering each request (before the first
+            chunk when streaming)
+        reply: Assistant message content to return
+        token_delay: Seconds between streamed chunks
+        fail_after: Send an error event instead of the rest of a streamed reply
+            after this many words
+    """
+    app = FastAPI()
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+    app.state.disconnects = 0
+
+    def chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def stream_reply(model: str):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        finished = False
+        try:
+            await asyncio.sleep(delay)
+            words = reply.split(' ')
+            for i, word in enumerate(words):
+                if i == fail_after:
+                    yield f"data: {json.dumps({'error': {'message': 'Upstream failure', 'type': 'server_error'}})}\n\n"
+                    finished = True
+                    return
+                if i:
+                    await asyncio.sleep(token_delay)
+                delta = {"content": word if i == 0 else f" {word}"}
+                if i == 0:
+                    delta["role"] = "assistant"
+                yield chunk(completion_id, model, delta)
+            yield chunk(completion_id, model, {}, "stop")
+            yield "data: [DONE]\n\n"
+            finished = True
+        finally:
+            app.state.in_flight -= 1
+            if not finished:
+                app.state.disconnects += 1
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-model")
+        if body.get("stream"):
+            return StreamingResponse(stream_reply(model), media_type="text/event-stream")
+
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            # A complete response takes as long as streaming every chunk would
+            await asyncio.sleep(delay + token_delay * (len(reply.split(' ')) - 1))
+        finally:
+            app.state.in_flight -= 1
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+    app.post("/openai/deployments/{deployment}/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+    return app
+
+
+class BackgroundServer:
+    """
+    Run an ASGI application with uvicorn in a background thread.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 8765):
+        import uvicorn
+
+        self.app = app
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(self.app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class FakeOpenAIServer(BackgroundServer):
+    """
+    Run the fake server with uvicorn in a background thread.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, **app_options):
+        super().__init__(create_app(**app_options), host=host, port=port)
@@ -0,0 +1,256 @@
+"""
+Open-loop load generator for the API.
+
+Requests arrive at a fixed target rate, whether or not earlier ones have
+finished, and are spread over the chat, upload and finance endpoints by
+weight. Per endpoint it reports p50/p95/p99 latency, throughput and errors.
+
+Without --url it starts the app under uvicorn on a throwaway SQLite database
+with the fake LLM provider (LLM_PROVIDER=fake), so nothing calls Azure:
+
+    python -m benchmarks.load_test --rate 20 --duration 30 --llm-latency 0.8 --llm-error-rate 0.02
+
+Against a running deployment:
+
+    python -m benchmarks.load_test --url http://localhost:8000 --api-key $API_KEY --rate 5
+"""
+import os
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.results import write_results
+from benchmarks.synthetic import statement_pdf_bytes
+
+
+DEFAULT_MIX = 'chat=2,upload=0.5,transactions=3,create_transaction=1,monthly_summary=2,yearly_summary=1'
+
+# Distinct statements cycled through by uploads, so the ingestion cache does not answer every job
+UPLOAD_VARIANTS = 16
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in ENDPOINTS:
+            raise SystemExit(f"unknown endpoint '{name}'; choose from {', '.join(ENDPOINTS)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def chat(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    question = rnd.choice(['How much did I spend on groceries?', 'Am I saving enough?', 'Summarize my month.'])
+    return await client.post('/api/chat/message', json={'message': question})
+
+
+async def upload(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    files = {'file': ('statement.pdf', rnd.choice(uploads), 'application/pdf')}
+    return await client.post('/api/upload/bank-statement', files=files)
+
+
+async def transactions(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    return await client.get('/api/finance/transactions', params={'limit': 50})
+
+
+async def create_transaction(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    return await client.post('/api/finance/transactions', json={
+        'date': f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T12:00:00",
+        'description': rnd.choice(['Starbucks Coffee', 'Kroger Market', 'Shell Gas Station', 'Payroll']),
+        'amount': round(rnd.uniform(1, 300), 2),
+        'category': 'Other',
+        'transaction_type': 'expense',
+        'source': 'manual'
+    })
+
+
+async def monthly_summary(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    return await client.get('/api/finance/monthly-summary', params={'year': 2024, 'month': rnd.randint(1, 12)})
+
+
+async def yearly_summary(client: httpx.AsyncClient, rnd: random.Random, uploads: List[bytes]):
+    return await client.get('/api/finance/yearly-summary', params={'year': 2024})
+
+
+ENDPOINTS = {
+    'chat': chat,
+    'upload': upload,
+    'transactions': transactions,
+    'create_transaction': create_transaction,
+    'monthly_summary': monthly_summary,
+    'yearly_summary': yearly_summary,
+}
+
+
+async def generate_load(url: str, api_key: str, rate: float, duration: float, weights: Dict[str, float],
+                        seed: int, timeout: float):
+    rnd = random.Random(seed)
+    uploads = [statement_pdf_bytes(pages=2, rows_per_page=30, seed=seed + i) for i in range(UPLOAD_VARIANTS)]
+    names, shares = list(weights), list(weights.values())
+    samples = defaultdict(list)
+    statuses = defaultdict(Counter)
+    max_lag = 0.0
+
+    async def send(name: str, client: httpx.AsyncClient, request_rnd: random.Random):
+        start = time.perf_counter()
+        try:
+            response = await ENDPOINTS[name](client, request_rnd, uploads)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        samples[name].append(time.perf_counter() - start)
+        statuses[name][status] += 1
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=url, headers={'X-API-Key': api_key}, limits=limits,
+                                 timeout=timeout) as client:
+        tasks = []
+        start = time.perf_counter()
+        total = int(rate * duration)
+        for index in range(total):
+            scheduled = start + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            name = rnd.choices(names, weights=shares)[0]
+            tasks.append(asyncio.create_task(send(name, client, random.Random(rnd.random()))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        jobs = Counter()
+        if 'upload' in weights:
+            response = await client.get('/api/upload/jobs', params={'limit': 1000})
+            if response.status_code == 200:
+                jobs.update(job['status'] for job in response.json())
+
+    return samples, statuses, elapsed, max_lag, jobs
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(args) -> (subprocess.Popen, str):
+    """
+    Start the app under uvicorn with the fake LLM provider on a throwaway SQLite database.
+    """
+    db_dir = tempfile.mkdtemp(prefix='load-test-')
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(db_dir, 'load.db')}",
+        'LLM_PROVIDER': 'fake',
+        'FAKE_LLM_LATENCY': str(args.llm_latency),
+        'FAKE_LLM_JITTER': str(args.llm_jitter),
+        'FAKE_LLM_ERROR_RATE': str(args.llm_error_rate),
+        'UPLOAD_SPOOL_DIR': os.path.join(db_dir, 'uploads'),
+        'INGESTION_CACHE_DIR': os.path.join(db_dir, 'cache'),
+        'PYTHONPATH': os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')])),
+    })
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=None if args.server_logs else subprocess.DEVNULL
+    )
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    server.terminate()
+    raise SystemExit('local server did not start')
+
+
+def report(samples, statuses, elapsed: float) -> Dict[str, Dict[str, float]]:
+    cases = {}
+    everything = [value for values in samples.values() for value in values]
+    for name, values in sorted(samples.items()) + [('all', everything)]:
+        counts = statuses[name] if name != 'all' else sum(statuses.values(), Counter())
+        errors = sum(count for status, count in counts.items() if not (isinstance(status, int) and status < 400))
+        cases[name] = {
+            'requests': len(values),
+            'error_rate': errors / len(values),
+            'p50_seconds': percentile(values, 0.50),
+            'p95_seconds': percentile(values, 0.95),
+            'p99_seconds': percentile(values, 0.99),
+            'requests_per_second': len(values) / elapsed,
+        }
+        print(f"{name:<20} {len(values):>6} {cases[name]['requests_per_second']:>8.1f} "
+              f"{cases[name]['p50_seconds'] * 1000:>8.0f} {cases[name]['p95_seconds'] * 1000:>8.0f} "
+              f"{cases[name]['p99_seconds'] * 1000:>8.0f} {cases[name]['error_rate']:>7.1%}  "
+              + ' '.join(f"{status}:{count}" for status, count in sorted(counts.items(), key=str)))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base URL of a running server; a local one is started when omitted')
+    parser.add_argument('--api-key', help='API key (default: the local API_KEY setting)')
+    parser.add_argument('--rate', type=float, default=10, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Endpoint weights, e.g. chat=1,transactions=3')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the results as JSON (see benchmarks/results.py)')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='Fake LLM seconds per call (local server)')
+    parser.add_argument('--llm-jitter', type=float, default=0.1, help='Fake LLM +/- jitter (local server)')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='Fake LLM failure share (local server)')
+    parser.add_argument('--server-logs', action='store_true', help='Show the local server output')
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    server: Optional[subprocess.Popen] = None
+    url = args.url
+    if url is None:
+        server, url = start_local_server(args)
+    if args.api_key is None:
+        from app.core.config import settings
+        args.api_key = settings.API_KEY
+
+    try:
+        samples, statuses, elapsed, max_lag, jobs = asyncio.run(generate_load(
+            url, args.api_key, args.rate, args.duration, weights, args.seed, args.timeout
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"target {args.rate:.1f} req/s for {args.duration:.0f} s against {url}; "
+          f"ran {elapsed:.1f} s, max schedule lag {max_lag * 1000:.0f} ms")
+    print(f"{'endpoint':<20} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}  statuses")
+    cases = report(samples, statuses, elapsed)
+    if jobs:
+        print('upload jobs: ' + ', '.join(f"{status}={count}" for status, count in sorted(jobs.items())))
+
+    if args.output:
+        params = {key: value for key, value in vars(args).items() if key not in ('api_key', 'output', 'server_logs')}
+        params['url'] = None if server is not None else args.url
+        write_results(args.output, 'load_test', params, cases)
+        print(f"wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
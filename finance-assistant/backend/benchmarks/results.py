@@ -0,0 +1,113 @@
+"""
+JSON benchmark results that can be compared across runs.
+
+A result file holds the parameters and environment of a run and, per case, a
+flat mapping of metric name to value. Metrics ending in ``seconds`` are better
+when lower; metrics ending in ``per_second`` are better when higher.
+
+Compare two runs from the backend directory:
+    python -m benchmarks.results before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe where a run happened, so results from different machines are not mistaken for regressions.
+    """
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': _git_commit(),
+    }
+
+
+def write_results(path: str, benchmark: str, params: Dict[str, Any], cases: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Write a result file and return its content.
+
+    Args:
+        path: Output file
+        benchmark: Name of the benchmark or suite
+        params: Parameters the run used (sizes, repeats)
+        cases: Mapping of case name to {metric name: value}
+    """
+    report = {
+        'benchmark': benchmark,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'params': params,
+        'cases': cases,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return report
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]):
+    """
+    Yield (case, metric, before, after, change) for metrics present in both runs.
+    ``change`` is positive when ``after`` is better.
+    """
+    for case, metrics in after['cases'].items():
+        for metric, value in metrics.items():
+            old = before['cases'].get(case, {}).get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(value, (int, float)) or not old or not value:
+                continue
+            if metric.endswith('per_second'):
+                change = value / old - 1
+            elif metric.endswith('seconds'):
+                change = old / value - 1
+            else:
+                continue
+            yield case, metric, old, value, change
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Exit non-zero if any metric is worse by more than this fraction')
+    args = parser.parse_args()
+
+    before, after = load_results(args.before), load_results(args.after)
+    if before['params'] != after['params']:
+        print('warning: runs used different parameters')
+    if before['environment'].get('platform') != after['environment'].get('platform'):
+        print('warning: runs were made on different platforms')
+
+    regressed = False
+    for case, metric, old, new, change in compare(before, after):
+        flag = ''
+        if change < -args.threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{case:<28} {metric:<26} {old:>12.4g} {new:>12.4g} {change:>+8.1%}{flag}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Run the ingestion and analytics hot-path benchmarks and write the results as
+JSON (see benchmarks/results.py), so runs can be compared:
+
+    python -m benchmarks.run_suite --output before.json
+    ... change something ...
+    python -m benchmarks.run_suite --output after.json
+    python -m benchmarks.results before.json after.json
+
+Everything runs offline on a throwaway SQLite database with a stubbed LLM.
+"""
+import os
+import argparse
+import tempfile
+import time
+
+# Point the app at SQLite before any app module creates the engine
+_db_dir = tempfile.mkdtemp(prefix='bench-suite-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from benchmarks import (
+    bench_bulk_insert, bench_llm_parsing, bench_pdf_extract, bench_sanitize, bench_summary_endpoints
+)
+from benchmarks.results import write_results
+
+
+# Problem sizes per preset; the default preset finishes in about a minute
+PRESETS = {
+    'quick': {'pages': 20, 'pdf_pages': 10, 'rows_per_page': 40, 'insert_rows': 2000,
+              'summary_rows': 20000, 'requests': 20, 'repeat': 2},
+    'default': {'pages': 200, 'pdf_pages': 50, 'rows_per_page': 40, 'insert_rows': 10000,
+                'summary_rows': 200000, 'requests': 50, 'repeat': 3},
+}
+
+
+def run_suite(params: dict):
+    pages, rows_per_page, repeat = params['pages'], params['rows_per_page'], params['repeat']
+    cases = {}
+
+    sanitize = bench_sanitize.run(pages, rows_per_page, repeat)
+    for mode, result in sanitize['results'].items():
+        cases[f"sanitize_{mode}"] = result
+
+    for backend, result in bench_pdf_extract.run(params['pdf_pages'], rows_per_page, repeat).items():
+        cases[f"pdf_extract_{backend}"] = result
+    cases['llm_parsing'] = bench_llm_parsing.run(pages, rows_per_page, repeat)
+
+    insert_seconds = bench_bulk_insert.run(params['insert_rows'], None, methods=('bulk',))['bulk']
+    cases['persist_bulk'] = {
+        'seconds': insert_seconds,
+        'rows_per_second': params['insert_rows'] / insert_seconds,
+    }
+
+    cases.update({
+        f"summary_{name}": result
+        for name, result in bench_summary_endpoints.run(params['summary_rows'], 5, params['requests']).items()
+    })
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--preset', choices=tuple(PRESETS), default='default')
+    args = parser.parse_args()
+
+    params = dict(PRESETS[args.preset], preset=args.preset)
+    start = time.perf_counter()
+    report = write_results(args.output, 'hot_paths', params, run_suite(params))
+    for case, metrics in report['cases'].items():
+        print(f"{case:<24} " + '  '.join(f"{metric}={value:.4g}" for metric, value in metrics.items()))
+    print(f"wrote {args.output} in {time.perf_counter() - start:.0f} s")
+
+
+if __name__ == '__main__':
+    main()
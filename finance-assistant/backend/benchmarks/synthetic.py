@@ -0,0 +1,225 @@
+"""
+Synthetic bank statements and transaction exports for benchmarks.
+
+Write one to disk from the backend directory:
+    python -m benchmarks.synthetic --pages 20 --format pdf --output statement.pdf
+    python -m benchmarks.synthetic --pages 2500 --format csv --output transactions.csv
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from typing import Iterator, List, Tuple
+
+
+MERCHANTS = [
+    ('Walmart Supercenter', 'Groceries'),
+    ('Starbucks Coffee', 'Food & Dining'),
+    ('Netflix Subscription', 'Entertainment'),
+    ('Uber Ride', 'Transportation'),
+    ('Shell Gas Station', 'Transportation'),
+    ('Target Store', 'Shopping'),
+    ('Amazon Marketplace', 'Shopping'),
+    ('CVS Pharmacy', 'Healthcare'),
+    ('Kroger Market', 'Groceries'),
+    ('City Water Utility', 'Utilities'),
+]
+
+PEOPLE = ['John Smith', 'Mary Johnson', 'Robert Brown', 'Linda Davis', 'James Wilson']
+
+
+def generate_statement_pages(pages: int = 10, rows_per_page: int = 40, seed: int = 42,
+                             layout: str = 'amount_balance') -> List[str]:
+    """
+    Generate synthetic bank statement pages with PII sprinkled in.
+
+    Args:
+        pages: Number of pages
+        rows_per_page: Number of transaction rows per page
+        seed: Random seed so runs are comparable
+        layout: 'amount_balance' (one amount column) or 'debit_credit' (separate columns)
+
+    Returns:
+        List of page texts
+    """
+    rng = random.Random(seed)
+    holder = rng.choice(PEOPLE)
+    account = ''.join(rng.choice('0123456789') for _ in range(12))
+    current = date(2024, 1, 1)
+    result = []
+
+    for page in range(pages):
+        lines = [
+            'First National Bank',
+            f'Account Holder: {holder}',
+            f'Account Number: {account}',
+            f'{rng.randint(10, 9999)} Oak Street, Springfield, IL',
+            f'Customer Service: (800) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+            f'Statement Page {page + 1} of {pages}',
+        ]
+        if layout == 'debit_credit':
+            lines.append('Date        Description                              Debit      Credit     Balance')
+        else:
+            lines.append('Date        Description                          Amount      Balance')
+        for _ in range(rows_per_page):
+            current += timedelta(days=rng.randint(0, 1))
+            roll = rng.random()
+            if roll < 0.05:
+                description = f'Zelle Transfer to {rng.choice(PEOPLE)}'
+            elif roll < 0.08:
+                description = f'Check #{rng.randint(100, 9999)}'
+            elif roll < 0.10:
+                description = 'Direct Deposit Payroll'
+            else:
+                description = rng.choice(MERCHANTS)[0]
+            amount = rng.uniform(1, 500)
+            balance = rng.uniform(100, 10000)
+            if layout == 'debit_credit':
+                credit = description.startswith('Direct Deposit')
+                debit_text = '' if credit else f'{amount:.2f}'
+                credit_text = f'{amount:.2f}' if credit else ''
+                lines.append(f'{current.strftime("%m/%d/%Y")}  {description:<36} {debit_text:>10} {credit_text:>11} {balance:>11.2f}')
+            else:
+                lines.append(f'{current.strftime("%m/%d/%Y")}  {description:<36} {amount:>10.2f} {balance:>10.2f}')
+        lines.append(f'Questions? Email {holder.split()[0].lower()}@example.com')
+        result.append('\n'.join(lines))
+
+    return result
+
+
+def generate_statement_text(pages: int = 10, rows_per_page: int = 40, seed: int = 42,
+                            layout: str = 'amount_balance') -> str:
+    """
+    Generate a synthetic bank statement as one text with form feeds between pages,
+    matching the output of pdfminer's ``extract_text``.
+    """
+    return '\f'.join(generate_statement_pages(pages, rows_per_page, seed, layout))
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def statement_pdf_bytes(pages: int = 10, rows_per_page: int = 40, seed: int = 42,
+                        layout: str = 'amount_balance') -> bytes:
+    """
+    Render a synthetic statement as a text PDF, one statement page per PDF page.
+
+    Lines are drawn in a monospaced font so column alignment survives text
+    extraction, like the statements the templates are written for.
+    """
+    font_size, leading, margin = 9, 11, 36
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page ids are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>',
+    ]
+    page_ids = []
+    for text in generate_statement_pages(pages, rows_per_page, seed, layout):
+        lines = text.split('\n')
+        height = max(792, 2 * margin + leading * len(lines))
+        content = f'BT /F1 {font_size} Tf {leading} TL {margin} {height - margin} Td\n'
+        content += ''.join(f'({_pdf_escape(line)}) Tj T*\n' for line in lines) + 'ET'
+        stream = content.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append((
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 {height}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>'
+        ).encode())
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects[1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def write_statement_pdf(path: str, pages: int = 10, rows_per_page: int = 40, seed: int = 42,
+                        layout: str = 'amount_balance') -> str:
+    """
+    Write a synthetic statement PDF to ``path`` and return the path.
+    """
+    with open(path, 'wb') as f:
+        f.write(statement_pdf_bytes(pages, rows_per_page, seed, layout))
+    return path
+
+
+def iter_export_transactions(rows: int, seed: int = 42) -> Iterator[Tuple[date, str, float]]:
+    """
+    Generate (date, description, signed amount) rows for a bank export, a few
+    per day from 2000 onwards, with store numbers varying the descriptions.
+    """
+    rng = random.Random(seed)
+    current = date(2000, 1, 1)
+    for _ in range(rows):
+        current += timedelta(days=rng.random() < 0.3)
+        if rng.random() < 0.04:
+            yield current, 'Direct Deposit Payroll', round(rng.uniform(1000, 4000), 2)
+        else:
+            merchant = rng.choice(MERCHANTS)[0]
+            yield current, f'{merchant} #{rng.randint(100, 999)}', -round(rng.uniform(1, 500), 2)
+
+
+def write_transactions_csv(path: str, rows: int, seed: int = 42) -> str:
+    """
+    Write a CSV export in the common Date,Description,Amount,Balance layout.
+    """
+    balance = 10000.0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date', 'Description', 'Amount', 'Balance'])
+        for day, description, amount in iter_export_transactions(rows, seed):
+            balance += amount
+            writer.writerow([day.strftime('%m/%d/%Y'), description, f'{amount:.2f}', f'{balance:.2f}'])
+    return path
+
+
+def write_transactions_ofx(path: str, rows: int, seed: int = 42) -> str:
+    """
+    Write an OFX 1.0.2 (SGML) bank statement export, as most banks still serve.
+    """
+    with open(path, 'w', newline='\r\n') as f:
+        f.write('OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n'
+                'CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n')
+        f.write('<OFX>\n<BANKMSGSRSV1>\n<STMTTRNRS>\n<STMTRS>\n<CURDEF>USD\n<BANKTRANLIST>\n')
+        for number, (day, description, amount) in enumerate(iter_export_transactions(rows, seed)):
+            f.write(f'<STMTTRN>\n<TRNTYPE>{"CREDIT" if amount > 0 else "DEBIT"}\n'
+                    f'<DTPOSTED>{day.strftime("%Y%m%d")}120000[0:GMT]\n<TRNAMT>{amount:.2f}\n'
+                    f'<FITID>{number}\n<NAME>{description}\n</STMTTRN>\n')
+        f.write('</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n')
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--layout', choices=('amount_balance', 'debit_credit'), default='amount_balance')
+    parser.add_argument('--format', choices=('pdf', 'text', 'csv', 'ofx'), default='pdf',
+                        help='csv and ofx write pages x rows-per-page export rows')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    if args.format == 'pdf':
+        write_statement_pdf(args.output, args.pages, args.rows_per_page, args.seed, args.layout)
+    elif args.format == 'csv':
+        write_transactions_csv(args.output, args.pages * args.rows_per_page, args.seed)
+    elif args.format == 'ofx':
+        write_transactions_ofx(args.output, args.pages * args.rows_per_page, args.seed)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(generate_statement_text(args.pages, args.rows_per_page, args.seed, args.layout))
+    print(f"wrote {args.pages} pages x {args.rows_per_page} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
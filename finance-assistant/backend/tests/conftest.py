@@ -0,0 +1,66 @@
+"""
+Shared test setup. Settings are read when app modules are imported, so the app
+is pointed at a throwaway SQLite database and the fake LLM provider here, before
+any test module imports it.
+"""
+import os
+import tempfile
+
+import pytest
+
+_test_dir = tempfile.mkdtemp(prefix='finance-assistant-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_test_dir, 'test.db')}"
+os.environ['LLM_PROVIDER'] = 'fake'
+os.environ['INGESTION_CACHE_ENABLED'] = 'false'
+os.environ['UPLOAD_SPOOL_DIR'] = os.path.join(_test_dir, 'uploads')
+
+
+@pytest.fixture
+def client():
+    """
+    TestClient for the app, with startup (schema creation) and shutdown run,
+    sending the shared API key.
+    """
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.main import app
+
+    with TestClient(app, headers={'X-API-Key': settings.API_KEY}) as test_client:
+        yield test_client
+
+
+def free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """
+    Factory starting the local fake OpenAI-compatible server
+    (benchmarks/fake_openai.py) with the given options, and pointing the Azure
+    LLM settings at it. Tests close the pooled LLM clients on their own event
+    loop (close_llm_clients) before it ends.
+    """
+    from contextlib import ExitStack
+
+    from app.core.config import settings
+    from app.services import chat
+    from benchmarks.fake_openai import FakeOpenAIServer
+
+    monkeypatch.setattr(chat, '_llm_cache', {})
+    monkeypatch.setattr(settings, 'LLM_PROVIDER', 'azure')
+    monkeypatch.setattr(settings, 'deployment_name', 'fake-deployment')
+    monkeypatch.setattr(settings, 'api_key', 'fake-key')
+    monkeypatch.setattr(settings, 'api_version', '2024-02-01')
+
+    with ExitStack() as stack:
+        def start(**app_options):
+            server = stack.enter_context(FakeOpenAIServer(port=free_port(), **app_options))
+            monkeypatch.setattr(settings, 'azure_endpoint', server.url)
+            return server
+
+        yield start
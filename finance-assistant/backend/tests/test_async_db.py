@@ -0,0 +1,115 @@
+"""
+The async database layer on aiosqlite: routes read and write through
+AsyncSession, and concurrent queries run off the event loop instead of
+stalling it.
+"""
+import asyncio
+import time
+import pytest
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, close_async_engine, get_async_engine, get_async_sessionmaker
+
+
+# Counts to ROWS in SQLite; a few hundred milliseconds of work per query
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) "
+    "SELECT count(*) FROM n"
+)
+ROWS = 500000
+
+
+async def _blocking_query():
+    db = SessionLocal()
+    try:
+        return db.execute(SLOW_QUERY, {'rows': ROWS}).scalar()
+    finally:
+        db.close()
+
+
+async def _async_query():
+    async with get_async_sessionmaker()() as db:
+        return (await db.execute(SLOW_QUERY, {'rows': ROWS})).scalar()
+
+
+async def _max_loop_stall(query, requests: int) -> float:
+    """
+    Run ``requests`` queries at once and return the longest time the event
+    loop was held up meanwhile.
+    """
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker(interval=0.005):
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(time.perf_counter() - start - interval)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    results = await asyncio.gather(*(query() for _ in range(requests)))
+    done.set()
+    await tick
+    assert results == [ROWS] * requests
+    return max(stalls)
+
+
+def test_async_engine_uses_aiosqlite():
+    async def run():
+        try:
+            async with get_async_sessionmaker()() as db:
+                return get_async_engine().dialect.driver, (await db.execute(text("SELECT 1"))).scalar()
+        finally:
+            await close_async_engine()
+
+    assert asyncio.run(run()) == ('aiosqlite', 1)
+
+
+def test_finance_routes_read_and_write_through_async_session(client):
+    transaction = {
+        'date': '2026-03-14T00:00:00', 'description': 'Async Coffee Roasters', 'amount': 4.5,
+        'category': 'Dining', 'transaction_type': 'expense', 'source': 'manual'
+    }
+
+    created = client.post('/api/finance/transactions', json=transaction)
+    assert created.status_code == 200
+
+    listed = client.get('/api/finance/transactions')
+    assert listed.status_code == 200
+    assert created.json()['id'] in [row['id'] for row in listed.json()]
+
+    summary = client.get('/api/finance/monthly-summary', params={'year': 2026, 'month': 3})
+    assert summary.status_code == 200
+
+
+@pytest.mark.parametrize('path, params', [
+    ('/api/finance/monthly-summary', {'year': 2026, 'month': 0}),
+    ('/api/finance/monthly-summary', {'year': 2026, 'month': 13}),
+    ('/api/finance/monthly-summary', {'year': 9999, 'month': 12}),
+    ('/api/finance/yearly-summary', {'year': 9999}),
+    ('/api/finance/yearly-summary', {'year': 0}),
+])
+def test_summaries_reject_out_of_range_dates(client, path, params):
+    assert client.get(path, params=params).status_code == 422
+
+
+def test_async_queries_do_not_stall_the_event_loop():
+    async def run():
+        try:
+            # Open connections on both engines before measuring
+            await _blocking_query()
+            await _async_query()
+            start = time.perf_counter()
+            await _async_query()
+            single = time.perf_counter() - start
+            return single, await _max_loop_stall(_blocking_query, 4), await _max_loop_stall(_async_query, 4)
+        finally:
+            await close_async_engine()
+
+    single, blocking_stall, async_stall = asyncio.run(run())
+
+    # The blocking session holds the loop for whole queries; the async one never does
+    assert blocking_stall > single / 2
+    assert async_stall < single / 4
@@ -0,0 +1,78 @@
+"""
+Merchant keys: descriptions reduced to sanitizer placeholders or generic words
+are never learned or looked up, so one category cannot spread across unrelated
+payees. Extracted rows come without a category, so only merchants the index
+cannot resolve are sent to the LLM.
+"""
+import pytest
+
+from app.core.database import SessionLocal, init_db
+from app.services import categorizer
+from app.services.categorizer import merchant_categorizer, normalize_merchant
+from app.services.fake_llm import _fake_transactions
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.mark.parametrize('description', [
+    '[NAME REMOVED]', '[NAME REMOVED] 0231', 'Check #1042', 'CHECK 1043', 'Check #****', 'Credit Card Payment'
+])
+def test_placeholder_and_generic_descriptions_have_no_key(description):
+    assert normalize_merchant(description) == ''
+
+
+def test_merchant_keys_ignore_store_numbers():
+    assert normalize_merchant('POS STARBUCKS #1234 SEATTLE') == normalize_merchant('Starbucks 5678 Seattle')
+
+
+def test_masked_merchants_keep_their_own_categories(db):
+    user_id = 301
+    merchant_categorizer.record(db, user_id, [
+        {'description': '[NAME REMOVED]', 'category': 'Groceries'},
+        {'description': '[NAME REMOVED] 0231', 'category': 'Groceries'},
+        {'description': '[NAME REMOVED] 7710', 'category': 'Groceries'},
+        {'description': 'Check #1042', 'category': 'Utilities'},
+        {'description': 'Check #1043', 'category': 'Utilities'},
+        {'description': 'Blue Door Bakery', 'category': 'Food & Dining'},
+        {'description': 'Blue Door Bakery', 'category': 'Food & Dining'},
+    ])
+
+    rows = merchant_categorizer.categorize(db, user_id, [
+        {'description': '[NAME REMOVED] 5512', 'category': 'Shopping'},
+        {'description': 'Check #1044', 'category': 'Insurance'},
+        {'description': 'BLUE DOOR BAKERY #2', 'category': 'Other'},
+    ], use_llm=False)
+
+    # The LLM's categories stand for masked and check rows; a known merchant is still learned
+    assert [row['category'] for row in rows] == ['Shopping', 'Insurance', 'Food & Dining']
+
+
+def test_only_unknown_extracted_merchants_go_to_the_llm(db, monkeypatch):
+    user_id = 302
+    merchant_categorizer.record(db, user_id, [
+        {'description': 'Blue Door Bakery', 'category': 'Food & Dining'},
+        {'description': 'Blue Door Bakery', 'category': 'Food & Dining'},
+    ])
+    asked = []
+
+    def categorize_with_llm(descriptions):
+        asked.extend(descriptions)
+        return {description: 'Shopping' for description in descriptions}
+
+    monkeypatch.setattr(categorizer, 'categorize_with_llm', categorize_with_llm)
+
+    rows = _fake_transactions("03/01/2024  BLUE DOOR BAKERY #2  12.50\n03/02/2024  Corner Hardware  40.00")
+    assert all('category' not in row for row in rows)
+
+    rows = merchant_categorizer.categorize(db, user_id, rows)
+    assert asked == ['Corner Hardware']
+    assert [row['category'] for row in rows] == ['Food & Dining', 'Shopping']
@@ -0,0 +1,109 @@
+"""
+Chat against a local fake OpenAI-compatible server: concurrent requests overlap
+on one event loop, and /api/chat/stream sends tokens while the upstream
+completion is still being generated, and ends in an error event when it fails.
+"""
+import asyncio
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from app.services.chat import close_llm_clients, generate_chat_response
+from benchmarks.fake_openai import BackgroundServer
+from tests.conftest import free_port
+
+
+REPLY = ("Based on your spending, groceries and dining are your largest categories. "
+         "Consider setting a monthly budget for each and reviewing it weekly.")
+
+
+def test_concurrent_chat_requests_overlap(fake_openai):
+    delay = 0.5
+    requests = 10
+    server = fake_openai(delay=delay, reply=REPLY)
+
+    async def run():
+        try:
+            # Compile the graph and open the connection pool before timing
+            await generate_chat_response(user_id=1, message="Warm up")
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                generate_chat_response(user_id=1, message=f"Question {i}") for i in range(requests)
+            ])
+            return responses, time.perf_counter() - start
+        finally:
+            await close_llm_clients()
+
+    responses, elapsed = asyncio.run(run())
+
+    assert responses == [REPLY] * requests
+    assert server.app.state.max_in_flight == requests
+    # One after another, the requests would take requests * delay
+    assert elapsed < 3 * delay
+
+
+def test_stream_sends_first_token_before_generation_completes(fake_openai):
+    llm = fake_openai(delay=0.1, reply=REPLY, token_delay=0.05)
+
+    async def run(url):
+        events = []
+        upstream_in_flight = None
+        async with httpx.AsyncClient(base_url=url, headers={'X-API-Key': settings.API_KEY}, timeout=30) as client:
+            async with client.stream('POST', '/api/chat/stream', json={'message': 'How am I doing?'}) as response:
+                assert response.status_code == 200
+                assert response.headers['content-type'].startswith('text/event-stream')
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    if upstream_in_flight is None and line.startswith('data: {"token"'):
+                        upstream_in_flight = llm.app.state.in_flight
+                    events.append(line)
+        return events, upstream_in_flight
+
+    with BackgroundServer(app, port=free_port()) as backend:
+        events, upstream_in_flight = asyncio.run(run(backend.url))
+
+    # The first token was relayed while the upstream completion was still streaming
+    assert upstream_in_flight == 1
+    tokens = [line for line in events if line.startswith('data: {"token"')]
+    assert len(tokens) == len(REPLY.split(' '))
+    assert events[-2:] == ['event: done', 'data: {}']
+
+
+def test_stream_disconnect_cancels_upstream_request(fake_openai):
+    llm = fake_openai(delay=0.1, reply=REPLY, token_delay=0.2)
+
+    async def run(url):
+        async with httpx.AsyncClient(base_url=url, headers={'X-API-Key': settings.API_KEY}, timeout=30) as client:
+            async with client.stream('POST', '/api/chat/stream', json={'message': 'How am I doing?'}) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith('data: {"token"'):
+                        break
+
+    with BackgroundServer(app, port=free_port()) as backend:
+        asyncio.run(run(backend.url))
+        deadline = time.time() + 2
+        while llm.app.state.disconnects == 0 and time.time() < deadline:
+            time.sleep(0.05)
+
+    assert llm.app.state.disconnects == 1
+
+
+
+def test_stream_failure_after_tokens_ends_in_error(fake_openai):
+    fake_openai(delay=0.05, reply=REPLY, fail_after=3)
+
+    async def run(url):
+        async with httpx.AsyncClient(base_url=url, headers={'X-API-Key': settings.API_KEY}, timeout=30) as client:
+            async with client.stream('POST', '/api/chat/stream', json={'message': 'How am I doing?'}) as response:
+                return [line async for line in response.aiter_lines() if line]
+
+    with BackgroundServer(app, port=free_port()) as backend:
+        events = asyncio.run(run(backend.url))
+
+    tokens = [line for line in events if line.startswith('data: {"token"')]
+    assert len(tokens) == 3
+    assert 'event: done' not in events
+    assert events[-2] == 'event: error'
@@ -0,0 +1,54 @@
+"""
+CSV imports through POST /api/upload/transactions-file: rows that cannot be
+read are skipped and counted on the job.
+"""
+import time
+
+
+CSV = (
+    "Date,Description,Amount\n"
+    "2025-02-01,Corner Grocery,-42.10\n"
+    "not a date,Broken Row,-1.00\n"
+    "2025-02-03,Payroll Deposit,2500.00\n"
+    "2025-02-04,City Parking,twelve\n"
+)
+
+
+def _wait_for_job(client, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while True:
+        job = client.get(f"/api/upload/jobs/{job_id}").json()
+        if job['status'] not in ('queued', 'running') or time.time() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_unreadable_rows_are_counted_on_the_job(client):
+    response = client.post(
+        '/api/upload/transactions-file', files={'file': ('export.csv', CSV.encode(), 'text/csv')}
+    )
+    assert response.status_code == 202
+
+    job = _wait_for_job(client, response.json()['id'])
+
+    assert job['status'] == 'succeeded', job['error']
+    assert job['transaction_count'] == 2
+    assert job['duplicate_count'] == 0
+    assert job['unreadable_count'] == 2
+
+
+def test_descriptions_are_stored_as_read(client):
+    csv = (
+        "Date,Description,Amount\n"
+        "2025-03-01,Trader Joes,-61.20\n"
+        "2025-03-02,John Smith Rent,-1450.00\n"
+        "2025-03-03,Credit Card Payment 4111111111111111,-300.00\n"
+    )
+    response = client.post(
+        '/api/upload/transactions-file', files={'file': ('names.csv', csv.encode(), 'text/csv')}
+    )
+    job = _wait_for_job(client, response.json()['id'])
+    assert job['status'] == 'succeeded', job['error']
+
+    descriptions = {row['description'] for row in client.get('/api/finance/transactions').json()}
+    assert {'Trader Joes', 'John Smith Rent', 'Credit Card Payment ****-****-****-1111'} <= descriptions
@@ -0,0 +1,105 @@
+"""
+Ingestion cache levels for statement PDFs: a sanitized hit does not read the
+PDF, and a text entry is only written once every page has been extracted, so
+later runs that start from it see the whole statement.
+"""
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, init_db
+from app.services import chat, pdf
+from app.services.cache import IngestionCache
+
+
+PAGES = 5
+ROWS_PER_PAGE = 51
+
+
+def _statement_pages():
+    return [
+        f"Statement page {page + 1} of {PAGES}\n" + "\n".join(
+            f"{page + 1:02d}/{row % 28 + 1:02d}/2024  Grocery Store {row}  {page * 100 + row}.25"
+            for row in range(ROWS_PER_PAGE)
+        )
+        for page in range(PAGES)
+    ]
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """
+    A statement no template matches, served by a stand-in page extractor that
+    counts how often the PDF is read, with a fresh enabled cache, an instant
+    fake LLM and a database session.
+    """
+    monkeypatch.setattr(settings, 'FAKE_LLM_LATENCY', 0.0)
+    monkeypatch.setattr(settings, 'FAKE_LLM_JITTER', 0.0)
+    monkeypatch.setattr(settings, 'FAKE_LLM_TOKEN_DELAY', 0.0)
+    monkeypatch.setattr(chat, '_llm_cache', {})
+    monkeypatch.setattr(pdf.template_registry, 'match', lambda text: None)
+    cache = IngestionCache(directory=str(tmp_path / 'cache'), enabled=True)
+    monkeypatch.setattr(pdf, 'ingestion_cache', cache)
+
+    reads = []
+
+    def iter_pages(pdf_path):
+        reads.append(pdf_path)
+        yield from _statement_pages()
+
+    monkeypatch.setattr(pdf.pdf_text_extractor, 'iter_pages', iter_pages)
+
+    init_db()
+    db = SessionLocal()
+
+    def extract(user_id):
+        transactions, duplicates = pdf.extract_transactions_from_pdf(
+            'statement.pdf', user_id, db, file_sha256='0' * 64
+        )
+        return len(transactions) + duplicates
+
+    try:
+        yield extract, cache, reads
+    finally:
+        db.close()
+
+
+def _entries(cache, level):
+    level_dir = os.path.join(cache.directory, level)
+    return [os.path.join(root, name) for root, _, names in os.walk(level_dir) for name in names]
+
+
+def _drop(cache, *levels):
+    for level in levels:
+        for path in _entries(cache, level):
+            os.unlink(path)
+    cache._index = None
+
+
+def test_sanitized_hit_does_not_read_the_pdf(extractor, monkeypatch):
+    extract, cache, reads = extractor
+    assert extract(user_id=101) == PAGES * ROWS_PER_PAGE
+
+    # Only the sanitized level survives, e.g. after the text entry was evicted
+    _drop(cache, 'text', 'parsed')
+
+    assert extract(user_id=101) == PAGES * ROWS_PER_PAGE
+    assert len(reads) == 1
+    assert _entries(cache, 'text') == []
+
+    # A later sanitizer version bump reads the whole statement again
+    monkeypatch.setattr(pdf, 'SANITIZER_VERSION', 'test-bump')
+    assert extract(user_id=101) == PAGES * ROWS_PER_PAGE
+    assert len(reads) == 2
+
+
+def test_text_entry_holds_every_page(extractor, monkeypatch):
+    extract, cache, reads = extractor
+    assert extract(user_id=102) == PAGES * ROWS_PER_PAGE
+
+    # A sanitizer version bump: the next run starts from the cached text
+    monkeypatch.setattr(pdf, 'SANITIZER_VERSION', 'test-bump')
+
+    assert extract(user_id=102) == PAGES * ROWS_PER_PAGE
+    assert len(reads) == 1
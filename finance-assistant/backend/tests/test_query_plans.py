@@ -0,0 +1,38 @@
+"""
+The per-user listing and summary queries, as built by the endpoints and
+services, use their indexes on SQLite (see benchmarks/check_query_plans.py),
+and a schema update adds those indexes to an existing database.
+"""
+import pytest
+from sqlalchemy import inspect
+
+from app.core.database import Base, SessionLocal, engine, ensure_schema, init_db
+from benchmarks.check_query_plans import CHECKS, check_plan
+
+
+@pytest.fixture(scope='module')
+def db():
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize('name', list(CHECKS))
+def test_query_uses_index(db, name):
+    ok, plan = check_plan(db, name)
+    assert ok, plan
+
+
+def test_schema_update_creates_missing_indexes(db):
+    # A database created before the composite indexes, at an older schema version
+    for name in ('ix_transactions_user_date_id', 'ix_transactions_user_type_date'):
+        next(index for index in Base.metadata.tables['transactions'].indexes if index.name == name).drop(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM schema_versions")
+
+    assert ensure_schema()
+    names = {index['name'] for index in inspect(engine).get_indexes('transactions')}
+    assert {'ix_transactions_user_date_id', 'ix_transactions_user_type_date'} <= names
@@ -0,0 +1,54 @@
+"""
+Golden-file tests for the statement templates: each tests/golden/templates/*.txt
+statement must match the template named in the .json next to it and parse to
+exactly the rows and unparsed lines recorded there.
+"""
+import glob
+import json
+import os
+
+import pytest
+
+from app.services.templates import template_registry
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden', 'templates')
+STATEMENTS = sorted(glob.glob(os.path.join(GOLDEN_DIR, '*.txt')))
+
+
+@pytest.mark.parametrize('statement_path', STATEMENTS, ids=os.path.basename)
+def test_template_parses_golden_statement(statement_path):
+    with open(statement_path, encoding='utf-8') as f:
+        text = f.read()
+    with open(statement_path[:-4] + '.json', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    template = template_registry.match(text)
+    assert template is not None
+    assert template.name == expected['template']
+
+    rows, unparsed = template.parse(text)
+    assert rows == expected['rows']
+    assert unparsed == expected['unparsed']
+
+
+@pytest.mark.parametrize('description', ['Credit Card Payment', 'CHASE CREDIT CRD AUTOPAY', 'credit card autopay'])
+def test_card_payments_are_not_income(description):
+    template = template_registry.match('Date        Description                          Amount      Balance')
+    text = (
+        'Date        Description                          Amount      Balance\n'
+        f'03/02/2024  {description:<36}  300.00    4,820.44\n'
+    )
+    rows, unparsed = template.parse(text)
+    assert unparsed == []
+    assert [row['transaction_type'] for row in rows] == ['expense']
+
+
+def test_signed_statement_uses_the_sign():
+    text = (
+        'Date        Description                          Amount      Balance\n'
+        '04/01/2024  Zelle From Mark                          75.00    1,075.00\n'
+        '04/02/2024  Kroger Market                           -54.10    1,020.90\n'
+    )
+    rows, _ = template_registry.match(text).parse(text)
+    assert [row['transaction_type'] for row in rows] == ['income', 'expense']
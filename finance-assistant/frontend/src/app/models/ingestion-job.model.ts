@@ -0,0 +1,13 @@
+export interface IngestionJob {
+  id: string;
+  filename: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  stage: string | null;
+  progress: number;
+  transaction_count: number;
+  error: string | null;
+  started_at: string | null;
+  finished_at: string | null;
+  created_at: string;
+  updated_at: string;
+}
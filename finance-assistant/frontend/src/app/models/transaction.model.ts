@@ -11,6 +11,11 @@ export interface Transaction {
   updated_at: string;
 }
 
+export interface TransactionPage {
+  transactions: Transaction[];
+  nextCursor: string | null;
+}
+
 export interface TransactionCreate {
   date: string;
   description: string;
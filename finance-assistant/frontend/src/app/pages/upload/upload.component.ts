@@ -77,7 +77,7 @@ export class UploadComponent {
       this.uploadStatus = 'Uploading...';
       this.uploadService.uploadBankStatement(this.selectedFile).subscribe({
         next: (response: any) => {
-          this.uploadStatus = 'File uploaded successfully!';
+          this.uploadStatus = 'File uploaded successfully! Processing has started.';
           // Reset form after successful upload
           this.uploadForm.reset();
           this.selectedFile = null;
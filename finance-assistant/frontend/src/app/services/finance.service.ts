@@ -1,8 +1,9 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
+import { map } from 'rxjs/operators';
 import { environment } from '../../environments/environment';
-import { MonthlySummary, Transaction, TransactionCreate, YearlySummary } from '../models/transaction.model';
+import { MonthlySummary, Transaction, TransactionCreate, TransactionPage, YearlySummary } from '../models/transaction.model';
 
 @Injectable({
   providedIn: 'root'
@@ -21,6 +22,21 @@ export class FinanceService {
     return this.http.get<Transaction[]>(`${this.apiUrl}/transactions`, { params });
   }
 
+  // Get a page of transactions; pass the returned nextCursor to get the following page
+  getTransactionsPage(cursor: string | null = null, limit: number = 100): Observable<TransactionPage> {
+    let params = new HttpParams().set('limit', limit.toString());
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    
+    return this.http.get<Transaction[]>(`${this.apiUrl}/transactions`, { params, observe: 'response' }).pipe(
+      map(response => ({
+        transactions: response.body || [],
+        nextCursor: response.headers.get('X-Next-Cursor')
+      }))
+    );
+  }
+
   // Create a new transaction
   createTransaction(transaction: TransactionCreate): Observable<Transaction> {
     return this.http.post<Transaction>(`${this.apiUrl}/transactions`, transaction);
@@ -2,7 +2,7 @@ import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { environment } from '../../environments/environment';
-import { Transaction } from '../models/transaction.model';
+import { IngestionJob } from '../models/ingestion-job.model';
 
 @Injectable({
   providedIn: 'root'
@@ -12,11 +12,26 @@ export class UploadService {
   
   constructor(private http: HttpClient) { }
 
-  // Upload bank statement PDF
-  uploadBankStatement(file: File): Observable<Transaction[]> {
+  // Upload bank statement PDF; processing continues in a background job
+  uploadBankStatement(file: File): Observable<IngestionJob> {
     const formData = new FormData();
     formData.append('file', file);
     
-    return this.http.post<Transaction[]>(`${this.apiUrl}/bank-statement`, formData);
+    return this.http.post<IngestionJob>(`${this.apiUrl}/bank-statement`, formData);
+  }
+
+  // Get the status of an ingestion job
+  getIngestionJob(jobId: string): Observable<IngestionJob> {
+    return this.http.get<IngestionJob>(`${this.apiUrl}/jobs/${jobId}`);
+  }
+
+  // List ingestion jobs, newest first
+  getIngestionJobs(): Observable<IngestionJob[]> {
+    return this.http.get<IngestionJob[]>(`${this.apiUrl}/jobs`);
+  }
+
+  // Cancel a queued or running ingestion job
+  cancelIngestionJob(jobId: string): Observable<IngestionJob> {
+    return this.http.post<IngestionJob>(`${this.apiUrl}/jobs/${jobId}/cancel`, {});
   }
 }